@@ -1,21 +1,157 @@
-import firebase_admin
-from firebase_admin import credentials, auth
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import metrics, repositories
 from app.models import User
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from jose import jwt
+import asyncio
+import hashlib
+import httpx
 import os
+import re
+import threading
+import time
 
-# Initialize Firebase Admin
-cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
-if cred_path and os.path.exists(cred_path):
-    cred = credentials.Certificate(cred_path)
-    firebase_admin.initialize_app(cred)
-else:
-    # For development, use default credentials or skip
-    try:
-        firebase_admin.initialize_app()
-    except:
-        pass
+# The Firebase Admin SDK is only needed for the project id and as a fallback
+# verifier, so it is imported and initialized in the background at startup
+# (or on first use) rather than when the app is imported
+_firebase_app = None
+_firebase_project_id = None
+_firebase_lock = threading.Lock()
+
+def init_firebase():
+    """Initialize Firebase Admin once; returns the app, or None without credentials (blocking)"""
+    global _firebase_app, _firebase_project_id
+    with _firebase_lock:
+        if _firebase_app is None:
+            import firebase_admin
+            from firebase_admin import credentials
+
+            cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+            try:
+                if cred_path and os.path.exists(cred_path):
+                    _firebase_app = firebase_admin.initialize_app(credentials.Certificate(cred_path))
+                else:
+                    # For development, use default credentials or skip
+                    _firebase_app = firebase_admin.initialize_app()
+            except Exception:
+                try:
+                    _firebase_app = firebase_admin.get_app()
+                except Exception:
+                    pass
+            if _firebase_app is not None:
+                try:
+                    # With default credentials this can query the GCE metadata
+                    # server, so it's resolved here rather than on the event loop
+                    _firebase_project_id = _firebase_app.project_id
+                except Exception:
+                    pass
+    return _firebase_app
+
+# Google's public certificates for Firebase ID tokens. They are prefetched and
+# refreshed in the background so verification is a local RS256 check that
+# never waits on the network.
+FIREBASE_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+CERT_REFRESH_SECONDS = int(os.getenv("FIREBASE_CERT_REFRESH_SECONDS", "3600"))
+
+# Verified token claims, keyed by token hash and expiring at the token's exp
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+# Snapshot of user rows for read-only endpoints
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+_certificates = {}  # kid -> PEM certificate
+_cert_refresh_task = None
+_token_cache = OrderedDict()  # sha256(token) -> (expires_at, claims)
+_user_cache = OrderedDict()  # firebase_uid -> (expires_at, column values)
+
+USER_CACHE_FIELDS = [
+    "id", "email", "firebase_uid", "subscription_tier", "stripe_customer_id",
+    "usage_count", "usage_reset_date", "created_at", "updated_at"
+]
+
+def _get_project_id():
+    return os.getenv("FIREBASE_PROJECT_ID") or _firebase_project_id
+
+async def refresh_certificates() -> int:
+    """Fetch Google's token signing certificates; returns seconds until the next refresh"""
+    global _certificates
+    async with httpx.AsyncClient(timeout=10) as client:
+        response = await client.get(FIREBASE_CERT_URL)
+        response.raise_for_status()
+    _certificates = response.json()
+
+    # Refresh a little before Google's advertised max-age runs out
+    match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+    if match:
+        return max(60, int(int(match.group(1)) * 0.9))
+    return CERT_REFRESH_SECONDS
+
+async def _certificate_refresh_loop():
+    await asyncio.to_thread(init_firebase)
+    if not _get_project_id():
+        return
+    while True:
+        try:
+            delay = await refresh_certificates()
+        except Exception as e:
+            print(f"Error refreshing Firebase certificates: {e}")
+            delay = 60
+        await asyncio.sleep(delay)
+
+def start_certificate_refresh():
+    """Start the background certificate refresh task (called on startup)"""
+    global _cert_refresh_task
+    if _cert_refresh_task is None:
+        _cert_refresh_task = asyncio.get_running_loop().create_task(_certificate_refresh_loop())
+
+def stop_certificate_refresh():
+    """Cancel the background certificate refresh task (called on shutdown)"""
+    global _cert_refresh_task
+    if _cert_refresh_task is not None:
+        _cert_refresh_task.cancel()
+        _cert_refresh_task = None
+
+def _verify_locally(token: str):
+    """Verify a Firebase ID token against the prefetched certificates
+
+    Returns None when the signing certificate isn't available locally, so the
+    caller can fall back to the Firebase Admin SDK.
+    """
+    project_id = _get_project_id()
+    kid = jwt.get_unverified_header(token).get("kid")
+    certificate = _certificates.get(kid)
+    if not project_id or not certificate:
+        return None
+
+    claims = jwt.decode(
+        token,
+        certificate,
+        algorithms=["RS256"],
+        audience=project_id,
+        issuer=f"https://securetoken.google.com/{project_id}",
+        options={"verify_at_hash": False}
+    )
+    if not claims.get("sub") or claims.get("auth_time", 0) > time.time() + 60:
+        raise Exception("Token has invalid subject or auth_time")
+    claims["uid"] = claims["sub"]
+    return claims
+
+def _verify_with_sdk(token: str) -> dict:
+    from firebase_admin import auth
+
+    return auth.verify_id_token(token, app=init_firebase())
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def _cache_claims(token_key: str, claims: dict):
+    expires_at = claims.get("exp")
+    if not expires_at:
+        return
+    _token_cache[token_key] = (expires_at, claims)
+    _token_cache.move_to_end(token_key)
+    while len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.popitem(last=False)
 
 async def verify_token(token: str) -> dict:
     """Verify Firebase ID token"""
@@ -26,44 +162,85 @@ async def verify_token(token: str) -> dict:
             "email": "demo@example.com"
         }
     
+    token_key = _token_key(token)
+    cached = _token_cache.get(token_key)
+    if cached:
+        expires_at, claims = cached
+        if expires_at > time.time():
+            _token_cache.move_to_end(token_key)
+            metrics.record_cache_lookup("token", "hit")
+            return claims
+        del _token_cache[token_key]
+    metrics.record_cache_lookup("token", "miss")
+
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = _verify_locally(token)
+        if decoded_token is None:
+            # Unknown signing key (e.g. during rotation): let the SDK fetch it,
+            # off the event loop
+            loop = asyncio.get_running_loop()
+            decoded_token = await loop.run_in_executor(None, _verify_with_sdk, token)
+        _cache_claims(token_key, decoded_token)
         return decoded_token
     except Exception as e:
         raise Exception(f"Invalid token: {str(e)}")
 
-async def get_current_user(token: str, db: Session) -> User:
+def cache_user(user: User):
+    """Remember a snapshot of the user's row for read-only lookups"""
+    _user_cache[user.firebase_uid] = (
+        time.time() + USER_CACHE_TTL,
+        {field: getattr(user, field) for field in USER_CACHE_FIELDS}
+    )
+    _user_cache.move_to_end(user.firebase_uid)
+    while len(_user_cache) > USER_CACHE_MAX_ENTRIES:
+        _user_cache.popitem(last=False)
+
+def invalidate_user(firebase_uid: str):
+    """Drop a cached user snapshot after the row changed"""
+    _user_cache.pop(firebase_uid, None)
+
+async def get_current_user(token: str, db: AsyncSession) -> User:
     """Get or create user from Firebase token"""
     try:
-        decoded_token = await verify_token(token)
+        with metrics.track("token_verification"):
+            decoded_token = await verify_token(token)
         firebase_uid = decoded_token.get("uid")
         email = decoded_token.get("email")
         
         if not firebase_uid:
             raise Exception("Invalid token")
         
-        # Get or create user
-        user = db.query(User).filter(User.firebase_uid == firebase_uid).first()
-        if not user:
-            user = User(
-                firebase_uid=firebase_uid,
-                email=email,
-                subscription_tier="free",
-                usage_count=0,
-                usage_reset_date=datetime.utcnow()
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-        else:
-            # Reset usage if it's been more than 30 days or if it's the demo user
-            if firebase_uid == "demo-user-123" or (datetime.utcnow() > user.usage_reset_date + timedelta(days=30)):
-                user.usage_count = 0
-                user.usage_reset_date = datetime.utcnow()
-                db.commit()
-                db.refresh(user)
-        
+        # Get or create user. Reading never writes: the monthly usage reset is
+        # computed from usage_reset_date (see User.get_usage_count)
+        with metrics.track("user_lookup"):
+            user = await repositories.get_or_create_user(db, firebase_uid, email)
+            
+            # End the read transaction so the pooled connection isn't held while
+            # the request awaits the LLM; attributes stay loaded (expire_on_commit=False)
+            await db.commit()
+        cache_user(user)
         return user
     except Exception as e:
         raise Exception(f"Authentication failed: {str(e)}")
 
+async def get_cached_user(token: str, db: AsyncSession) -> User:
+    """Get a read-only (detached) user, served from the in-process cache when warm
+
+    Use only where the user is not modified; writes must go through
+    get_current_user so they happen on a session-bound instance.
+    """
+    try:
+        with metrics.track("token_verification"):
+            decoded_token = await verify_token(token)
+        firebase_uid = decoded_token.get("uid")
+    except Exception as e:
+        raise Exception(f"Authentication failed: {str(e)}")
+
+    cached = _user_cache.get(firebase_uid)
+    if cached and cached[0] > time.time():
+        metrics.record_cache_lookup("user", "hit")
+        return User(**cached[1])
+    metrics.record_cache_lookup("user", "miss")
+
+    user = await get_current_user(token, db)
+    return User(**{field: getattr(user, field) for field in USER_CACHE_FIELDS})
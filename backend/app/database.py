@@ -1,15 +1,144 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url, Delete, Insert, Update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./resume_assistant.db")
 
+def _async_url(url: str) -> str:
+    # Same database through an asyncio driver: aiosqlite locally, asyncpg in production
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    elif backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed.render_as_string(hide_password=False)
+
+# Request handlers use the async engine; the sync engine remains for schema
+# creation, scripts and benchmarks
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+
+# Connection pool settings (used for Postgres and file-backed SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# How long SQLite waits on a lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+is_sqlite = DATABASE_URL.startswith("sqlite")
+is_sqlite_memory = is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") == "sqlite:")
+
+def _pool_args(pool_size: int, max_overflow: int, asyncio: bool = False) -> dict:
+    if is_sqlite_memory:
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's default pool
+        return {}
+    # aiosqlite defaults to NullPool, i.e. a new connection per checkout
+    pool_class = {"poolclass": AsyncAdaptedQueuePool} if asyncio else {}
+    return {
+        **pool_class,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the writer; NORMAL is durable in WAL mode
+    # apart from the last transactions on power loss
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if is_sqlite else {},
+    **_pool_args(DB_POOL_SIZE, DB_MAX_OVERFLOW)
+)
+
+if is_sqlite and not is_sqlite_memory:
+    event.listen(engine, "connect", _configure_sqlite)
+    # SQLite allows one writer at a time. Funnel all writes through a single
+    # connection so they queue in the pool instead of racing for the file
+    # lock and failing with "database is locked".
+    writer_engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **_pool_args(1, 0)
+    )
+    event.listen(writer_engine, "connect", _configure_sqlite)
+else:
+    writer_engine = engine
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False} if is_sqlite else {},
+    **_pool_args(DB_POOL_SIZE, DB_MAX_OVERFLOW, asyncio=True)
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if is_sqlite and not is_sqlite_memory:
+    event.listen(async_engine.sync_engine, "connect", _configure_sqlite)
+    async_writer_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **_pool_args(1, 0, asyncio=True)
+    )
+    event.listen(async_writer_engine.sync_engine, "connect", _configure_sqlite)
+else:
+    async_writer_engine = async_engine
+
+class RoutingSession(Session):
+    """Session that sends flushes and INSERT/UPDATE/DELETE statements to the writer engine"""
+    read_bind = engine
+    write_bind = writer_engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.write_bind is self.read_bind:
+            return self.read_bind
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return self.write_bind
+        return self.read_bind
+
+class AsyncRoutingSession(RoutingSession):
+    """RoutingSession over the async engines (the sync side of an AsyncSession)"""
+    read_bind = async_engine.sync_engine
+    write_bind = async_writer_engine.sync_engine
+
+# expire_on_commit=False keeps loaded attributes usable after a commit, so a
+# request can release its connection before slow (LLM) work without
+# triggering a reload afterwards
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False
+)
 
 Base = declarative_base()
 
+def get_db():
+    """FastAPI dependency: one session per request, always closed"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    """FastAPI dependency: one async session per request, always closed"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_engines():
+    """Close pooled async connections (used on application shutdown)"""
+    await async_engine.dispose()
+    if async_writer_engine is not async_engine:
+        await async_writer_engine.dispose()
@@ -0,0 +1,47 @@
+import json
+import zlib
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.types import TypeDecorator
+
+# Compact column types for analysis payloads and stored texts. Postgres keeps
+# JSON natively (JSONB is already stored compressed and stays queryable); other
+# databases get zlib-compressed bytes instead of pretty-printed JSON text.
+COMPRESSION_LEVEL = 6
+
+class CompactJSON(TypeDecorator):
+    """JSON value stored as JSONB on Postgres and as zlib-compressed JSON elsewhere"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        serialized = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        return zlib.compress(serialized.encode("utf-8"), COMPRESSION_LEVEL)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return json.loads(zlib.decompress(value).decode("utf-8"))
+
+class CompressedText(TypeDecorator):
+    """Text stored as zlib-compressed UTF-8 bytes"""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
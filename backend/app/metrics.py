@@ -0,0 +1,184 @@
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+
+# Prometheus metrics, served on /metrics. Request handling is split into
+# stages (token verification, scrape, each Gemini call, DB writes...) timed
+# with track(); an observation costs a few microseconds, so this stays on in
+# production. With several worker processes, point PROMETHEUS_MULTIPROC_DIR
+# at an empty shared directory so /metrics aggregates every worker.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by endpoint",
+    ["method", "endpoint", "status"], buckets=LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds", "Latency of one stage of request handling",
+    ["stage"], buckets=LATENCY_BUCKETS
+)
+STAGE_FAILURES = Counter(
+    "stage_failures_total", "Stages that raised, by exception type", ["stage", "reason"]
+)
+LLM_CALLS = Counter(
+    "llm_calls_total", "Gemini calls by model and outcome (ok or exception type)", ["model", "outcome"]
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "Gemini tokens by model and direction (prompt, completion)", ["model", "direction"]
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "Gemini call latency by model and task", ["model", "task"],
+    buckets=LATENCY_BUCKETS
+)
+MODEL_ROUTES = Counter(
+    "model_routes_total",
+    "Gemini calls routed by task, model and reason (preferred, rerouted past an open circuit "
+    "or slow model, failover after an error)",
+    ["task", "model", "reason"]
+)
+MODEL_CIRCUIT_STATE = Gauge(
+    "model_circuit_state", "Circuit breaker state per model: 0 closed, 1 half-open, 2 open",
+    ["model"], multiprocess_mode="max"
+)
+MODEL_CIRCUIT_TRANSITIONS = Counter(
+    "model_circuit_transitions_total", "Circuit breaker state changes per model", ["model", "state"]
+)
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "llm_concurrency_limit", "Adaptive limit on Gemini calls in flight", multiprocess_mode="livesum"
+)
+LLM_IN_FLIGHT = Gauge("llm_in_flight", "Gemini calls in flight", multiprocess_mode="livesum")
+LLM_WAITING = Gauge(
+    "llm_waiting", "Gemini calls waiting for a slot or quota (includes abandoned waits)", multiprocess_mode="livesum"
+)
+LLM_LIMITER_EVENTS = Counter(
+    "llm_limiter_events_total",
+    "Outbound limiter events: concurrency cuts by cause (rate limited, latency spike) and queue timeouts",
+    ["event"]
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+COALESCED_CALLS = Counter(
+    "single_flight_calls_total", "Calls that ran vs. joined an identical in-flight call",
+    ["namespace", "result"]
+)
+SCRAPE_BYTES = Counter("scrape_bytes_total", "Bytes downloaded from job boards")
+SCRAPE_RESPONSES = Counter("scrape_responses_total", "Job board responses by status code", ["status"])
+
+@contextmanager
+def track(stage: str):
+    """Time a block as one stage; exceptions are counted by type and re-raised"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        STAGE_FAILURES.labels(stage, type(e).__name__).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+def record_llm_call(model_name: str, outcome: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+    if not METRICS_ENABLED:
+        return
+    LLM_CALLS.labels(model_name, outcome).inc()
+    if prompt_tokens:
+        LLM_TOKENS.labels(model_name, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(model_name, "completion").inc(completion_tokens)
+
+def observe_llm_latency(model_name: str, task: str, seconds: float):
+    if METRICS_ENABLED:
+        LLM_CALL_SECONDS.labels(model_name, task).observe(seconds)
+
+def record_model_route(task: str, model_name: str, reason: str):
+    if METRICS_ENABLED:
+        MODEL_ROUTES.labels(task, model_name, reason).inc()
+
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+def record_circuit_state(model_name: str, state: str):
+    if METRICS_ENABLED:
+        MODEL_CIRCUIT_STATE.labels(model_name).set(CIRCUIT_STATE_VALUES[state])
+        MODEL_CIRCUIT_TRANSITIONS.labels(model_name, state).inc()
+
+def record_limiter_event(event: str):
+    if METRICS_ENABLED:
+        LLM_LIMITER_EVENTS.labels(event).inc()
+
+def record_cache_lookup(cache: str, result: str):
+    if METRICS_ENABLED:
+        CACHE_LOOKUPS.labels(cache, result).inc()
+
+def record_single_flight(namespace: str, result: str):
+    if METRICS_ENABLED:
+        COALESCED_CALLS.labels(namespace, result).inc()
+
+def render() -> tuple:
+    """Exposition body and content type for /metrics"""
+    registry = REGISTRY
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+class MetricsMiddleware:
+    """Observe the latency of every HTTP request, labelled by route template
+
+    Latency runs until the last body chunk is sent, so streamed responses
+    count their full duration. Unrouted paths share one label to keep the
+    label set bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.route_paths = None  # endpoint function -> route path template
+
+    def _endpoint_label(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self.route_paths is None:
+            self.route_paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self.route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        observed = False
+
+        def observe():
+            nonlocal observed
+            if not observed:
+                observed = True
+                HTTP_REQUEST_SECONDS.labels(
+                    scope["method"], self._endpoint_label(scope), str(status)
+                ).observe(time.perf_counter() - start)
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            observe()
@@ -0,0 +1,34 @@
+import os
+
+from sqlalchemy import inspect
+
+from app.database import engine
+
+# Schema changes are Alembic migrations in backend/migrations. With several
+# app processes, set DB_AUTO_MIGRATE=false and run `alembic upgrade head` once
+# per deploy instead.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+# The schema create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+
+# Alembic is imported on use: with DB_AUTO_MIGRATE=false the app never needs it
+def _config():
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    return config
+
+def upgrade_database():
+    """Apply pending migrations, stamping databases created before migrations existed"""
+    from alembic import command
+
+    config = _config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if "users" in tables and "alembic_version" not in tables:
+            print(f"Stamping existing database at migration {BASELINE_REVISION}")
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
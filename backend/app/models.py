@@ -1,7 +1,14 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Index, case, or_, update
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.database import Base
+from app.db_types import CompactJSON, CompressedText
+
+# Free-tier usage counts reset this long after usage_reset_date
+USAGE_RESET_PERIOD = timedelta(days=30)
+
+# The demo account is never limited
+DEMO_USER_UID = "demo-user-123"
 
 class User(Base):
     __tablename__ = "users"
@@ -26,42 +33,135 @@ class User(Base):
         }
         return limits.get(self.subscription_tier, 3)
     
+    def is_usage_window_expired(self, now=None):
+        now = now or datetime.utcnow()
+        return self.usage_reset_date is None or now > self.usage_reset_date + USAGE_RESET_PERIOD
+    
+    def get_usage_count(self):
+        """Analyses used in the current 30-day window (the reset is computed, not stored)"""
+        if self.firebase_uid == DEMO_USER_UID or self.is_usage_window_expired():
+            return 0
+        return self.usage_count or 0
+    
     def get_remaining_analyses(self):
         if self.subscription_tier != "free":
             return "Unlimited"
         limit = self.get_usage_limit()
-        remaining = limit - self.usage_count
+        remaining = limit - self.get_usage_count()
         return max(0, remaining)
     
     def check_usage_limit(self):
         if self.subscription_tier != "free":
             return True
         
-        # Reset usage count monthly
-        from datetime import datetime, timedelta
-        if datetime.utcnow() > self.usage_reset_date + timedelta(days=30):
-            self.usage_count = 0
-            self.usage_reset_date = datetime.utcnow()
+        return self.get_usage_count() < self.get_usage_limit()
+    
+    def usage_reservation(self, count=1):
+        """UPDATE that atomically counts analyses against the limit, or None if count alone exceeds it
+        
+        A single UPDATE ... WHERE usage_count + count <= limit both checks and
+        increments, so parallel requests can neither lose increments nor
+        overshoot the limit. An expired window is reset in the same statement.
+        It matches one row when the reservation succeeded.
+        """
+        now = datetime.utcnow()
+        cutoff = now - USAGE_RESET_PERIOD
+        expired = or_(User.usage_reset_date.is_(None), User.usage_reset_date < cutoff)
         
-        return self.usage_count < self.get_usage_limit()
+        statement = update(User).where(User.id == self.id).values(
+            usage_count=case((expired, count), else_=User.usage_count + count),
+            usage_reset_date=case((expired, now), else_=User.usage_reset_date),
+            updated_at=now
+        )
+        limit = self.get_usage_limit()
+        if self.subscription_tier == "free" and self.firebase_uid != DEMO_USER_UID:
+            if count > limit:
+                return None
+            statement = statement.where(or_(expired, User.usage_count + count <= limit))
+        return statement.execution_options(synchronize_session=False)
+    
+    def usage_release(self, count=1):
+        """UPDATE giving back analyses reserved for work that failed"""
+        return (
+            update(User)
+            .where(User.id == self.id, User.usage_count >= count)
+            .values(usage_count=User.usage_count - count)
+            .execution_options(synchronize_session=False)
+        )
     
-    def increment_usage(self):
-        self.usage_count += 1
-        self.updated_at = datetime.utcnow()
+    def reserve_usage(self, db, count=1):
+        """Reserve usage through a sync session; returns False if the limit would be exceeded"""
+        statement = self.usage_reservation(count)
+        if statement is None:
+            return False
+        reserved = db.execute(statement).rowcount == 1
+        db.commit()
+        return reserved
+    
+    def release_usage(self, db, count=1):
+        """Release usage through a sync session"""
+        db.execute(self.usage_release(count))
+        db.commit()
     
     def is_pro_user(self):
         return self.subscription_tier in ["pro", "career_plus"]
 
 class ResumeAnalysis(Base):
     __tablename__ = "resume_analyses"
+    __table_args__ = (
+        # History is always "this user's analyses, newest first"
+        Index("ix_resume_analyses_user_id_created_at", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     match_score = Column(Float)
-    suggestions = Column(Text)  # JSON string
-    keywords_missing = Column(Text)  # JSON string
-    keywords_present = Column(Text)  # JSON string
+    # suggestions, keywords_missing, keywords_present, rewritten_sections
+    payload = Column(CompactJSON)
+    # The analyzed texts, deduplicated by content hash
+    resume_hash = Column(String(64), ForeignKey("text_blobs.hash"), nullable=True)
+    job_hash = Column(String(64), ForeignKey("text_blobs.hash"), nullable=True)
+    job_url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="analyses")
+    resume = relationship("TextBlob", foreign_keys=[resume_hash])
+    job = relationship("TextBlob", foreign_keys=[job_hash])
+
 
+class TextBlob(Base):
+    __tablename__ = "text_blobs"
+    
+    hash = Column(String(64), primary_key=True)  # sha256 of the text
+    content = Column(CompressedText)
+    length = Column(Integer)  # characters before compression
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+    
+    key = Column(String, primary_key=True)  # sha256 of prompt + model + config
+    value = Column(Text)  # JSON string
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, index=True)
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        # Startup recovery looks up unfinished jobs
+        Index("ix_analysis_jobs_status_created_at", "status", "created_at"),
+    )
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(String(16), default="queued")  # queued, running, completed, failed
+    request = Column(CompactJSON)  # resume_text, job_url, job_description
+    result = Column(CompactJSON, nullable=True)  # analysis response once completed
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    analysis_id = Column(Integer, ForeignKey("resume_analyses.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,217 @@
+import base64
+import hashlib
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+
+from app.models import User, ResumeAnalysis, TextBlob, AnalysisJob
+
+# Async data access for request handlers. Every call awaits the database
+# driver, so a handler never blocks the event loop on disk or network I/O.
+
+async def get_user_by_uid(db: AsyncSession, firebase_uid: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.firebase_uid == firebase_uid))
+    return result.scalar_one_or_none()
+
+async def get_or_create_user(db: AsyncSession, firebase_uid: str, email: str) -> User:
+    """Load the user, creating a free-tier account on first sign-in"""
+    user = await get_user_by_uid(db, firebase_uid)
+    if user:
+        return user
+
+    user = User(
+        firebase_uid=firebase_uid,
+        email=email,
+        subscription_tier="free",
+        usage_count=0,
+        usage_reset_date=datetime.utcnow()
+    )
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A parallel first request created the user already
+        await db.rollback()
+        return await get_user_by_uid(db, firebase_uid)
+    await db.refresh(user)
+    return user
+
+async def reserve_usage(db: AsyncSession, user: User, count: int = 1) -> bool:
+    """Atomically count analyses against the user's limit; False if it would be exceeded"""
+    statement = user.usage_reservation(count)
+    if statement is None:
+        return False
+    result = await db.execute(statement)
+    await db.commit()
+    return result.rowcount == 1
+
+async def release_usage(db: AsyncSession, user: User, count: int = 1):
+    """Give back analyses reserved for work that failed"""
+    await db.execute(user.usage_release(count))
+    await db.commit()
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+async def store_texts(db: AsyncSession, texts: List[str]) -> List[str]:
+    """Store texts once per distinct content; returns their hashes in order
+    
+    Runs in the caller's transaction (save_analyses commits it).
+    """
+    blobs = {}
+    for text in texts:
+        blobs.setdefault(text_hash(text), text)
+    existing = await db.execute(select(TextBlob.hash).where(TextBlob.hash.in_(list(blobs))))
+    missing = [key for key in blobs if key not in set(existing.scalars().all())]
+    if missing:
+        # A parallel request may store the same text; skip rows that exist by then
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        now = datetime.utcnow()
+        await db.execute(
+            insert(TextBlob).values([
+                {"hash": key, "content": blobs[key], "length": len(blobs[key]), "created_at": now}
+                for key in missing
+            ]).on_conflict_do_nothing(index_elements=["hash"])
+        )
+    return [text_hash(text) for text in texts]
+
+async def save_analyses(db: AsyncSession, analyses: List[ResumeAnalysis]):
+    """Insert analyses in one transaction (ids are populated afterwards)"""
+    db.add_all(analyses)
+    await db.commit()
+
+def analysis_payload(analysis: dict) -> dict:
+    """The stored part of an analysis result (everything but the score)"""
+    return {
+        "suggestions": analysis.get("suggestions", []),
+        "keywords_missing": analysis.get("keywords_missing", []),
+        "keywords_present": analysis.get("keywords_present", []),
+        "rewritten_sections": analysis.get("rewritten_sections", {})
+    }
+
+async def save_analysis_result(
+    db: AsyncSession,
+    user_id: int,
+    analysis: dict,
+    resume_text: str,
+    job_description: str,
+    job_url: Optional[str] = None
+) -> ResumeAnalysis:
+    """Store a finished analysis with its inputs so it can be replayed without the LLM"""
+    resume_hash, job_hash = await store_texts(db, [resume_text, job_description])
+    db_analysis = ResumeAnalysis(
+        user_id=user_id,
+        match_score=analysis["match_score"],
+        payload=analysis_payload(analysis),
+        resume_hash=resume_hash,
+        job_hash=job_hash,
+        job_url=job_url
+    )
+    await save_analyses(db, [db_analysis])
+    return db_analysis
+
+def encode_cursor(analysis: ResumeAnalysis) -> str:
+    """Opaque history cursor pointing just past the given analysis"""
+    raw = f"{analysis.created_at.isoformat()}|{analysis.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(created_at, id) from a history cursor; raises ValueError if it is malformed"""
+    try:
+        created_at, analysis_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(analysis_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+async def list_analyses(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 10,
+    before: Optional[Tuple[datetime, int]] = None
+) -> List[ResumeAnalysis]:
+    """A user's analyses, newest first, optionally starting after a (created_at, id) cursor
+    
+    Keyset pagination on the (user_id, created_at) index, so every page is an
+    index seek no matter how deep. Only the summary columns are loaded; the
+    JSON payloads come from get_analysis.
+    """
+    statement = (
+        select(ResumeAnalysis)
+        .options(load_only(ResumeAnalysis.id, ResumeAnalysis.match_score, ResumeAnalysis.created_at))
+        .where(ResumeAnalysis.user_id == user_id)
+    )
+    if before:
+        created_at, analysis_id = before
+        statement = statement.where(or_(
+            ResumeAnalysis.created_at < created_at,
+            and_(ResumeAnalysis.created_at == created_at, ResumeAnalysis.id < analysis_id)
+        ))
+    result = await db.execute(
+        statement.order_by(ResumeAnalysis.created_at.desc(), ResumeAnalysis.id.desc()).limit(limit)
+    )
+    return list(result.scalars().all())
+
+async def get_analysis(db: AsyncSession, user_id: int, analysis_id: int) -> Optional[ResumeAnalysis]:
+    """One of the user's analyses with its stored payload and texts"""
+    result = await db.execute(
+        select(ResumeAnalysis)
+        .options(joinedload(ResumeAnalysis.resume), joinedload(ResumeAnalysis.job))
+        .where(ResumeAnalysis.id == analysis_id, ResumeAnalysis.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+async def create_job(db: AsyncSession, user_id: int, request: dict) -> AnalysisJob:
+    job = AnalysisJob(id=uuid.uuid4().hex, user_id=user_id, status="queued", request=request, attempts=0)
+    db.add(job)
+    await db.commit()
+    return job
+
+async def get_job(db: AsyncSession, job_id: str, user_id: Optional[int] = None) -> Optional[AnalysisJob]:
+    """A job by id, optionally only if it belongs to user_id"""
+    statement = select(AnalysisJob).where(AnalysisJob.id == job_id).execution_options(populate_existing=True)
+    if user_id is not None:
+        statement = statement.where(AnalysisJob.user_id == user_id)
+    result = await db.execute(statement)
+    return result.scalar_one_or_none()
+
+async def claim_job(db: AsyncSession, job_id: str) -> bool:
+    """Atomically move a queued job to running; False if another worker got it first"""
+    result = await db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+        .values(status="running", attempts=AnalysisJob.attempts + 1, started_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def update_job(db: AsyncSession, job_id: str, **values):
+    await db.execute(
+        update(AnalysisJob).where(AnalysisJob.id == job_id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+async def delete_job(db: AsyncSession, job_id: str):
+    job = await db.get(AnalysisJob, job_id)
+    if job:
+        await db.delete(job)
+        await db.commit()
+
+async def list_unfinished_jobs(db: AsyncSession, running_started_before: datetime) -> List[AnalysisJob]:
+    """Queued jobs, plus running jobs whose worker has evidently gone away"""
+    result = await db.execute(
+        select(AnalysisJob)
+        .where(or_(
+            AnalysisJob.status == "queued",
+            and_(AnalysisJob.status == "running", AnalysisJob.started_at < running_started_before)
+        ))
+        .order_by(AnalysisJob.created_at)
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+# Response models shared between the API and the services that produce them
+
+class ResumeAnalysisResponse(BaseModel):
+    match_score: float
+    suggestions: List[str]
+    rewritten_sections: dict
+    keywords_missing: List[str]
+    keywords_present: List[str]
@@ -1,103 +1,219 @@
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+import asyncio
 import os
 import json
+import inspect
+import threading
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
+from app import metrics
+from app.schemas import ResumeAnalysisResponse
+from app.services import keyword_matcher, llm_cache, llm_client, model_router, prompt_builder
 
 load_dotenv()
 
-# Configure Gemini API
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("GEMINI_API_KEY environment variable is required. Please set it in your .env file.")
-genai.configure(api_key=api_key)
+# The Gemini SDK takes over half a second to import (it pulls in IPython), so
+# it is imported and configured on first use, normally by the model discovery
+# task at startup, instead of when the app is imported
+_genai = None
+_genai_lock = threading.Lock()
 
-# Cache the model name to avoid querying API on every request
-_cached_model_name = None
+def _sdk():
+    """The configured google.generativeai module"""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable is required. Please set it in your .env file.")
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
 
-# Helper function to get available model
-def get_available_model():
-    """Get the first available Gemini model"""
-    global _cached_model_name
-    
-    # Return cached model if available
-    if _cached_model_name:
-        return _cached_model_name
+# Configure safety settings to allow content (disable blocking). Names rather
+# than SDK enums, so defining them doesn't import the SDK.
+SAFETY_SETTINGS = {
+    "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
+    "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
+    "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
+    "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
+}
+
+# Generation settings shared by the blocking and streaming variants so both
+# produce the same cache key for the same prompt
+REWRITE_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 500,
+}
+COVER_LETTER_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "max_output_tokens": 800,
+}
+
+# Single-shot analysis: score, keywords, suggestions and the section rewrites
+# come back in one JSON response instead of one call per part
+SINGLE_SHOT_ANALYSIS = os.getenv("SINGLE_SHOT_ANALYSIS", "false").lower() == "true"
+SINGLE_SHOT_GENERATION_CONFIG = {
+    "temperature": 0.4,
+    "max_output_tokens": 2000,
+}
+
+@lru_cache(maxsize=1)
+def json_mode_supported() -> bool:
+    """Newer SDKs can constrain the output to JSON; older ones rely on the prompt"""
+    return "response_mime_type" in inspect.signature(_sdk().GenerationConfig).parameters
+
+# Model discovery. The model list is fetched in the background at startup and
+# every GEMINI_MODEL_REFRESH_SECONDS and handed to model_router, which picks
+# the model for each call; requests never wait on it. A failed listing keeps
+# the last one, and a model the API reports as gone or forbidden has its
+# circuit opened for GEMINI_MODEL_UNAVAILABLE_SECONDS while the list is
+# fetched again.
+MODEL_REFRESH_SECONDS = int(os.getenv("GEMINI_MODEL_REFRESH_SECONDS", "3600"))
+MODEL_UNAVAILABLE_SECONDS = int(os.getenv("GEMINI_MODEL_UNAVAILABLE_SECONDS", "600"))
+# Retry delay after a failed listing
+MODEL_DISCOVERY_RETRY_SECONDS = 60
+
+# Order of the listed models that no task prefers
+PREFERRED_MODELS = [
+    'models/gemini-2.5-flash',  # Stable, fast
+    'models/gemini-2.0-flash-001',  # Stable
+    'models/gemini-flash-latest',  # Latest
+    'models/gemini-2.5-flash-lite',  # Lightweight
+    'models/gemini-2.5-pro',  # More capable
+    'models/gemini-pro-latest'  # Latest pro
+]
+
+_listed_models = []  # usable models from the last listing, best first
+_models = {}  # model name -> GenerativeModel with the shared safety settings
+_discovery_task = None
+_rediscover = None  # asyncio.Event that cuts the refresh wait short
+
+def get_model(model_name: str):
+    """A reusable GenerativeModel for model_name, created once per process"""
+    model = _models.get(model_name)
+    if model is None:
+        model = _models[model_name] = _sdk().GenerativeModel(model_name, safety_settings=SAFETY_SETTINGS)
+    return model
+
+def refresh_models() -> list:
+    """List the models this API key can use and hand them to the router (blocking)"""
+    global _listed_models
+    names = [
+        model.name for model in _sdk().list_models()
+        if 'generateContent' in (getattr(model, 'supported_generation_methods', None) or [])
+    ]
+    candidates = [name for name in PREFERRED_MODELS if name in names]
+    candidates += [name for name in names if name not in PREFERRED_MODELS and 'gemini' in name.lower()]
+    if not candidates:
+        raise Exception("No Gemini model supports generateContent")
+    model_router.set_models(candidates)
+    routes = model_router.current_models()
+    if candidates != _listed_models:
+        print(f"Gemini models by task: {routes}")
+        _listed_models = candidates
+    # Build the routed models now so the first requests don't
+    for model_name in set(routes.values()):
+        if model_name:
+            get_model(model_name)
+    return candidates
+
+def report_model_unavailable(model_name: str, error: Exception):
+    """Stop routing to a model the API says is gone or forbidden, and list the models again"""
+    if not model_router.trip(model_name, MODEL_UNAVAILABLE_SECONDS):
+        return
+    print(f"Gemini model {model_name} unavailable ({error.__class__.__name__}); routing around it")
+    if _rediscover is not None:
+        _rediscover.set()
+
+async def _model_discovery_loop():
+    while True:
+        try:
+            await asyncio.to_thread(refresh_models)
+            delay = MODEL_REFRESH_SECONDS
+        except Exception as e:
+            print(f"Error listing models: {e}")
+            delay = MODEL_DISCOVERY_RETRY_SECONDS
+        try:
+            await asyncio.wait_for(_rediscover.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        _rediscover.clear()
+
+def start_model_discovery():
+    """Start the background model discovery task (called on startup)"""
+    global _discovery_task, _rediscover
+    if not os.getenv("GEMINI_API_KEY"):
+        print("GEMINI_API_KEY is not set; AI features will fall back to keyword scoring")
+        return
+    if _discovery_task is None:
+        _rediscover = asyncio.Event()
+        _discovery_task = asyncio.get_running_loop().create_task(_model_discovery_loop())
+
+def stop_model_discovery():
+    """Cancel the background model discovery task (called on shutdown)"""
+    global _discovery_task, _rediscover
+    if _discovery_task is not None:
+        _discovery_task.cancel()
+        _discovery_task = None
+        _rediscover = None
+
+async def _load_model(model_name: str):
+    """get_model, off the event loop when the SDK or the model isn't loaded yet"""
+    model = _models.get(model_name)
+    if model is None:
+        # Only before the startup warm-up has finished
+        model = await asyncio.to_thread(get_model, model_name)
+    return model
+
+def _fail_over(task: str, models: list, attempt: int, error: Exception) -> bool:
+    """Whether a call that failed on models[attempt] should move on to the next model"""
+    model_name = models[attempt]
+    if llm_client.is_model_unavailable_error(error):
+        report_model_unavailable(model_name, error)
+    if attempt + 1 >= len(models) or not llm_client.is_model_failure(error):
+        return False
+    print(f"Gemini model {model_name} failed ({error.__class__.__name__}); failing over to {models[attempt + 1]}")
+    metrics.record_model_route(task, models[attempt + 1], "failover")
+    return True
+
+async def _generate(task: str, models: list, prompt: str, generation_config: dict) -> tuple:
+    """One Gemini call for task on the routed models, failing over when a model fails
     
-    try:
-        # List available models from API and find a working one
-        # Convert to list immediately to avoid iterator issues
+    Returns the response and the name of the model that produced it.
+    """
+    for attempt, model_name in enumerate(models):
+        if not model_router.claim(model_name):
+            # Another call is already making this model's trial call
+            continue
         try:
-            models_iter = genai.list_models()
-            models_list = [m for m in models_iter]
-        except Exception as list_error:
-            print(f"Error listing models: {list_error}")
-            _cached_model_name = 'models/gemini-2.5-flash'
-            return _cached_model_name
-        
-        if not models_list or len(models_list) == 0:
-            # No models available, use fallback
-            _cached_model_name = 'models/gemini-2.5-flash'
-            return _cached_model_name
-        
-        preferred_models = [
-            'models/gemini-2.5-flash',  # Stable, fast
-            'models/gemini-2.0-flash-001',  # Stable
-            'models/gemini-flash-latest',  # Latest
-            'models/gemini-2.5-flash-lite',  # Lightweight
-            'models/gemini-2.5-pro',  # More capable
-            'models/gemini-pro-latest'  # Latest pro
-        ]
-        
-        # Try preferred models first
-        for pref_model in preferred_models:
-            for i, model in enumerate(models_list):
-                try:
-                    if hasattr(model, 'name') and model.name == pref_model:
-                        if hasattr(model, 'supported_generation_methods'):
-                            methods = model.supported_generation_methods
-                            if methods and 'generateContent' in methods:
-                                _cached_model_name = pref_model
-                                return pref_model
-                except (IndexError, AttributeError) as e:
-                    print(f"Error checking model {i}: {e}")
-                    continue
-        
-        # Fallback: Get first available Gemini model
-        for i, model in enumerate(models_list):
-            try:
-                if hasattr(model, 'name') and hasattr(model, 'supported_generation_methods'):
-                    name = model.name
-                    methods = model.supported_generation_methods
-                    if methods and 'generateContent' in methods and 'gemini' in name.lower():
-                        _cached_model_name = name
-                        return name
-            except (IndexError, AttributeError) as e:
-                print(f"Error checking fallback model {i}: {e}")
-                continue
-        
-        # Last resort fallback
-        _cached_model_name = 'models/gemini-2.5-flash'
-        return _cached_model_name
-    except Exception as e:
-        import traceback
-        print(f"Error getting model: {e}")
-        print(traceback.format_exc())
-        # Last resort fallback
-        _cached_model_name = 'models/gemini-2.5-flash'
-        return _cached_model_name
+            response = await llm_client.generate_content(
+                await _load_model(model_name),
+                prompt,
+                task=task,
+                # Failing over beats retrying the same model; the last one retries
+                retries=0 if attempt + 1 < len(models) else None,
+                generation_config=generation_config
+            )
+            return response, model_name
+        except Exception as e:
+            if not _fail_over(task, models, attempt, e):
+                raise
+    raise model_router.NoModelAvailable(f"Every Gemini model for {task} is failing or on a trial call")
+
+def fallback_analysis(resume_text: str, job_description: str, message: str) -> dict:
+    """Score the resume locally when the Gemini analysis is unavailable"""
+    result = keyword_matcher.score_resume(resume_text, job_description)
+    result["suggestions"] = [message] + result["suggestions"]
+    return result
 
 async def analyze_resume_match(resume_text: str, job_description: str) -> dict:
     """Analyze resume against job description using Gemini"""
     
-    # Limit text length to avoid token limits
-    # Gemini has limits, so truncate if too long
-    max_resume_length = 5000
-    max_job_length = 3000
-    
-    truncated_resume = resume_text[:max_resume_length] if len(resume_text) > max_resume_length else resume_text
-    truncated_job = job_description[:max_job_length] if len(job_description) > max_job_length else job_description
+    # Pack the most relevant parts of both texts into the analysis token budget
+    truncated_resume, truncated_job = prompt_builder.analysis_inputs(resume_text, job_description)
     
     prompt = f"""Analyze this resume against the job description and provide:
 1. A match score (0-100)
@@ -126,25 +242,22 @@ Return your response as JSON with this structure:
 Return ONLY valid JSON, no other text."""
     
     try:
-        # Get available model dynamically
-        model_name = get_available_model()
-        model = genai.GenerativeModel(model_name)
-        # Configure safety settings to allow content (disable blocking)
-        safety_settings = {
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+        # The models to try for this task, best first
+        models = model_router.route("analysis")
+        generation_config = {
+            "temperature": 0.3,
+            "max_output_tokens": 1000,
         }
         
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.3,
-                "max_output_tokens": 1000,
-            },
-            safety_settings=safety_settings
-        )
+        # Serve repeated prompts from the response cache
+        cache_key = llm_cache.make_key(prompt, models[0], generation_config)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        response, model_name = await _generate("analysis", models, prompt, generation_config)
+        # After a failover the answer is cached under the model that gave it
+        cache_key = llm_cache.make_key(prompt, model_name, generation_config)
         
         # Extract text from response - response.text should work
         # If it raises IndexError, it means the response is blocked/empty
@@ -204,6 +317,7 @@ Return ONLY valid JSON, no other text."""
                 result['keywords_missing'] = []
             if 'keywords_present' not in result:
                 result['keywords_present'] = []
+            await llm_cache.put(cache_key, result)
             return result
         except json.JSONDecodeError as e:
             # Try to extract JSON from response using regex
@@ -223,6 +337,7 @@ Return ONLY valid JSON, no other text."""
                         result['keywords_missing'] = []
                     if 'keywords_present' not in result:
                         result['keywords_present'] = []
+                    await llm_cache.put(cache_key, result)
                     return result
                 except Exception as parse_error:
                     raise Exception(f"Could not parse extracted JSON: {str(parse_error)}")
@@ -241,94 +356,170 @@ Return ONLY valid JSON, no other text."""
         except:
             pass
         
-        # Fallback to basic analysis
-        return {
-            "match_score": 70.0,
-            "keywords_missing": [],
-            "keywords_present": [],
-            "suggestions": [f"Error parsing AI response. Please try again."]
-        }
+        # Fallback to local keyword analysis
+        return fallback_analysis(
+            resume_text, job_description, "Error parsing AI response. Please try again."
+        )
     except Exception as e:
-        # Fallback to basic analysis
-        return {
-            "match_score": 70.0,
-            "keywords_missing": [],
-            "keywords_present": [],
-            "suggestions": [f"Error in AI analysis: {str(e)}. Please try again."]
-        }
+        if llm_client.should_raise(e):
+            raise
+        # Fallback to local keyword analysis
+        return fallback_analysis(
+            resume_text, job_description, f"Error in AI analysis: {str(e)}. Please try again."
+        )
 
-async def rewrite_section(section: str, resume_text: str, job_description: str) -> str:
-    """Rewrite a resume section using Gemini"""
+def build_single_shot_prompt(resume_text: str, job_description: str, sections: dict) -> str:
+    """Build the prompt for a combined analysis and section rewrite"""
+    resume_context, job_context = prompt_builder.analysis_inputs(resume_text, job_description)
+    section_blocks = "\n\n".join(f'Section "{name}":\n{text}' for name, text in sections.items())
+    example = json.dumps({
+        "match_score": 85,
+        "keywords_missing": ["Docker", "AWS"],
+        "keywords_present": ["Python", "React"],
+        "suggestions": ["Include Docker in your technical skills"],
+        "rewritten_sections": {name: "..." for name in sections}
+    })
     
-    prompt = f"""You are a professional resume writer. Rewrite the following resume section to better match this job description.
+    return f"""You are a professional resume writer. Analyze this resume against the job description, then rewrite each listed resume section to better match the job while keeping it truthful.
+
+Resume:
+{resume_context}
+
+Job Description:
+{job_context}
+
+Sections to rewrite:
+{section_blocks}
+
+Return one JSON object with:
+- "match_score": a number from 0 to 100
+- "keywords_missing": job keywords the resume should add
+- "keywords_present": job keywords the resume already has
+- "suggestions": specific improvement suggestions
+- "rewritten_sections": each section name above mapped to its rewritten text
+
+Example:
+{example}
+
+Return ONLY valid JSON, no other text."""
+
+async def analyze_resume_single_shot(resume_text: str, job_description: str, sections: dict) -> dict:
+    """Analyze the resume and rewrite sections in one Gemini call
+    
+    Raises if the response can't be validated as a ResumeAnalysisResponse;
+    callers fall back to the separate calls.
+    """
+    prompt = build_single_shot_prompt(resume_text, job_description, sections)
+    models = model_router.route("single_shot")
+    generation_config = dict(SINGLE_SHOT_GENERATION_CONFIG)
+    if json_mode_supported():
+        generation_config["response_mime_type"] = "application/json"
+    
+    cache_key = llm_cache.make_key(prompt, models[0], generation_config)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    response, model_name = await _generate("single_shot", models, prompt, generation_config)
+    # After a failover the answer is cached under the model that gave it
+    cache_key = llm_cache.make_key(prompt, model_name, generation_config)
+    
+    try:
+        content = response.text.strip()
+    except (ValueError, IndexError, AttributeError) as e:
+        raise Exception(f"Response blocked or empty: {str(e)}")
+    # Without JSON mode the model may still wrap the object in a code block
+    if content.startswith("```"):
+        content = content.strip("`").removeprefix("json").strip()
+    
+    result = ResumeAnalysisResponse.model_validate_json(content)
+    analysis = result.model_dump()
+    analysis["match_score"] = max(0.0, min(100.0, result.match_score))
+    # A section the model skipped keeps its original text
+    analysis["rewritten_sections"] = {
+        name: str(result.rewritten_sections.get(name) or text) for name, text in sections.items()
+    }
+    await llm_cache.put(cache_key, analysis)
+    return analysis
+
+def build_rewrite_prompt(section: str, resume_text: str, job_description: str) -> str:
+    """Build the prompt for rewriting a resume section"""
+    resume_context, job_context = prompt_builder.rewrite_inputs(section, resume_text, job_description)
+    return f"""You are a professional resume writer. Rewrite the following resume section to better match this job description.
 Make it more compelling and aligned with the job requirements while keeping it truthful.
 
 Current Resume Section:
 {section}
 
 Full Resume Context:
-{resume_text[:1000]}
+{resume_context}
 
 Job Description:
-{job_description}
+{job_context}
 
 Return only the rewritten section, no explanations."""
+
+async def rewrite_section(section: str, resume_text: str, job_description: str) -> str:
+    """Rewrite a resume section using Gemini"""
+    
+    prompt = build_rewrite_prompt(section, resume_text, job_description)
     
     try:
-        # Get available model dynamically
-        model_name = get_available_model()
-        model = genai.GenerativeModel(model_name)
-        # Configure safety settings to allow content (disable blocking)
-        safety_settings = {
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
+        # The models to try for this task, best first
+        models = model_router.route("rewrite")
+        generation_config = REWRITE_GENERATION_CONFIG
         
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "max_output_tokens": 500,
-            },
-            safety_settings=safety_settings
-        )
+        # Serve repeated prompts from the response cache
+        cache_key = llm_cache.make_key(prompt, models[0], generation_config)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        response, model_name = await _generate("rewrite", models, prompt, generation_config)
+        # After a failover the answer is cached under the model that gave it
+        cache_key = llm_cache.make_key(prompt, model_name, generation_config)
         
         # Extract text from response
+        text = ""
         try:
-            return response.text.strip()
+            text = response.text.strip()
         except AttributeError:
             # Fallback through candidates
             try:
                 if hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0:
                     candidate = response.candidates[0]
                     if hasattr(candidate, 'content') and candidate.content.parts and len(candidate.content.parts) > 0:
-                        return candidate.content.parts[0].text.strip()
+                        text = candidate.content.parts[0].text.strip()
             except (IndexError, AttributeError) as e:
                 return f"Error extracting text: {str(e)}"
+        if text:
+            await llm_cache.put(cache_key, text)
+            return text
         return f"Error: Could not extract text from Gemini response"
         
     except Exception as e:
+        if llm_client.should_raise(e):
+            raise
         return f"Error rewriting section: {str(e)}"
 
-async def generate_cover_letter(
+def build_cover_letter_prompt(
     resume_text: str,
     job_description: str,
     recipient_name: Optional[str] = None,
     company_name: Optional[str] = None
 ) -> str:
-    """Generate a cover letter using Gemini"""
+    """Build the prompt for generating a cover letter"""
     
     greeting = f"Dear {recipient_name}," if recipient_name else "Dear Hiring Manager,"
+    resume_context, job_context = prompt_builder.cover_letter_inputs(resume_text, job_description)
     
-    prompt = f"""You are a professional cover letter writer. Write a compelling cover letter for this job application.
+    return f"""You are a professional cover letter writer. Write a compelling cover letter for this job application.
 
 Resume:
-{resume_text[:2000]}
+{resume_context}
 
 Job Description:
-{job_description}
+{job_context}
 
 Recipient: {recipient_name or "Hiring Manager"}
 Company: {company_name or "Company"}
@@ -340,43 +531,110 @@ Write a compelling cover letter that:
 4. Is professional but personable
 
 Start with: {greeting}"""
+
+async def generate_cover_letter(
+    resume_text: str,
+    job_description: str,
+    recipient_name: Optional[str] = None,
+    company_name: Optional[str] = None
+) -> str:
+    """Generate a cover letter using Gemini"""
+    
+    prompt = build_cover_letter_prompt(resume_text, job_description, recipient_name, company_name)
     
     try:
-        # Get available model dynamically
-        model_name = get_available_model()
-        model = genai.GenerativeModel(model_name)
+        # The models to try for this task, best first
+        models = model_router.route("cover_letter")
+        generation_config = COVER_LETTER_GENERATION_CONFIG
         
-        # Configure safety settings to allow content (disable blocking)
-        safety_settings = {
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
+        # Serve repeated prompts from the response cache
+        cache_key = llm_cache.make_key(prompt, models[0], generation_config)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "max_output_tokens": 800,
-            },
-            safety_settings=safety_settings
-        )
+        response, model_name = await _generate("cover_letter", models, prompt, generation_config)
+        # After a failover the answer is cached under the model that gave it
+        cache_key = llm_cache.make_key(prompt, model_name, generation_config)
         
         # Extract text from response
+        text = ""
         try:
-            return response.text.strip()
+            text = response.text.strip()
         except (AttributeError, IndexError) as e:
             # Fallback through candidates
             try:
                 if hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0:
                     candidate = response.candidates[0]
                     if hasattr(candidate, 'content') and candidate.content.parts and len(candidate.content.parts) > 0:
-                        return candidate.content.parts[0].text.strip()
+                        text = candidate.content.parts[0].text.strip()
             except (IndexError, AttributeError) as fallback_error:
                 return f"Error extracting text: {str(e)} (fallback: {str(fallback_error)})"
+        if text:
+            await llm_cache.put(cache_key, text)
+            return text
         return f"Error: Could not extract text from Gemini response"
         
     except Exception as e:
         return f"Error generating cover letter: {str(e)}"
 
+async def stream_text(task: str, prompt: str, generation_config: dict):
+    """Stream generated text chunks for a prompt, caching the assembled text
+    
+    A model that fails before sending anything fails over to the next one.
+    """
+    models = model_router.route(task)
+    
+    # A cached result is sent as a single chunk
+    cache_key = llm_cache.make_key(prompt, models[0], generation_config)
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    for attempt, model_name in enumerate(models):
+        if not model_router.claim(model_name):
+            # Another call is already making this model's trial call
+            continue
+        chunks = []
+        try:
+            async for chunk in llm_client.stream_content(
+                await _load_model(model_name),
+                prompt,
+                task=task,
+                generation_config=generation_config
+            ):
+                # Blocked or empty chunks raise on .text; skip them
+                try:
+                    text = chunk.text
+                except (ValueError, IndexError, AttributeError):
+                    continue
+                if text:
+                    chunks.append(text)
+                    yield text
+            break
+        except Exception as e:
+            if chunks or not _fail_over(task, models, attempt, e):
+                raise
+    else:
+        raise model_router.NoModelAvailable(f"Every Gemini model for {task} is failing or on a trial call")
+    
+    full_text = "".join(chunks).strip()
+    if not full_text:
+        raise Exception("Could not extract text from Gemini response")
+    await llm_cache.put(llm_cache.make_key(prompt, model_name, generation_config), full_text)
+
+def stream_rewrite_section(section: str, resume_text: str, job_description: str):
+    """Stream a rewritten resume section from Gemini"""
+    prompt = build_rewrite_prompt(section, resume_text, job_description)
+    return stream_text("rewrite", prompt, REWRITE_GENERATION_CONFIG)
+
+def stream_cover_letter(
+    resume_text: str,
+    job_description: str,
+    recipient_name: Optional[str] = None,
+    company_name: Optional[str] = None
+):
+    """Stream a cover letter from Gemini"""
+    prompt = build_cover_letter_prompt(resume_text, job_description, recipient_name, company_name)
+    return stream_text("cover_letter", prompt, COVER_LETTER_GENERATION_CONFIG)
@@ -0,0 +1,243 @@
+import asyncio
+import os
+import random
+from collections import deque
+from datetime import datetime, timedelta
+
+import httpx
+
+from app import metrics, repositories
+from app.database import AsyncSessionLocal
+from app.models import AnalysisJob, User
+from app.services import job_scraper, llm_client, llm_limiter, resume_analyzer
+
+# Background analyses. Jobs are persisted in the analysis_jobs table, so no
+# external broker is needed and unfinished jobs survive a restart; scheduling
+# happens in-process. Users take turns (round robin), so one user's burst
+# can't starve everyone else, and the total and per-user queue depth are
+# bounded so overload turns into 429s instead of unbounded waits.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "200"))
+JOB_QUEUE_MAX_PER_USER = int(os.getenv("JOB_QUEUE_MAX_PER_USER", "10"))
+# Attempts per job for transient failures, with exponential backoff between
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2.0"))
+# Extra attempts for each Gemini call made by a job (see llm_client). A job
+# whose calls still fail is retried as a whole or fails; it never completes
+# with the keyword-scoring fallback interactive requests get
+JOB_LLM_RETRIES = int(os.getenv("JOB_LLM_RETRIES", "3"))
+# A job "running" for longer than this at startup lost its worker; run it again
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "600"))
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+_queues = {}  # user_id -> deque of job ids
+_rotation = deque()  # user ids with queued jobs, in turn order
+_depth = 0
+_available = None  # counts queued jobs; workers wait on it
+_workers = []
+_watchers = {}  # job_id -> set of asyncio.Queue receiving status updates
+
+class QueueFull(Exception):
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _retry_after() -> int:
+    # Rough time for the backlog to drain one worker-slot's worth
+    return max(1, min(60, _depth // max(1, JOB_WORKERS)))
+
+def check_capacity(user_id: int):
+    """Raise QueueFull if a new job from user_id would exceed the queue bounds"""
+    if _depth >= JOB_QUEUE_MAX_DEPTH:
+        raise QueueFull("Analysis queue is full. Please try again shortly.", _retry_after())
+    if len(_queues.get(user_id, ())) >= JOB_QUEUE_MAX_PER_USER:
+        raise QueueFull(
+            f"You already have {JOB_QUEUE_MAX_PER_USER} analyses queued. Please wait for them to finish.",
+            _retry_after()
+        )
+
+def enqueue(user_id: int, job_id: str, force: bool = False):
+    """Queue a job for a worker; raises QueueFull unless force (recovery and retries)"""
+    global _depth, _available
+    if not force:
+        check_capacity(user_id)
+    if user_id not in _queues:
+        _queues[user_id] = deque()
+        _rotation.append(user_id)
+    _queues[user_id].append(job_id)
+    _depth += 1
+    if _available is None:
+        _available = asyncio.Semaphore(0)
+    _available.release()
+
+def _next_job():
+    """Pop the next job id, taking users in round-robin order"""
+    global _depth
+    user_id = _rotation.popleft()
+    queue = _queues[user_id]
+    job_id = queue.popleft()
+    if queue:
+        _rotation.append(user_id)
+    else:
+        del _queues[user_id]
+    _depth -= 1
+    return job_id
+
+def queue_stats() -> dict:
+    return {
+        "depth": _depth,
+        "users_waiting": len(_rotation),
+        "max_depth": JOB_QUEUE_MAX_DEPTH,
+        "max_per_user": JOB_QUEUE_MAX_PER_USER,
+        "workers": len(_workers)
+    }
+
+def job_status(job: AnalysisJob) -> dict:
+    """Client-facing view of a job"""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "analysis_id": job.analysis_id,
+        "result": job.result,
+        "error": job.error
+    }
+
+def watch(job_id: str) -> asyncio.Queue:
+    """Subscribe to status updates for a job (see unwatch)"""
+    queue = asyncio.Queue()
+    _watchers.setdefault(job_id, set()).add(queue)
+    return queue
+
+def unwatch(job_id: str, queue: asyncio.Queue):
+    watchers = _watchers.get(job_id)
+    if watchers:
+        watchers.discard(queue)
+        if not watchers:
+            del _watchers[job_id]
+
+def _publish(job: AnalysisJob):
+    for queue in _watchers.get(job.id, ()):
+        queue.put_nowait(job_status(job))
+
+def _is_transient(exc: BaseException) -> bool:
+    """Gemini overload/rate limits or network trouble, anywhere in the exception chain"""
+    while exc is not None:
+        if llm_client.is_transient_error(exc) or isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+async def _analyze(request: dict) -> tuple:
+    job_description = request.get("job_description")
+    if request.get("job_url") and not job_description:
+        job_description = await job_scraper.scrape_job_description(request["job_url"])
+    if not job_description:
+        raise Exception("Job description is required")
+    analysis = await resume_analyzer.analyze_resume(
+        resume_text=request["resume_text"],
+        job_description=job_description
+    )
+    return analysis, job_description
+
+async def _requeue_cancelled(job_id: str, attempts: int):
+    async with AsyncSessionLocal() as db:
+        await repositories.update_job(db, job_id, status="queued", attempts=max(0, attempts - 1))
+
+async def _run_job(job_id: str):
+    async with AsyncSessionLocal() as db:
+        if not await repositories.claim_job(db, job_id):
+            return
+        job = await repositories.get_job(db, job_id)
+        _publish(job)
+        # Read now: the rollback after a failure expires the loaded job
+        user_id, attempts = job.user_id, job.attempts
+        if job.attempts == 1 and metrics.METRICS_ENABLED:
+            metrics.STAGE_SECONDS.labels("job_queue_wait").observe(
+                (job.started_at - job.created_at).total_seconds()
+            )
+
+        try:
+            user = await db.get(User, job.user_id)
+            tier = user.subscription_tier if user else "free"
+            with llm_client.retry_transient_errors(JOB_LLM_RETRIES), llm_client.raise_transient_errors():
+                with llm_limiter.tier_priority(tier), metrics.track("job_analysis"):
+                    analysis, job_description = await _analyze(job.request)
+            db_analysis = await repositories.save_analysis_result(
+                db, job.user_id, analysis, job.request["resume_text"], job_description, job.request.get("job_url")
+            )
+            result = {
+                key: analysis[key] for key in (
+                    "match_score", "suggestions", "rewritten_sections", "keywords_missing", "keywords_present"
+                )
+            }
+            await repositories.update_job(
+                db, job_id, status="completed", result=result, analysis_id=db_analysis.id,
+                error=None, finished_at=datetime.utcnow()
+            )
+        except asyncio.CancelledError:
+            # Shutting down: hand the job to the next process start
+            await asyncio.shield(_requeue_cancelled(job_id, attempts))
+            raise
+        except Exception as e:
+            await db.rollback()
+            if _is_transient(e) and attempts < JOB_MAX_ATTEMPTS:
+                delay = JOB_RETRY_BASE_DELAY * (2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+                print(f"Analysis job {job_id} failed transiently ({e}); retrying in {delay:.1f}s")
+                await repositories.update_job(db, job_id, status="queued", error=str(e))
+                asyncio.get_running_loop().call_later(delay, enqueue, user_id, job_id, True)
+            else:
+                print(f"Analysis job {job_id} failed: {e}")
+                await repositories.update_job(
+                    db, job_id, status="failed", error=str(e), finished_at=datetime.utcnow()
+                )
+                # The analysis was reserved at submission; give it back
+                user = await db.get(User, user_id)
+                if user:
+                    await repositories.release_usage(db, user)
+
+        _publish(await repositories.get_job(db, job_id))
+
+async def _worker():
+    while True:
+        await _available.acquire()
+        job_id = _next_job()
+        try:
+            await _run_job(job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error running analysis job {job_id}: {e}")
+
+async def start():
+    """Re-queue unfinished jobs from the database and start the workers (called on startup)"""
+    global _available
+    if _available is None:
+        _available = asyncio.Semaphore(0)
+
+    async with AsyncSessionLocal() as db:
+        stale_before = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        for job in await repositories.list_unfinished_jobs(db, stale_before):
+            if job.status == "running":
+                await repositories.update_job(db, job.id, status="queued")
+            enqueue(job.user_id, job.id, force=True)
+
+    loop = asyncio.get_running_loop()
+    for _ in range(JOB_WORKERS - len(_workers)):
+        _workers.append(loop.create_task(_worker()))
+
+async def stop():
+    """Cancel the workers; jobs they were running go back to queued (called on shutdown)"""
+    global _available, _depth
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queues.clear()
+    _rotation.clear()
+    _depth = 0
+    _available = None
@@ -0,0 +1,136 @@
+import asyncio
+import io
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# PDF/DOCX parsing is CPU-bound and can take seconds on odd files, so it runs
+# on a bounded process pool instead of the event loop. Large PDFs are split
+# into page ranges that are extracted in parallel.
+EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_MAX_BYTES = int(os.getenv("EXTRACT_MAX_BYTES", str(10 * 1024 * 1024)))
+EXTRACT_MAX_PAGES = int(os.getenv("EXTRACT_MAX_PAGES", "30"))
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "20"))
+# Pages handled per worker task; PDFs longer than this are parallelized
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+
+_pool = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn avoids forking a process that already runs worker threads
+        _pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+def _reset_pool(pool: ProcessPoolExecutor = None, kill: bool = False):
+    """Drop a broken or stuck pool so the next extraction starts a fresh one
+
+    kill terminates the pool's workers first: a worker still parsing a file
+    after its timeout would otherwise keep its CPU and its slot.
+    """
+    global _pool
+    pool = pool or _pool
+    if pool is None:
+        return
+    if kill:
+        # Other extractions running on it fail too; they retry on the new pool
+        pool.killed_for_timeout = True
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+    # After a kill, queued work fails as BrokenProcessPool (and is retried)
+    # rather than being cancelled under its caller
+    pool.shutdown(wait=False, cancel_futures=not kill)
+    if _pool is pool:
+        _pool = None
+
+# PyPDF2 and python-docx are imported where they're used: the parsing runs in
+# the pool's worker processes, so the API process never needs them
+
+def _open_pdf(source):
+    import PyPDF2
+
+    # Files on disk are memory-mapped so workers share the page cache instead
+    # of each holding its own copy of the bytes
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return PyPDF2.PdfReader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return PyPDF2.PdfReader(io.BytesIO(source))
+
+def _source_size(source) -> int:
+    return os.path.getsize(source) if isinstance(source, str) else len(source)
+
+def _extract_pdf_pages(source, start: int, end: int) -> tuple:
+    """Return (page_count, texts of pages start..end) (runs in a worker process)"""
+    reader = _open_pdf(source)
+    page_count = len(reader.pages)
+    texts = [reader.pages[i].extract_text() or "" for i in range(start, min(end, page_count))]
+    return page_count, texts
+
+def _extract_docx(source) -> str:
+    """Return the paragraph text of a DOCX file (runs in a worker process)"""
+    from docx import Document
+
+    doc = Document(source if isinstance(source, str) else io.BytesIO(source))
+    return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+
+async def _extract_pdf(pool: ProcessPoolExecutor, source) -> str:
+    loop = asyncio.get_running_loop()
+
+    # The first task also reports the page count
+    page_count, texts = await loop.run_in_executor(
+        pool, _extract_pdf_pages, source, 0, PDF_PAGES_PER_TASK
+    )
+    if page_count > EXTRACT_MAX_PAGES:
+        raise Exception(f"PDF has {page_count} pages; the limit is {EXTRACT_MAX_PAGES}")
+
+    if page_count > PDF_PAGES_PER_TASK:
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(pool, _extract_pdf_pages, source, start, start + PDF_PAGES_PER_TASK)
+            for start in range(PDF_PAGES_PER_TASK, page_count, PDF_PAGES_PER_TASK)
+        ])
+        for _, chunk_texts in chunks:
+            texts.extend(chunk_texts)
+
+    return "\n".join(texts)
+
+async def _extract_docx_on(pool: ProcessPoolExecutor, source) -> str:
+    return await asyncio.get_running_loop().run_in_executor(pool, _extract_docx, source)
+
+async def _run_extraction(kind: str, extract, source) -> str:
+    """Run extract(pool, source) within EXTRACT_TIMEOUT, killing the workers if it overruns"""
+    for attempt in range(2):
+        pool = _get_pool()
+        try:
+            return await asyncio.wait_for(extract(pool, source), timeout=EXTRACT_TIMEOUT)
+        except asyncio.TimeoutError:
+            # Giving up on the future leaves the worker parsing; stop it
+            _reset_pool(pool, kill=True)
+            raise Exception(f"{kind} extraction timed out after {EXTRACT_TIMEOUT}s")
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            if attempt == 0 and getattr(pool, "killed_for_timeout", False):
+                # Killed for another file's timeout, not because of this one
+                continue
+            raise Exception(f"{kind} extraction worker crashed")
+
+async def extract_pdf_text(source) -> str:
+    """Extract text from PDF bytes or a file path within the size, page and time budgets"""
+    if _source_size(source) > EXTRACT_MAX_BYTES:
+        raise Exception(f"File is larger than {EXTRACT_MAX_BYTES // (1024 * 1024)} MB")
+    return await _run_extraction("PDF", _extract_pdf, source)
+
+async def extract_docx_text(source) -> str:
+    """Extract text from DOCX bytes or a file path within the size and time budgets"""
+    if _source_size(source) > EXTRACT_MAX_BYTES:
+        raise Exception(f"File is larger than {EXTRACT_MAX_BYTES // (1024 * 1024)} MB")
+    return await _run_extraction("DOCX", _extract_docx_on, source)
+
+def shutdown():
+    """Stop the extraction process pool (used on application shutdown)"""
+    _reset_pool()
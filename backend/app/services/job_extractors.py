@@ -0,0 +1,205 @@
+import html as html_lib
+import json
+import re
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+import lxml.html
+from lxml import etree
+
+# Job description extraction engine. Extractors run in order and the first
+# one returning a substantial text wins:
+#   1. JSON-LD JobPosting data (regex over the raw page, no DOM needed)
+#   2. Site-specific XPaths for the major job boards
+#   3. The generic "description" class/id heuristic
+# The lxml tree is built at most once per page and only when needed.
+
+# A valid job description should be substantial
+MIN_DESCRIPTION_LENGTH = 200
+
+_JSON_LD_RE = re.compile(
+    rb'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Host suffix -> XPaths pointing straight at the description node
+SITE_XPATHS = {
+    "linkedin.com": [
+        "//div[contains(@class, 'show-more-less-html__markup')]",
+        "//div[contains(@class, 'description__text')]",
+    ],
+    "indeed.com": ["//div[@id='jobDescriptionText']"],
+    "greenhouse.io": [
+        "//div[contains(@class, 'job__description')]",
+        "//div[@id='content']",
+    ],
+    "lever.co": [
+        "//div[@data-qa='job-description']",
+        "//div[contains(@class, 'posting-page')]//div[contains(@class, 'section-wrapper')]",
+    ],
+    "glassdoor.com": [
+        "//div[contains(@class, 'jobDescriptionContent')]",
+        "//div[@id='JobDescriptionContainer']",
+    ],
+    "myworkdayjobs.com": ["//div[@data-automation-id='jobPostingDescription']"],
+    "ashbyhq.com": ["//div[contains(@class, '_descriptionText')]"],
+    "smartrecruiters.com": ["//div[@itemprop='description']"],
+}
+
+# Same selectors as the original BeautifulSoup heuristic, in priority order
+HEURISTIC_XPATHS = [
+    "//div[contains(@class, 'job-description')]",
+    "//div[contains(@class, 'jobDescription')]",
+    "//div[contains(@class, 'description')]",
+    "//div[contains(@id, 'description')]",
+    "//section[contains(@class, 'description')]",
+    "//div[contains(@data-testid, 'description')]",
+]
+
+# Elements that start a new line in the extracted text, so prompt building can
+# tell headings, list items and menus apart
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+    "section", "table", "td", "th", "tr", "ul",
+}
+
+_compiled_site_xpaths = {
+    host: [etree.XPath(xpath) for xpath in xpaths] for host, xpaths in SITE_XPATHS.items()
+}
+_compiled_heuristic_xpaths = [etree.XPath(xpath) for xpath in HEURISTIC_XPATHS]
+
+class Page:
+    """Raw page plus a lazily parsed lxml tree shared by all extractors"""
+
+    def __init__(self, html: bytes, url: Optional[str] = None):
+        self.html = html
+        self.url = url
+        self._tree = None
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.url).netloc.lower() if self.url else ""
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            try:
+                self._tree = lxml.html.fromstring(self.html)
+            except (etree.ParserError, ValueError):
+                # Empty or whitespace-only document
+                self._tree = lxml.html.fromstring("<html></html>")
+            # Drop script and style elements (and their text) once for everyone
+            etree.strip_elements(self._tree, "script", "style", etree.Comment, with_tail=False)
+        return self._tree
+
+def node_text(node) -> str:
+    """Text of an element, one line per block element, with a space between pieces on a line"""
+    lines = []
+    line = []
+
+    def add(text):
+        if text and text.strip():
+            line.append(text.strip())
+
+    def end_line():
+        if line:
+            lines.append(" ".join(line))
+            line.clear()
+
+    for event, elem in etree.iterwalk(node, events=("start", "end")):
+        is_element = isinstance(elem.tag, str)
+        if event == "start":
+            if is_element and elem.tag in BLOCK_TAGS:
+                end_line()
+            if is_element:
+                add(elem.text)
+        else:
+            if is_element and elem.tag in BLOCK_TAGS:
+                end_line()
+            if elem is not node:
+                add(elem.tail)
+    end_line()
+    return "\n".join(lines)
+
+def _html_fragment_text(fragment: str) -> str:
+    fragment = html_lib.unescape(fragment)
+    if "<" not in fragment:
+        return fragment
+    return node_text(lxml.html.fragment_fromstring(fragment, create_parent="div"))
+
+def _find_job_posting(data):
+    if isinstance(data, list):
+        for item in data:
+            found = _find_job_posting(item)
+            if found:
+                return found
+    elif isinstance(data, dict):
+        types = data.get("@type")
+        if types == "JobPosting" or (isinstance(types, list) and "JobPosting" in types):
+            return data
+        if "@graph" in data:
+            return _find_job_posting(data["@graph"])
+    return None
+
+def extract_json_ld(page: Page) -> Optional[str]:
+    """Description from schema.org JobPosting JSON-LD"""
+    for match in _JSON_LD_RE.finditer(page.html):
+        try:
+            posting = _find_job_posting(json.loads(match.group(1)))
+        except ValueError:
+            continue
+        if not posting or not isinstance(posting.get("description"), str):
+            continue
+
+        parts = []
+        for field in ("title", "description", "responsibilities", "qualifications", "skills"):
+            value = posting.get(field)
+            if isinstance(value, str) and value.strip():
+                parts.append(_html_fragment_text(value))
+        return "\n".join(parts)
+    return None
+
+def extract_site_specific(page: Page) -> Optional[str]:
+    """Description node for known job boards"""
+    host = page.host
+    for suffix, xpaths in _compiled_site_xpaths.items():
+        if host == suffix or host.endswith("." + suffix):
+            for xpath in xpaths:
+                elements = xpath(page.tree)
+                if elements:
+                    return "\n".join(node_text(elem) for elem in elements)
+    return None
+
+def extract_heuristic(page: Page) -> Optional[str]:
+    """Elements whose class/id mentions "description", else the whole page"""
+    for xpath in _compiled_heuristic_xpaths:
+        elements = xpath(page.tree)
+        if elements:
+            text = "\n".join(node_text(elem) for elem in elements)
+            if len(text) > MIN_DESCRIPTION_LENGTH:
+                return text
+
+    # Fallback: get all text
+    return node_text(page.tree)
+
+EXTRACTORS: List[Callable[[Page], Optional[str]]] = [
+    extract_json_ld,
+    extract_site_specific,
+    extract_heuristic,
+]
+
+def register_extractor(extractor: Callable[[Page], Optional[str]], position: int = 0):
+    """Add an extractor; by default it runs before the built-in ones"""
+    EXTRACTORS.insert(position, extractor)
+
+def extract(html: bytes, url: Optional[str] = None) -> str:
+    """Run the extractors in order and return the first substantial text"""
+    page = Page(html, url)
+    last = None
+    for extractor in EXTRACTORS:
+        text = extractor(page)
+        if text and len(text) > MIN_DESCRIPTION_LENGTH:
+            return text
+        last = text or last
+    return last or ""
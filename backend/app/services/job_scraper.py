@@ -1,52 +1,132 @@
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from collections import OrderedDict
+from urllib.parse import urlparse
+import asyncio
+import os
 import re
+import time
+
+from app import metrics
+from app.services import job_extractors, single_flight
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "10"))
+# Maximum simultaneous fetches against a single job board
+SCRAPE_PER_HOST_CONCURRENCY = int(os.getenv("SCRAPE_PER_HOST_CONCURRENCY", "4"))
+# Cleaned job text is cached per URL; after the TTL the entry is revalidated
+# with ETag / Last-Modified instead of being downloaded and parsed again
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", "3600"))
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "512"))
+
+_client = None
+_client_loop = None
+_host_semaphores = {}
+_cache = OrderedDict()  # url -> {"text", "etag", "last_modified", "expires_at"}
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared keep-alive client, recreated if the event loop changed"""
+    global _client, _client_loop, _host_semaphores
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=SCRAPE_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+        _client_loop = loop
+        _host_semaphores = {}
+    return _client
+
+def _get_host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlparse(url).netloc.lower()
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(SCRAPE_PER_HOST_CONCURRENCY)
+    return _host_semaphores[host]
+
+def _cache_store(url: str, entry: dict):
+    _cache[url] = entry
+    _cache.move_to_end(url)
+    while len(_cache) > SCRAPE_CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
 
 async def scrape_job_description(job_url: str) -> str:
     """Scrape job description from common job board URLs"""
-    
+    # Concurrent requests for the same URL share one fetch
+    return await single_flight.run(single_flight.make_key("scrape", job_url), lambda: _scrape(job_url))
+
+async def _scrape(job_url: str) -> str:
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(job_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Try to find job description in common class names
-        job_selectors = [
-            'div[class*="job-description"]',
-            'div[class*="jobDescription"]',
-            'div[class*="description"]',
-            'div[id*="description"]',
-            'section[class*="description"]',
-            'div[data-testid*="description"]'
-        ]
-        
-        for selector in job_selectors:
-            elements = soup.select(selector)
-            if elements:
-                text = " ".join([elem.get_text(separator=" ", strip=True) for elem in elements])
-                if len(text) > 200:  # Valid job description should be substantial
-                    return clean_text(text)
-        
-        # Fallback: get all text
-        text = soup.get_text(separator=" ", strip=True)
-        return clean_text(text)
-        
+        cached = _cache.get(job_url)
+        if cached and cached["expires_at"] > time.time():
+            _cache.move_to_end(job_url)
+            metrics.record_cache_lookup("scrape", "hit")
+            return cached["text"]
+
+        # Revalidate a stale entry instead of refetching it unconditionally
+        headers = {}
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        with metrics.track("scrape_fetch"):
+            async with _get_host_semaphore(job_url):
+                response = await _get_client().get(job_url, headers=headers)
+        if metrics.METRICS_ENABLED:
+            metrics.SCRAPE_RESPONSES.labels(str(response.status_code)).inc()
+            metrics.SCRAPE_BYTES.inc(len(response.content))
+
+        if cached and response.status_code == 304:
+            metrics.record_cache_lookup("scrape", "revalidated")
+            text = cached["text"]
+            # A 304 may omit the validators; keep the ones we already have
+            etag = response.headers.get("ETag") or cached["etag"]
+            last_modified = response.headers.get("Last-Modified") or cached["last_modified"]
+        else:
+            metrics.record_cache_lookup("scrape", "miss")
+            response.raise_for_status()
+            # Parsing is CPU-bound; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            with metrics.track("scrape_parse"):
+                text = await loop.run_in_executor(
+                    None, extract_job_description, response.content, str(response.url)
+                )
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+
+        _cache_store(job_url, {
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": time.time() + SCRAPE_CACHE_TTL
+        })
+        return text
+
     except Exception as e:
         raise Exception(f"Error scraping job description: {str(e)}")
 
+def extract_job_description(html: bytes, url: str = None) -> str:
+    """Extract the job description text from a job posting page"""
+    return clean_text(job_extractors.extract(html, url))
+
+async def close():
+    """Close the shared HTTP client (used on application shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 def clean_text(text: str) -> str:
-    """Clean and normalize scraped text"""
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
+    """Clean and normalize scraped text, keeping one line per paragraph or list item"""
+    # Remove excessive whitespace; line breaks stay for prompt_builder, which
+    # drops navigation and boilerplate line by line
+    text = re.sub(r'[^\S\n]+', ' ', text)
+    text = re.sub(r' ?\n[\s]*', '\n', text)
     # Remove special characters but keep punctuation
     text = re.sub(r'[^\w\s.,;:!?()\-]', '', text)
     return text.strip()
-
@@ -0,0 +1,268 @@
+import math
+import re
+from collections import Counter
+
+# Local, deterministic resume scoring. Skills are matched against a curated
+# lexicon and the remaining job vocabulary is scored with BM25, so a match
+# score and keyword lists are available in a few milliseconds without Gemini.
+
+# Canonical skill name -> aliases (lowercase, as they appear in text). Only
+# aliases are matched, so skills named by everyday words ("go", "react",
+# "ruby", "agile", "monitoring") are only listed in forms prose doesn't use.
+SKILL_LEXICON = {
+    # Languages
+    "Python": ["python", "python3"],
+    "Java": ["java ee", "jakarta ee", "jdk", "jvm", "core java", "java programming"],
+    "JavaScript": ["javascript", "ecmascript", "es6"],
+    "TypeScript": ["typescript"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "Go": ["golang"],
+    "Rust": ["rustlang", "rust-lang", "rust programming"],
+    "Ruby": ["ruby programming", "ruby gems", "rubygems"],
+    "PHP": ["php"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swiftui", "swift programming", "ios swift", "swift ios"],
+    "Scala": ["scala"],
+    "SQL": ["sql"],
+    "Bash": ["bash scripting", "bash scripts", "shell scripting"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    # Frameworks and libraries
+    "React": ["react.js", "reactjs", "react hooks"],
+    "React Native": ["react native"],
+    "Angular": ["angularjs", "angular.js", "angular framework"],
+    "Vue.js": ["vue.js", "vuejs"],
+    "Next.js": ["next.js", "nextjs"],
+    "Node.js": ["node.js", "nodejs"],
+    "Express.js": ["express.js", "expressjs"],
+    "Django": ["django"],
+    "Flask": ["python flask", "flask framework", "flask api", "flask apis"],
+    "FastAPI": ["fastapi"],
+    "Spring Boot": ["spring boot", "spring framework", "spring mvc"],
+    "Ruby on Rails": ["ruby on rails", "rails framework"],
+    ".NET": [".net", "dotnet", "asp.net"],
+    "Tailwind CSS": ["tailwindcss", "tailwind css"],
+    "Redux": ["redux"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful", "restful api", "restful apis"],
+    "gRPC": ["grpc"],
+    "Pandas": ["python pandas", "pandas library", "pandas dataframe", "pandas dataframes"],
+    "NumPy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "Spark": ["apache spark", "pyspark", "spark sql"],
+    "Hadoop": ["hadoop"],
+    "Kafka": ["apache kafka", "kafka streams", "kafka topics"],
+    "Airflow": ["apache airflow", "airflow dags"],
+    # Data stores
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql"],
+    "SQLite": ["sqlite"],
+    "MongoDB": ["mongodb"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search"],
+    "DynamoDB": ["dynamodb"],
+    "Snowflake": ["snowflake data warehouse", "snowflake sql", "snowflake schema", "snowflakedb"],
+    "BigQuery": ["bigquery"],
+    # Cloud and infrastructure
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure", "microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Linux": ["linux"],
+    "CI/CD": ["ci/cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Jenkins": ["jenkins ci", "jenkins pipeline", "jenkins pipelines"],
+    "GitHub Actions": ["github actions"],
+    "Git": ["github", "gitlab", "git version control", "version control"],
+    "Microservices": ["microservices", "microservice"],
+    "Serverless": ["serverless", "lambda functions"],
+    "Nginx": ["nginx"],
+    # Data, AI and analytics
+    "Machine Learning": ["machine learning", "ml models", "ml engineering"],
+    "Deep Learning": ["deep learning"],
+    "NLP": ["nlp", "natural language processing"],
+    "Computer Vision": ["computer vision"],
+    "LLMs": ["llm", "llms", "large language models", "generative ai", "genai"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Data Engineering": ["data engineering", "etl", "data pipelines"],
+    "Statistics": ["statistical analysis", "statistical modeling", "statistical modelling"],
+    "Tableau": ["tableau desktop", "tableau server", "tableau dashboards"],
+    "Power BI": ["power bi", "powerbi"],
+    "Excel": ["microsoft excel", "ms excel", "excel spreadsheets"],
+    # Practices
+    "Agile": ["agile methodology", "agile methodologies", "agile development", "scrum", "kanban"],
+    "Test Automation": ["test automation", "automated testing", "unit testing", "tdd"],
+    "System Design": ["system design", "distributed systems"],
+    "Security": ["cybersecurity", "application security", "information security", "network security"],
+    "Observability": ["observability", "prometheus", "grafana", "datadog"],
+    "UI/UX Design": ["ui/ux design", "ui/ux", "ux design", "ui design", "user experience", "figma"],
+    "Product Management": ["product management"],
+    "Project Management": ["project management", "pmp"],
+    "Stakeholder Management": ["stakeholder management"],
+    "Leadership": ["leadership", "team lead", "mentoring", "mentorship"],
+    "Communication": ["communication skills"],
+    "SEO": ["seo", "search engine optimization"],
+    "Salesforce": ["salesforce"],
+    "Stripe": ["stripe api", "stripe payments"],
+    "Firebase": ["firebase"],
+}
+
+STOPWORDS = {
+    "a", "about", "above", "across", "after", "all", "also", "an", "and", "any", "are", "as", "at",
+    "be", "been", "being", "both", "but", "by", "can", "could", "do", "does", "each", "etc", "for",
+    "from", "have", "has", "how", "if", "in", "into", "is", "it", "its", "may", "more", "most", "must",
+    "new", "not", "of", "on", "or", "other", "our", "out", "over", "own", "per", "plus", "should",
+    "so", "such", "than", "that", "the", "their", "them", "then", "there", "these", "they", "this",
+    "through", "to", "up", "us", "use", "using", "very", "was", "we", "well", "were", "what", "when",
+    "where", "which", "while", "who", "will", "with", "within", "work", "working", "would", "you",
+    "your", "years", "year", "experience", "experienced", "strong", "ability", "able", "including",
+    "team", "teams", "role", "job", "position", "company", "candidate", "candidates", "skills",
+    "knowledge", "understanding", "required", "requirements", "preferred", "responsibilities",
+    "qualifications", "looking", "join", "help", "build", "building", "environment",
+}
+
+# Everyday words that also name skills. They aren't skills on their own (see
+# SKILL_LEXICON) and don't count as shared vocabulary either: a resume
+# mentioning a ruby ring has nothing in common with a job asking for Ruby
+AMBIGUOUS_SKILL_WORDS = {
+    "agile", "airflow", "angular", "bash", "communication", "excel", "flask", "git", "go", "java",
+    "jenkins", "js", "kafka", "lambda", "ml", "mongo", "monitoring", "node", "pandas", "rails", "react",
+    "roadmap", "roadmaps", "ruby", "rust", "security", "snowflake", "spark", "spring", "stakeholders",
+    "statistics", "stripe", "swift", "tableau", "tailwind", "ts", "vue",
+}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Share of the final score coming from lexicon skills vs. general vocabulary
+SKILL_WEIGHT = 0.7
+
+MAX_KEYWORDS = 15
+MAX_SUGGESTIONS = 5
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[./\-][a-z0-9+#]+)*|\.[a-z]+")
+_SENTENCE_RE = re.compile(r"[\n\r.;!?•]+(?:\s|$)|\n")
+_COMPOUND_RE = re.compile(r"[./\-]")
+
+def _raw_tokens(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+def _build_index(lexicon: dict) -> tuple:
+    """Map alias token tuples to canonical skill names"""
+    index = {}
+    for canonical, aliases in lexicon.items():
+        for alias in aliases:
+            index[tuple(_raw_tokens(alias))] = canonical
+    return index, max(len(key) for key in index)
+
+_SKILL_INDEX, _MAX_NGRAM = _build_index(SKILL_LEXICON)
+
+def tokenize(text: str) -> list:
+    """Lowercase text and split it into tokens, keeping skill spellings like c++ or node.js"""
+    tokens = []
+    for token in _raw_tokens(text):
+        if (token,) in _SKILL_INDEX or not _COMPOUND_RE.search(token):
+            tokens.append(token)
+        else:
+            # Split compound tokens such as "python/django" that aren't skills themselves
+            tokens.extend(part for part in _COMPOUND_RE.split(token) if part)
+    return tokens
+
+def extract_skills(tokens: list) -> Counter:
+    """Count lexicon skills in a token list, preferring the longest n-gram match"""
+    skills = Counter()
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_MAX_NGRAM, len(tokens) - i), 0, -1):
+            canonical = _SKILL_INDEX.get(tuple(tokens[i:i + n]))
+            if canonical:
+                skills[canonical] += 1
+                i += n
+                break
+        else:
+            i += 1
+    return skills
+
+def _content_terms(tokens: list) -> list:
+    return [
+        t for t in tokens
+        if t not in STOPWORDS and t not in AMBIGUOUS_SKILL_WORDS and len(t) > 1 and not t.isdigit()
+    ]
+
+def _split_sentences(text: str) -> list:
+    return [s for s in _SENTENCE_RE.split(text) if s.strip()]
+
+def _bm25_overlap(resume_tokens: list, job_terms: Counter, sentence_docs: list) -> float:
+    """Weighted share of job vocabulary covered by the resume, in [0, 1]
+
+    IDF is computed over the sentences of both texts, so words repeated in
+    every sentence (boilerplate) weigh less than distinctive requirements.
+    """
+    if not job_terms:
+        return 0.0
+
+    doc_count = len(sentence_docs)
+    doc_freq = Counter()
+    for doc in sentence_docs:
+        doc_freq.update(set(doc))
+    avg_len = sum(len(doc) for doc in sentence_docs) / max(doc_count, 1) or 1
+
+    resume_terms = Counter(_content_terms(resume_tokens))
+    # Treat the resume as one long document normalized against an average sentence
+    length_norm = 1 - BM25_B + BM25_B * min(len(resume_tokens) / (avg_len * 20), 3)
+
+    score = 0.0
+    total = 0.0
+    for term, job_tf in job_terms.items():
+        idf = math.log(1 + (doc_count - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+        weight = idf * (1 + math.log(job_tf))
+        total += weight
+        tf = resume_terms.get(term, 0)
+        if tf:
+            saturation = tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+            score += weight * min(1.0, saturation)
+    return score / total if total else 0.0
+
+def score_resume(resume_text: str, job_description: str) -> dict:
+    """Score a resume against a job description without calling the LLM"""
+    resume_tokens = tokenize(resume_text)
+    job_tokens = tokenize(job_description)
+
+    resume_skills = extract_skills(resume_tokens)
+    job_skills = extract_skills(job_tokens)
+
+    # Skills mentioned more often in the job description count for more
+    skill_weights = {skill: 1 + math.log(count) for skill, count in job_skills.items()}
+    ranked_skills = sorted(skill_weights, key=lambda s: (-skill_weights[s], s))
+    present = [s for s in ranked_skills if s in resume_skills]
+    missing = [s for s in ranked_skills if s not in resume_skills]
+
+    sentence_docs = [
+        _content_terms(tokenize(sentence))
+        for sentence in _split_sentences(resume_text) + _split_sentences(job_description)
+    ]
+    term_overlap = _bm25_overlap(resume_tokens, Counter(_content_terms(job_tokens)), sentence_docs)
+
+    if skill_weights:
+        skill_coverage = sum(skill_weights[s] for s in present) / sum(skill_weights.values())
+        score = SKILL_WEIGHT * skill_coverage + (1 - SKILL_WEIGHT) * term_overlap
+    else:
+        score = term_overlap
+
+    suggestions = [
+        f"Add {skill} to your resume if you have experience with it"
+        for skill in missing[:MAX_SUGGESTIONS]
+    ]
+
+    return {
+        "match_score": round(100 * score, 1),
+        "keywords_present": present[:MAX_KEYWORDS],
+        "keywords_missing": missing[:MAX_KEYWORDS],
+        "suggestions": suggestions
+    }
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from app import metrics
+from app.database import AsyncSessionLocal
+from app.models import LLMCacheEntry
+
+# Cache of finished Gemini results keyed by a hash of the normalized prompt,
+# the model name and the generation config. The in-process LRU tier is always
+# on; the SQLite tier survives restarts and is shared between workers.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"
+LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "10000"))
+
+_memory = OrderedDict()  # key -> (expires_at, json value)
+_lock = threading.Lock()
+_stats = {
+    "memory_hits": 0,
+    "persistent_hits": 0,
+    "misses": 0,
+    "sets": 0,
+    "evictions": 0,
+    "expirations": 0,
+    "errors": 0
+}
+
+def make_key(prompt: str, model_name: str, generation_config: dict) -> str:
+    """Build a content-addressed cache key for an LLM call"""
+    normalized_prompt = " ".join(prompt.split())
+    payload = json.dumps({
+        "prompt": normalized_prompt,
+        "model": model_name,
+        "config": generation_config
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _memory_get(key: str):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del _memory[key]
+            _stats["expirations"] += 1
+            return None
+        _memory.move_to_end(key)
+        return value
+
+def _memory_set(key: str, value: str, expires_at: float):
+    with _lock:
+        _memory[key] = (expires_at, value)
+        _memory.move_to_end(key)
+        while len(_memory) > LLM_CACHE_MAX_ENTRIES:
+            _memory.popitem(last=False)
+            _stats["evictions"] += 1
+
+async def _db_get(key: str):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(LLMCacheEntry).where(
+            LLMCacheEntry.key == key,
+            LLMCacheEntry.expires_at > datetime.utcnow()
+        ))
+        entry = result.scalar_one_or_none()
+        if not entry:
+            return None
+        return entry.value, (entry.expires_at - datetime.utcnow()).total_seconds()
+
+async def _db_set(key: str, value: str, ttl: int):
+    async with AsyncSessionLocal() as db:
+        try:
+            now = datetime.utcnow()
+            await db.merge(LLMCacheEntry(
+                key=key,
+                value=value,
+                created_at=now,
+                expires_at=now + timedelta(seconds=ttl)
+            ))
+            await db.flush()
+            # Drop expired rows, then trim the oldest rows past the size bound
+            await db.execute(
+                delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now)
+                .execution_options(synchronize_session=False)
+            )
+            stale_keys = select(LLMCacheEntry.key).order_by(
+                LLMCacheEntry.created_at.desc()
+            ).offset(LLM_CACHE_DB_MAX_ENTRIES)
+            await db.execute(
+                delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(stale_keys.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+async def get(key: str):
+    """Return the cached value for key, or None on a miss"""
+    if not LLM_CACHE_ENABLED:
+        return None
+    
+    value = _memory_get(key)
+    if value is not None:
+        _stats["memory_hits"] += 1
+        metrics.record_cache_lookup("llm", "memory_hit")
+        return json.loads(value)
+    
+    if LLM_CACHE_PERSIST:
+        try:
+            row = await _db_get(key)
+        except Exception as e:
+            print(f"Error reading LLM cache: {e}")
+            _stats["errors"] += 1
+            row = None
+        if row:
+            value, remaining = row
+            # Promote to the memory tier for the rest of its lifetime
+            _memory_set(key, value, time.time() + remaining)
+            _stats["persistent_hits"] += 1
+            metrics.record_cache_lookup("llm", "persistent_hit")
+            return json.loads(value)
+    
+    _stats["misses"] += 1
+    metrics.record_cache_lookup("llm", "miss")
+    return None
+
+async def put(key: str, value, ttl: int = None):
+    """Store a JSON-serializable value under key"""
+    if not LLM_CACHE_ENABLED:
+        return
+    
+    ttl = ttl or LLM_CACHE_TTL
+    serialized = json.dumps(value)
+    _memory_set(key, serialized, time.time() + ttl)
+    _stats["sets"] += 1
+    
+    if LLM_CACHE_PERSIST:
+        try:
+            await _db_set(key, serialized, ttl)
+        except Exception as e:
+            print(f"Error writing LLM cache: {e}")
+            _stats["errors"] += 1
+
+def clear():
+    """Empty the in-process tier"""
+    with _lock:
+        _memory.clear()
+
+def get_stats() -> dict:
+    """Hit/miss counters and tier sizes"""
+    hits = _stats["memory_hits"] + _stats["persistent_hits"]
+    lookups = hits + _stats["misses"]
+    return {
+        **_stats,
+        "hits": hits,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "memory_entries": len(_memory),
+        "memory_max_entries": LLM_CACHE_MAX_ENTRIES,
+        "persistent": LLM_CACHE_PERSIST,
+        "ttl_seconds": LLM_CACHE_TTL,
+        "enabled": LLM_CACHE_ENABLED
+    }
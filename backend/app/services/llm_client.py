@@ -0,0 +1,230 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from google.api_core import exceptions as google_exceptions
+
+from app import metrics
+from app.services import llm_limiter, model_router, prompt_builder
+
+# Maximum number of Gemini calls allowed in flight per worker process.
+# The SDK's generate_content is blocking, so calls run on a bounded thread
+# pool instead of the event loop. llm_limiter decides when a call may start
+# (adaptive concurrency up to this maximum, per-minute quotas, tier priority).
+LLM_MAX_CONCURRENCY = llm_limiter.LLM_MAX_CONCURRENCY
+
+_executor = ThreadPoolExecutor(
+    max_workers=LLM_MAX_CONCURRENCY,
+    thread_name_prefix="gemini"
+)
+
+# Rate limits (429), overload and timeouts on Google's side
+RATE_LIMIT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+)
+OVERLOAD_ERRORS = RATE_LIMIT_ERRORS + (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+)
+# Errors worth retrying: the above, and our own back-pressure
+TRANSIENT_ERRORS = OVERLOAD_ERRORS + (
+    # Every model's circuit is open; worth retrying once one lets calls through
+    model_router.NoModelAvailable,
+    llm_limiter.LimiterTimeout,
+)
+# Retries back off exponentially from LLM_RETRY_BASE_DELAY up to
+# LLM_RETRY_MAX_DELAY, with full jitter so retries from one burst spread out
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20.0"))
+
+# Interactive requests retry LLM_RETRIES times (then fail over or fall back);
+# background work opts into more with retry_transient_errors()
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "1"))
+_retry_attempts = ContextVar("llm_retry_attempts", default=LLM_RETRIES)
+# Interactive requests degrade to local scoring when Gemini keeps failing;
+# background jobs retry the whole analysis instead (raise_transient_errors())
+_raise_transient = ContextVar("llm_raise_transient", default=False)
+
+# Errors that mean the model itself can't be used (retired, or not enabled
+# for this key), as opposed to a bad request
+MODEL_UNAVAILABLE_ERRORS = (
+    google_exceptions.NotFound,
+    google_exceptions.PermissionDenied,
+)
+
+def is_transient_error(exc: BaseException) -> bool:
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+def is_model_unavailable_error(exc: BaseException) -> bool:
+    return isinstance(exc, MODEL_UNAVAILABLE_ERRORS)
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return isinstance(exc, RATE_LIMIT_ERRORS)
+
+def is_model_failure(exc: BaseException) -> bool:
+    """Errors that say the model is struggling or gone, rather than the request being bad"""
+    return isinstance(exc, OVERLOAD_ERRORS) or is_model_unavailable_error(exc)
+
+@contextmanager
+def retry_transient_errors(attempts: int):
+    """Retry transient Gemini errors up to `attempts` extra times with backoff within this block"""
+    token = _retry_attempts.set(attempts)
+    try:
+        yield
+    finally:
+        _retry_attempts.reset(token)
+
+@contextmanager
+def raise_transient_errors():
+    """Make the fallbacks re-raise transient Gemini errors and timeouts within this block"""
+    token = _raise_transient.set(True)
+    try:
+        yield
+    finally:
+        _raise_transient.reset(token)
+
+def raising_transient_errors() -> bool:
+    return _raise_transient.get()
+
+def should_raise(exc: BaseException) -> bool:
+    """Whether a fallback should re-raise exc instead of degrading (see raise_transient_errors)"""
+    return _raise_transient.get() and isinstance(exc, TRANSIENT_ERRORS + (asyncio.TimeoutError,))
+
+def _token_counts(prompt, response) -> tuple:
+    """Prompt and completion tokens, from usage metadata when the SDK reports it"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        return usage.prompt_token_count, usage.candidates_token_count
+    try:
+        text = response.text
+    except (ValueError, IndexError, AttributeError):
+        text = ""
+    return prompt_builder.estimate_tokens(str(prompt)), prompt_builder.estimate_tokens(text)
+
+def _estimated_tokens(prompt, kwargs: dict) -> int:
+    """Tokens a call may use, for the per-minute token quota: the prompt plus the most it can generate"""
+    generation_config = kwargs.get("generation_config") or {}
+    return prompt_builder.estimate_tokens(str(prompt)) + int(generation_config.get("max_output_tokens", 0))
+
+def _outcome(exc: BaseException = None) -> str:
+    if exc is None:
+        return "ok"
+    return "rate_limited" if is_rate_limit_error(exc) else "error"
+
+def _finish(ticket: tuple, model_name: str, task: str, seconds: float, exc: BaseException = None,
+            tokens_used: int = None):
+    # Runs on the worker thread, so a call its caller stopped waiting for
+    # (timeout) still holds its slot and counts with its real duration
+    # Rate limits are the limiter's to absorb, not a sign the model is failing
+    failed = exc is not None and is_model_failure(exc) and not is_rate_limit_error(exc)
+    model_router.record(model_name, task, seconds, failed)
+    llm_limiter.release(ticket, model_name, task, seconds, _outcome(exc), tokens_used)
+
+def _timed_call(model, prompt, task: str, ticket: tuple, submitted: float, **kwargs):
+    # Time spent waiting for a slot and quota
+    if metrics.METRICS_ENABLED:
+        metrics.STAGE_SECONDS.labels("llm_queue_wait").observe(time.perf_counter() - submitted)
+    model_name = getattr(model, "model_name", "unknown")
+    start = time.perf_counter()
+    try:
+        response = model.generate_content(prompt, **kwargs)
+    except Exception as e:
+        _finish(ticket, model_name, task, time.perf_counter() - start, e)
+        raise
+    _finish(ticket, model_name, task, time.perf_counter() - start, tokens_used=sum(_token_counts(prompt, response)))
+    return response
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** attempt))
+
+async def generate_content(model, prompt, task: str = "default", retries: int = None, **kwargs):
+    """Run model.generate_content on the LLM thread pool without blocking the event loop
+
+    Waits for llm_limiter first; transient errors are retried with backoff,
+    `retries` times if given, else as set for the context.
+    """
+    loop = asyncio.get_running_loop()
+    if retries is None:
+        retries = _retry_attempts.get()
+    model_name = getattr(model, "model_name", "unknown")
+    attempt = 0
+    while True:
+        try:
+            submitted = time.perf_counter()
+            ticket = await llm_limiter.acquire(_estimated_tokens(prompt, kwargs))
+            response = await loop.run_in_executor(
+                _executor, partial(_timed_call, model, prompt, task, ticket, submitted, **kwargs)
+            )
+            if metrics.METRICS_ENABLED:
+                metrics.record_llm_call(model_name, "ok", *_token_counts(prompt, response))
+            return response
+        except Exception as e:
+            metrics.record_llm_call(model_name, type(e).__name__)
+            if not is_transient_error(e) or attempt >= retries:
+                raise
+            delay = _backoff(attempt)
+            attempt += 1
+            print(f"Transient Gemini error ({e.__class__.__name__}); retry {attempt}/{retries} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+async def stream_content(model, prompt, task: str = "default", **kwargs):
+    """Yield chunks from a streaming model.generate_content call as they arrive"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+    cancelled = threading.Event()
+    
+    def publish(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # Event loop already closed; nobody is listening anymore
+            cancelled.set()
+    
+    model_name = getattr(model, "model_name", "unknown")
+    
+    def produce(ticket: tuple):
+        start = time.perf_counter()
+        try:
+            for chunk in model.generate_content(prompt, stream=True, **kwargs):
+                if cancelled.is_set():
+                    # Abandoned midway: says nothing about the model
+                    llm_limiter.release(ticket, model_name, task, time.perf_counter() - start, "cancelled")
+                    break
+                publish(chunk)
+            else:
+                _finish(ticket, model_name, task, time.perf_counter() - start)
+        except Exception as e:
+            _finish(ticket, model_name, task, time.perf_counter() - start, e)
+            publish(e)
+        finally:
+            publish(finished)
+    
+    ticket = await llm_limiter.acquire(_estimated_tokens(prompt, kwargs))
+    loop.run_in_executor(_executor, produce, ticket)
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            if isinstance(item, Exception):
+                metrics.record_llm_call(model_name, type(item).__name__)
+                raise item
+            yield item
+        metrics.record_llm_call(model_name, "ok")
+    finally:
+        # Stop pulling chunks if the consumer went away (e.g. client disconnect)
+        cancelled.set()
+
+def shutdown():
+    """Stop the LLM thread pool (used on application shutdown)"""
+    _executor.shutdown(wait=False, cancel_futures=True)
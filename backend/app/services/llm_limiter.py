@@ -0,0 +1,249 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app import metrics
+
+# Outbound limiter for Gemini calls, shared by every call in the worker
+# process. A call needs a concurrency slot and its share of the per-minute
+# request and token quotas before it goes out; callers that can't have them
+# yet wait in a queue ordered by subscription tier.
+#
+# Concurrency adapts AIMD-style between LLM_MIN_CONCURRENCY and
+# LLM_MAX_CONCURRENCY: each successful call raises the limit by 1/limit (about
+# one slot per round of calls), while a 429 or a call slower than
+# LLM_LATENCY_SPIKE_RATIO times its usual latency multiplies it by
+# LLM_BACKOFF_RATIO. Only calls started after the last cut can cut again, so a
+# burst of 429s from one overloaded moment halves the limit once.
+#
+# Quotas are per process: with several workers, divide the key's quotas by
+# the number of workers. 0 disables a bucket.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_BACKOFF_RATIO = float(os.getenv("LLM_BACKOFF_RATIO", "0.5"))
+LLM_LATENCY_SPIKE_RATIO = float(os.getenv("LLM_LATENCY_SPIKE_RATIO", "2.5"))
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "1000"))
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "1000000"))
+# Longest a call waits for a slot before giving up with LimiterTimeout
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "30"))
+# Waiting free-tier calls queue as if they had arrived this many seconds
+# later than they did: paid tiers go first, but nobody waits forever
+LLM_FREE_TIER_DELAY = float(os.getenv("LLM_FREE_TIER_DELAY", "5"))
+TIER_DELAYS = {"career_plus": 0.0, "pro": 0.0, "free": LLM_FREE_TIER_DELAY}
+
+# The buckets hold this many seconds of quota, so a burst can't use up a minute's worth at once
+BURST_SECONDS = 10
+# Calls per (model, task) before its usual latency is trusted for spike detection
+BASELINE_MIN_CALLS = 10
+BASELINE_SMOOTHING = 0.05
+
+class LimiterTimeout(Exception):
+    """A call waited LLM_QUEUE_TIMEOUT seconds without getting a slot"""
+
+class _Bucket:
+    """Token bucket refilled continuously at per_minute / 60 per second"""
+
+    def __init__(self, per_minute: int):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * BURST_SECONDS)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available; 0 if it is now"""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        # A call costing more than a full bucket goes out once the bucket is full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        if self.rate:
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        if self.rate:
+            self.level = min(self.capacity, self.level + amount)
+
+_tier = ContextVar("llm_tier", default="free")
+
+_lock = threading.Lock()
+_limit = float(LLM_MAX_CONCURRENCY)
+_in_flight = 0
+_last_cut = 0.0
+_requests = _Bucket(LLM_RPM_LIMIT)
+_tokens = _Bucket(LLM_TPM_LIMIT)
+_waiters = []  # heap of [sort key, sequence, tokens, future]
+_sequence = itertools.count()
+_wakeup_scheduled = False
+_baselines = {}  # (model name, task) -> [usual seconds, calls]
+_stats = {"calls": 0, "queued": 0, "timeouts": 0, "rate_limited": 0, "latency_spikes": 0, "cuts": 0}
+
+def set_tier(tier: str):
+    """Queue this request's LLM calls at the priority of the user's subscription tier"""
+    _tier.set(tier if tier in TIER_DELAYS else "free")
+
+@contextmanager
+def tier_priority(tier: str):
+    """Queue the LLM calls made in this block at tier's priority"""
+    token = _tier.set(tier if tier in TIER_DELAYS else "free")
+    try:
+        yield
+    finally:
+        _tier.reset(token)
+
+def _available(tokens: int, now: float) -> float:
+    """Seconds until a call costing tokens may start; 0 if it may start now, None without a slot"""
+    if _in_flight >= int(_limit):
+        return None
+    return max(_requests.wait_time(1, now), _tokens.wait_time(tokens, now))
+
+def _start(tokens: int, now: float) -> tuple:
+    global _in_flight
+    _in_flight += 1
+    _requests.take(1)
+    _tokens.take(tokens)
+    _stats["calls"] += 1
+    _update_gauges()
+    return (now, tokens)
+
+def _update_gauges():
+    if metrics.METRICS_ENABLED:
+        metrics.LLM_CONCURRENCY_LIMIT.set(int(_limit))
+        metrics.LLM_IN_FLIGHT.set(_in_flight)
+        metrics.LLM_WAITING.set(len(_waiters))
+
+def _grant(future: asyncio.Future, ticket: tuple):
+    # Runs on the waiter's event loop
+    if future.done():
+        # The waiter gave up as it was granted
+        release(ticket, None, None, 0.0, "unused")
+    else:
+        future.set_result(ticket)
+
+def _dispatch():
+    """Start waiting calls, best first, while slots and quota allow (called with _lock held)"""
+    global _wakeup_scheduled
+    now = time.monotonic()
+    while _waiters:
+        _, _, tokens, future = _waiters[0]
+        if future.done():
+            heapq.heappop(_waiters)
+            continue
+        wait = _available(tokens, now)
+        if wait is None:
+            break
+        if wait > 0:
+            # Out of quota: try again once the buckets have refilled enough
+            if not _wakeup_scheduled:
+                loop = future.get_loop()
+                _wakeup_scheduled = _call_soon(loop, lambda: loop.call_later(wait, _wake))
+            break
+        heapq.heappop(_waiters)
+        _call_soon(future.get_loop(), _grant, future, _start(tokens, now))
+    _update_gauges()
+
+def _wake():
+    global _wakeup_scheduled
+    with _lock:
+        _wakeup_scheduled = False
+        _dispatch()
+
+def _call_soon(loop, callback, *args) -> bool:
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+        return True
+    except RuntimeError:
+        # That event loop is closed; its waiter is gone
+        return False
+
+async def acquire(tokens: int) -> tuple:
+    """Wait for a slot and quota for one call of about tokens tokens; returns the ticket for release()"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        now = time.monotonic()
+        if not _waiters and _available(tokens, now) == 0:
+            return _start(tokens, now)
+        future = loop.create_future()
+        key = now + TIER_DELAYS.get(_tier.get(), LLM_FREE_TIER_DELAY)
+        heapq.heappush(_waiters, [key, next(_sequence), tokens, future])
+        _stats["queued"] += 1
+        _dispatch()
+    try:
+        return await asyncio.wait_for(future, timeout=LLM_QUEUE_TIMEOUT)
+    except asyncio.CancelledError:
+        # Cancelled just after being granted: hand the slot on
+        if future.done() and not future.cancelled():
+            release(future.result(), None, None, 0.0, "unused")
+        raise
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        metrics.record_limiter_event("queue_timeout")
+        raise LimiterTimeout(f"Gemini calls are backed up (limit {int(_limit)} in flight); try again shortly")
+
+def _spiked(model_name: str, task: str, seconds: float) -> bool:
+    """Whether a successful call took much longer than usual, and learn from it"""
+    baseline = _baselines.get((model_name, task))
+    if baseline is None:
+        _baselines[(model_name, task)] = [seconds, 1]
+        return False
+    usual, calls = baseline
+    baseline[0] = usual + BASELINE_SMOOTHING * (seconds - usual)
+    baseline[1] = calls + 1
+    return calls >= BASELINE_MIN_CALLS and seconds > LLM_LATENCY_SPIKE_RATIO * usual
+
+def release(ticket: tuple, model_name: str, task: str, seconds: float, outcome: str, tokens_used: int = None):
+    """Free a call's slot and adapt the concurrency limit; safe to call from any thread
+
+    outcome is "ok", "rate_limited" (429 / quota), "error", "cancelled" or
+    "unused"; only the first two move the limit.
+    """
+    global _in_flight, _limit, _last_cut
+    started, tokens_reserved = ticket
+    with _lock:
+        _in_flight -= 1
+        if tokens_used is not None and tokens_used < tokens_reserved:
+            _tokens.give_back(tokens_reserved - tokens_used)
+
+        signal = None
+        if outcome == "rate_limited":
+            signal = "rate_limited"
+        elif outcome == "ok" and _spiked(model_name, task, seconds):
+            signal = "latency_spikes"
+        if signal:
+            _stats[signal] += 1
+            limit = max(float(LLM_MIN_CONCURRENCY), _limit * LLM_BACKOFF_RATIO)
+            if started >= _last_cut and limit < _limit:
+                _limit = limit
+                _last_cut = time.monotonic()
+                _stats["cuts"] += 1
+                metrics.record_limiter_event(f"cut_{signal}")
+                print(f"LLM concurrency limit cut to {int(_limit)} ({signal.replace('_', ' ')})")
+        elif outcome == "ok":
+            _limit = min(float(LLM_MAX_CONCURRENCY), _limit + 1 / _limit)
+        _dispatch()
+
+def get_stats() -> dict:
+    """Current limit, calls in flight and waiting, remaining quota and counters"""
+    with _lock:
+        now = time.monotonic()
+        _requests.wait_time(0, now)
+        _tokens.wait_time(0, now)
+        return {
+            "concurrency_limit": int(_limit),
+            "in_flight": _in_flight,
+            "waiting": sum(1 for waiter in _waiters if not waiter[3].done()),
+            "requests_available": int(_requests.level) if _requests.rate else None,
+            "tokens_available": int(_tokens.level) if _tokens.rate else None,
+            **_stats
+        }
@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+from collections import deque
+
+from app import metrics
+
+# Routes each Gemini call to a model. Every task has its own order of
+# preference (the lite model for keyword scoring, the strongest for cover
+# letters); a call goes to the first model in that order whose circuit is
+# closed and whose recent latency for the task is within the task's budget,
+# and fails over to the next one if the model errors. Until model discovery
+# has listed the models this key can use, every task uses GEMINI_MODEL.
+#
+# Circuit breaker per model: a model failing (overloaded, timed out, gone) at
+# least ROUTER_ERROR_THRESHOLD of its last ROUTER_WINDOW calls is opened and
+# gets no calls for ROUTER_OPEN_SECONDS. Then one trial call is let through
+# (half-open, claimed with claim() when the call is sent): success closes the
+# circuit, failure re-opens it. Rate limits
+# (429) fail over but don't count here; llm_limiter slows down for them.
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+ROUTER_WINDOW = int(os.getenv("ROUTER_WINDOW", "20"))
+ROUTER_MIN_CALLS = int(os.getenv("ROUTER_MIN_CALLS", "5"))
+ROUTER_ERROR_THRESHOLD = float(os.getenv("ROUTER_ERROR_THRESHOLD", "0.5"))
+ROUTER_OPEN_SECONDS = float(os.getenv("ROUTER_OPEN_SECONDS", "30"))
+# Models tried per call: the routed one plus failovers
+ROUTER_MAX_ATTEMPTS = int(os.getenv("ROUTER_MAX_ATTEMPTS", "2"))
+# Weight of the newest call in a model's moving average latency
+LATENCY_SMOOTHING = 0.2
+
+def _models_from_env(name: str, default: list) -> list:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+TASK_MODELS = {
+    # Scoring is keyword extraction, which the lite model does fastest
+    "analysis": _models_from_env("GEMINI_ANALYSIS_MODELS", [
+        "models/gemini-2.5-flash-lite", "models/gemini-2.5-flash", "models/gemini-2.0-flash-001",
+    ]),
+    "single_shot": _models_from_env("GEMINI_SINGLE_SHOT_MODELS", [
+        "models/gemini-2.5-flash", "models/gemini-2.0-flash-001", "models/gemini-flash-latest",
+    ]),
+    "rewrite": _models_from_env("GEMINI_REWRITE_MODELS", [
+        "models/gemini-2.5-flash", "models/gemini-2.0-flash-001", "models/gemini-flash-latest",
+    ]),
+    # The letter is read by a person, so it gets the strongest model
+    "cover_letter": _models_from_env("GEMINI_COVER_LETTER_MODELS", [
+        "models/gemini-2.5-pro", "models/gemini-2.5-flash", "models/gemini-pro-latest",
+    ]),
+}
+
+# Seconds a task's call normally takes at most; a model averaging more for the
+# task is tried after the models that don't
+TASK_LATENCY_BUDGETS = {
+    "analysis": 6.0,
+    "single_shot": 15.0,
+    "rewrite": 8.0,
+    "cover_letter": 20.0,
+}
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+class NoModelAvailable(Exception):
+    """Every model a task could use has its circuit open"""
+
+_lock = threading.Lock()
+_available = []  # models from the last discovery listing, best first
+_circuits = {}  # model name -> circuit state
+_latency = {}  # (model name, task) -> (moving average seconds, time of last call)
+
+def _circuit(model_name: str) -> dict:
+    circuit = _circuits.get(model_name)
+    if circuit is None:
+        circuit = _circuits[model_name] = {
+            "state": CLOSED,
+            "retry_at": 0.0,  # when an open circuit lets a trial call through
+            "outcomes": deque(maxlen=ROUTER_WINDOW),  # True for a failed call
+            "calls": 0,
+            "failures": 0,
+        }
+    return circuit
+
+def _set_state(model_name: str, circuit: dict, state: str, retry_at: float = 0.0):
+    circuit["retry_at"] = retry_at
+    if circuit["state"] == state:
+        return
+    circuit["state"] = state
+    if state == CLOSED:
+        circuit["outcomes"].clear()
+    if state != HALF_OPEN:
+        print(f"Gemini model {model_name} circuit {state}")
+    metrics.record_circuit_state(model_name, state)
+
+def set_models(names: list):
+    """The models discovery found usable, best first"""
+    global _available
+    _available = list(names)
+
+def candidates(task: str) -> list:
+    """Every model the task could use, in order of preference, ignoring health"""
+    if not _available:
+        return [DEFAULT_MODEL]
+    preferred = [name for name in TASK_MODELS.get(task, []) if name in _available]
+    return preferred + [name for name in _available if name not in preferred]
+
+def _order(task: str, now: float) -> list:
+    budget = TASK_LATENCY_BUDGETS.get(task)
+    fast, slow = [], []
+    for name in candidates(task):
+        circuit = _circuits.get(name)
+        if circuit is not None and circuit["state"] != CLOSED and now < circuit["retry_at"]:
+            continue
+        average, last_call = _latency.get((name, task), (0.0, 0.0))
+        # A slow model is tried again once its last measurement is old
+        if budget and average > budget and now - last_call < ROUTER_OPEN_SECONDS:
+            slow.append((average, name))
+        else:
+            fast.append(name)
+    return fast + [name for _, name in sorted(slow)]
+
+def route(task: str) -> list:
+    """Models to try for one call of task: the routed model, then failovers
+
+    Raises NoModelAvailable when every circuit is open.
+    """
+    with _lock:
+        models = _order(task, time.time())[:max(1, ROUTER_MAX_ATTEMPTS)]
+    if not models:
+        raise NoModelAvailable(f"All Gemini models for {task} are failing; retrying in {ROUTER_OPEN_SECONDS:.0f}s")
+    preferred = candidates(task)[0]
+    metrics.record_model_route(task, models[0], "preferred" if models[0] == preferred else "rerouted")
+    return models
+
+def claim(model_name: str) -> bool:
+    """Whether a call may be sent to model_name now; call just before sending it
+
+    A closed circuit always lets calls through. An open one whose interval
+    has passed lets this call through as its trial (half-open); until that
+    trial reports back, or another interval passes without it doing so, the
+    model gets no other calls.
+    """
+    with _lock:
+        circuit = _circuits.get(model_name)
+        if circuit is None or circuit["state"] == CLOSED:
+            return True
+        now = time.time()
+        if now < circuit["retry_at"]:
+            return False
+        _set_state(model_name, circuit, HALF_OPEN, now + ROUTER_OPEN_SECONDS)
+        return True
+
+def current_models() -> dict:
+    """The model each task would be routed to now, or None if every circuit is open"""
+    with _lock:
+        now = time.time()
+        return {task: next(iter(_order(task, now)), None) for task in TASK_MODELS}
+
+def record(model_name: str, task: str, seconds: float, failed: bool):
+    """Feed one finished call (failed: overload, timeout or model error) to the router"""
+    metrics.observe_llm_latency(model_name, task, seconds)
+    now = time.time()
+    with _lock:
+        average, _ = _latency.get((model_name, task), (seconds, 0.0))
+        _latency[(model_name, task)] = (average + LATENCY_SMOOTHING * (seconds - average), now)
+
+        circuit = _circuit(model_name)
+        circuit["calls"] += 1
+        circuit["failures"] += int(failed)
+        if circuit["state"] == HALF_OPEN:
+            if failed:
+                _set_state(model_name, circuit, OPEN, now + ROUTER_OPEN_SECONDS)
+            else:
+                _set_state(model_name, circuit, CLOSED)
+            return
+        if circuit["state"] == OPEN:
+            # A late answer from before the circuit opened
+            return
+        outcomes = circuit["outcomes"]
+        outcomes.append(failed)
+        if len(outcomes) >= ROUTER_MIN_CALLS and sum(outcomes) / len(outcomes) >= ROUTER_ERROR_THRESHOLD:
+            _set_state(model_name, circuit, OPEN, now + ROUTER_OPEN_SECONDS)
+
+def trip(model_name: str, seconds: float) -> bool:
+    """Open a model's circuit for at least seconds; False if it already was"""
+    with _lock:
+        circuit = _circuit(model_name)
+        retry_at = time.time() + seconds
+        if circuit["state"] == OPEN and circuit["retry_at"] >= retry_at - 1:
+            return False
+        _set_state(model_name, circuit, OPEN, retry_at)
+        return True
+
+def get_stats() -> dict:
+    """Per-task routes and per-model circuit state, call counts and latency"""
+    with _lock:
+        now = time.time()
+        routes = {task: _order(task, now) for task in TASK_MODELS}
+        models = {}
+        for name, circuit in _circuits.items():
+            outcomes = circuit["outcomes"]
+            models[name] = {
+                "state": circuit["state"],
+                "retry_in": max(0.0, round(circuit["retry_at"] - now, 1)) if circuit["state"] != CLOSED else None,
+                "calls": circuit["calls"],
+                "failures": circuit["failures"],
+                "recent_error_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+                "latency": {
+                    task: round(average, 3) for (model, task), (average, _) in _latency.items() if model == name
+                },
+            }
+    return {"routes": routes, "models": models}
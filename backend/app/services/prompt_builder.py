@@ -0,0 +1,230 @@
+import math
+import os
+import re
+from functools import lru_cache
+
+from app.services import keyword_matcher
+
+# Token-aware prompt inputs. Instead of cutting the resume and job text at a
+# fixed character count, boilerplate (EEO statements, scraped navigation,
+# repeated lines) is dropped, sections are ranked by how relevant they are to
+# the other document, and the best ones are packed into a token budget per
+# call type. Kept text stays in its original order.
+ANALYSIS_PROMPT_TOKENS = int(os.getenv("ANALYSIS_PROMPT_TOKENS", "1600"))
+REWRITE_PROMPT_TOKENS = int(os.getenv("REWRITE_PROMPT_TOKENS", "800"))
+COVER_LETTER_PROMPT_TOKENS = int(os.getenv("COVER_LETTER_PROMPT_TOKENS", "1200"))
+
+# Share of each budget reserved for the resume; whatever one side doesn't
+# need goes to the other
+RESUME_SHARE = {
+    "analysis": 0.6,
+    "rewrite": 0.4,
+    "cover_letter": 0.55,
+}
+
+# Lines longer than this are split into sentences so they can be packed piecemeal
+UNIT_MAX_TOKENS = 80
+# Skills from the lexicon count this much more than ordinary shared words
+SKILL_BONUS = 3.0
+
+BOILERPLATE_PATTERNS = re.compile("|".join([
+    r"equal (employment )?opportunity", r"without regard to", r"race, colou?r", r"sexual orientation",
+    r"gender identity", r"protected veteran", r"affirmative action", r"reasonable accommodation",
+    r"e-verify", r"privacy (policy|notice)", r"cookies?\b", r"all rights reserved", r"\bcopyright\b",
+    r"apply (now|for this job)", r"\bsign (in|up)\b", r"share this job", r"save (this )?job",
+    r"report (this )?job", r"similar jobs", r"back to (search|jobs)", r"references available",
+]), re.IGNORECASE)
+
+# Job sections that usually carry the requirements vs. ones that rarely matter
+REQUIREMENT_CUES = re.compile(
+    r"requirement|qualification|responsibilit|what you.?ll do|must have|nice to have|you have|you will|skills",
+    re.IGNORECASE
+)
+LOW_VALUE_CUES = re.compile(
+    r"benefits|perks|about us|who we are|our mission|our culture|why join|compensation|salary|we offer",
+    re.IGNORECASE
+)
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;])\s+")
+
+def estimate_tokens(text: str) -> int:
+    """Approximate Gemini token count without a count_tokens round trip
+
+    Words cost one token per ~4 characters and punctuation one each, which
+    slightly overestimates English text, so budgets are respected.
+    """
+    return sum(1 + (len(piece) - 1) // 4 for piece in _TOKEN_RE.findall(text))
+
+def _is_heading(line: str) -> bool:
+    words = line.split()
+    return 0 < len(words) <= 4 and not line.endswith(".") and (
+        line.endswith(":") or line.isupper() or line.istitle()
+    )
+
+def _has_skill(text: str) -> bool:
+    return bool(keyword_matcher.extract_skills(keyword_matcher.tokenize(text)))
+
+@lru_cache(maxsize=256)
+def _blocks(text: str, strip_navigation: bool) -> tuple:
+    """Split text into blocks (a heading and its lines) of packable units, minus boilerplate"""
+    lines = [line.strip() for line in text.splitlines()]
+
+    if strip_navigation:
+        # Runs of three or more very short lines are menus and link lists
+        short = [0 < len(line.split()) <= 3 and not _has_skill(line) for line in lines]
+        keep = list(lines)
+        run_start = None
+        for i, is_short in enumerate(short + [False]):
+            if is_short and run_start is None:
+                run_start = i
+            elif not is_short and run_start is not None:
+                if i - run_start >= 3:
+                    for j in range(run_start, i):
+                        keep[j] = ""
+                run_start = None
+        lines = keep
+
+    blocks = []
+    current = []
+    seen = set()
+    for line_number, line in enumerate(lines):
+        if not line or _is_heading(line):
+            if current:
+                blocks.append(current)
+            current = []
+            if not line:
+                continue
+        pieces = [line] if estimate_tokens(line) <= UNIT_MAX_TOKENS else _SENTENCE_END_RE.split(line)
+        for piece in pieces:
+            normalized = " ".join(piece.lower().split())
+            if not normalized or normalized in seen:
+                continue
+            if BOILERPLATE_PATTERNS.search(piece) and not _has_skill(piece):
+                continue
+            seen.add(normalized)
+            current.append((line_number, piece))
+    if current:
+        blocks.append(current)
+    return tuple(tuple(block) for block in blocks)
+
+# Scores and costs are per line, and one resume is packed for several calls
+@lru_cache(maxsize=4096)
+def _terms(text: str) -> tuple:
+    tokens = keyword_matcher.tokenize(text)
+    terms = {t for t in tokens if t not in keyword_matcher.STOPWORDS and len(t) > 1 and not t.isdigit()}
+    return frozenset(terms), frozenset(keyword_matcher.extract_skills(tokens))
+
+@lru_cache(maxsize=4096)
+def _cost(text: str) -> int:
+    return estimate_tokens(text)
+
+def _unit_score(text: str, query_terms: set, query_skills: set, is_job: bool) -> float:
+    terms, skills = _terms(text)
+    score = len(terms & query_terms) + SKILL_BONUS * len(skills & query_skills)
+    if is_job:
+        # Requirements the resume lacks matter as much as the ones it has
+        score += SKILL_BONUS * len(skills - query_skills)
+        if REQUIREMENT_CUES.search(text):
+            score = score * 2 + 1
+        elif LOW_VALUE_CUES.search(text):
+            score *= 0.3
+    return score
+
+def _render(units: list) -> str:
+    """Join kept units: pieces of one line with spaces, lines with newlines"""
+    lines = []
+    last_line = None
+    for line_number, piece in sorted(units, key=lambda unit: unit[0]):
+        if line_number == last_line:
+            lines[-1] += " " + piece
+        else:
+            lines.append(piece)
+        last_line = line_number
+    return "\n".join(lines)
+
+def pack(text: str, budget: int, query: str, is_job: bool = False) -> str:
+    """Keep the parts of text most relevant to query within a token budget"""
+    blocks = _blocks(text, is_job)
+    units = [unit for block in blocks for unit in block]
+    if sum(_cost(piece) for _, piece in units) <= budget:
+        return _render(units)
+
+    query_terms, query_skills = _terms(query)
+    scores = {unit: _unit_score(unit[1], query_terms, query_skills, is_job) for unit in units}
+    costs = {unit: _cost(unit[1]) for unit in units}
+
+    def block_rank(index: int) -> float:
+        block = blocks[index]
+        # A resume opens with the candidate's name and title; keep it if it's short
+        if not is_job and index == 0 and sum(costs[u] for u in block) <= budget * 0.15:
+            return math.inf
+        return sum(scores[u] for u in block) / math.sqrt(sum(costs[u] for u in block) + 1)
+
+    kept = []
+    remaining = budget
+    for index in sorted(range(len(blocks)), key=block_rank, reverse=True):
+        block = blocks[index]
+        block_cost = sum(costs[u] for u in block)
+        if block_cost <= remaining:
+            kept.extend(block)
+            remaining -= block_cost
+            continue
+        # Partial block: its heading, then its best units that still fit
+        # (irrelevant ones last, so they only fill what would go unused)
+        heading = block[0] if _is_heading(block[0][1]) else None
+        if heading:
+            remaining -= costs[heading]
+        ranked = sorted(
+            (u for u in block if u is not heading),
+            key=lambda u: scores[u] / math.sqrt(costs[u] + 1),
+            reverse=True
+        )
+        chosen = []
+        for unit in ranked:
+            if costs[unit] <= remaining:
+                chosen.append(unit)
+                remaining -= costs[unit]
+        if heading and chosen:
+            chosen.append(heading)
+        elif heading:
+            remaining += costs[heading]
+        kept.extend(chosen)
+        if remaining < 10:
+            break
+    return _render(kept)
+
+def _split_budget(resume_text: str, job_description: str, budget: int, resume_share: float) -> tuple:
+    resume_need = sum(_cost(piece) for block in _blocks(resume_text, False) for _, piece in block)
+    job_need = sum(_cost(piece) for block in _blocks(job_description, True) for _, piece in block)
+    resume_budget = int(budget * resume_share)
+    job_budget = budget - resume_budget
+    if job_need < job_budget:
+        resume_budget += job_budget - job_need
+        job_budget = job_need
+    elif resume_need < resume_budget:
+        job_budget += resume_budget - resume_need
+        resume_budget = resume_need
+    return resume_budget, job_budget
+
+def fit(resume_text: str, job_description: str, budget: int, resume_share: float, focus: str = "") -> tuple:
+    """Pack a resume and job description into one budget, each ranked against the other
+
+    focus (e.g. the section being rewritten) is added to the resume's relevance query.
+    """
+    resume_budget, job_budget = _split_budget(resume_text, job_description, budget, resume_share)
+    return (
+        pack(resume_text, resume_budget, job_description + "\n" + focus),
+        pack(job_description, job_budget, resume_text, is_job=True)
+    )
+
+def analysis_inputs(resume_text: str, job_description: str) -> tuple:
+    return fit(resume_text, job_description, ANALYSIS_PROMPT_TOKENS, RESUME_SHARE["analysis"])
+
+def rewrite_inputs(section: str, resume_text: str, job_description: str) -> tuple:
+    # The section itself is sent verbatim; the context gets what's left
+    budget = max(200, REWRITE_PROMPT_TOKENS - estimate_tokens(section))
+    return fit(resume_text, job_description, budget, RESUME_SHARE["rewrite"], focus=section)
+
+def cover_letter_inputs(resume_text: str, job_description: str) -> tuple:
+    return fit(resume_text, job_description, COVER_LETTER_PROMPT_TOKENS, RESUME_SHARE["cover_letter"])
@@ -1,27 +1,41 @@
-from app.services.ai_service import analyze_resume_match, rewrite_section
-import PyPDF2
-import io
-from docx import Document
+from app.services.ai_service import analyze_resume_match, analyze_resume_single_shot, rewrite_section, fallback_analysis
+from app.services.job_scraper import scrape_job_description
+from app.services.document_extractor import extract_pdf_text, extract_docx_text
+from app import metrics
+from app.services import ai_service, llm_client, single_flight
+import asyncio
 import json
+import os
+from typing import Optional
+
+# Per-call timeout (seconds) for each LLM request made during an analysis.
+# A call that runs past it is dropped and its fallback is used instead.
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "30"))
+
+# Maximum number of batch jobs (scrape + scoring) processed at once across
+# all batch requests in this worker
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+_batch_semaphore = None
+
+def _get_batch_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop
+    global _batch_semaphore
+    if _batch_semaphore is None:
+        _batch_semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    return _batch_semaphore
 
 async def extract_text_from_file(file_content: bytes, filename: str) -> str:
     """Extract text from uploaded resume file"""
     
     if filename.endswith('.pdf'):
         try:
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
+            return await extract_pdf_text(file_content)
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
     
     elif filename.endswith('.docx'):
         try:
-            doc = Document(io.BytesIO(file_content))
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            return text
+            return await extract_docx_text(file_content)
         except Exception as e:
             raise Exception(f"Error reading DOCX: {str(e)}")
     
@@ -34,14 +48,53 @@ async def extract_text_from_file(file_content: bytes, filename: str) -> str:
     else:
         raise Exception(f"Unsupported file type: {filename}")
 
+async def extract_text_from_upload(path: str, file_type: str) -> str:
+    """Extract text from an uploaded resume already spooled to disk"""
+    
+    if file_type == 'pdf':
+        try:
+            return await extract_pdf_text(path)
+        except Exception as e:
+            raise Exception(f"Error reading PDF: {str(e)}")
+    
+    elif file_type == 'docx':
+        try:
+            return await extract_docx_text(path)
+        except Exception as e:
+            raise Exception(f"Error reading DOCX: {str(e)}")
+    
+    elif file_type == 'txt':
+        with open(path, 'rb') as f:
+            file_content = f.read()
+        try:
+            return file_content.decode('utf-8')
+        except:
+            return file_content.decode('latin-1')
+    
+    else:
+        raise Exception(f"Unsupported file type: {file_type}")
+
 async def analyze_resume(resume_text: str, job_description: str) -> dict:
     """Analyze resume and return comprehensive results"""
+    # Identical analyses already in flight (from any user) are shared, but a
+    # job's, which raises instead of falling back, only with other jobs
+    key = single_flight.make_key("analysis", resume_text, job_description, llm_client.raising_transient_errors())
+    return await single_flight.run(key, lambda: _analyze_resume(resume_text, job_description))
+
+async def _analyze_resume(resume_text: str, job_description: str) -> dict:
+    ai_result = None
+    if ai_service.SINGLE_SHOT_ANALYSIS:
+        ai_result = await get_single_shot_analysis(resume_text, job_description)
     
-    # Get AI analysis
-    ai_result = await analyze_resume_match(resume_text, job_description)
-    
-    # Get rewritten sections
-    rewritten_sections = await get_rewritten_sections(resume_text, job_description)
+    if ai_result is not None:
+        rewritten_sections = ai_result["rewritten_sections"]
+    else:
+        # Scoring and the section rewrites don't depend on each other, so run
+        # them concurrently: the whole analysis costs about one LLM round trip
+        ai_result, rewritten_sections = await asyncio.gather(
+            get_match_analysis(resume_text, job_description),
+            get_rewritten_sections(resume_text, job_description)
+        )
     
     return {
         "match_score": ai_result.get("match_score", 0),
@@ -53,30 +106,128 @@ async def analyze_resume(resume_text: str, job_description: str) -> dict:
         "job_description": job_description  # Store for cover letter generation
     }
 
-async def get_rewritten_sections(resume_text: str, job_description: str) -> dict:
-    """Get rewritten versions of key resume sections"""
+async def analyze_batch(resume_text: str, jobs: list) -> list:
+    """Score one resume against many jobs concurrently
+    
+    Each job is a dict with job_url and/or job_description. Results come back
+    in input order; a job that fails carries an "error" instead of a score.
+    """
+    async def analyze_job(job: dict) -> dict:
+        async with _get_batch_semaphore():
+            try:
+                job_description = job.get("job_description")
+                if job.get("job_url") and not job_description:
+                    job_description = await scrape_job_description(job["job_url"])
+                if not job_description:
+                    raise Exception("Job description is required")
+                
+                result = await get_match_analysis(resume_text, job_description)
+                return {
+                    "match_score": result.get("match_score", 0),
+                    "suggestions": result.get("suggestions", []),
+                    "keywords_missing": result.get("keywords_missing", []),
+                    "keywords_present": result.get("keywords_present", []),
+                    "job_description": job_description,
+                    "error": None
+                }
+            except Exception as e:
+                print(f"Error analyzing batch job {job.get('job_url')}: {e}")
+                return {"error": str(e)}
     
+    return await asyncio.gather(*[analyze_job(job) for job in jobs])
+
+async def get_match_analysis(resume_text: str, job_description: str) -> dict:
+    """Get the AI match analysis, falling back to local scoring on timeout"""
+    try:
+        with metrics.track("llm_match_analysis"):
+            return await asyncio.wait_for(
+                analyze_resume_match(resume_text, job_description),
+                timeout=LLM_CALL_TIMEOUT
+            )
+    except asyncio.TimeoutError as e:
+        print(f"Match analysis timed out after {LLM_CALL_TIMEOUT}s")
+        if llm_client.should_raise(e):
+            raise
+        return fallback_analysis(
+            resume_text, job_description, "AI analysis timed out. Please try again."
+        )
+
+async def get_single_shot_analysis(resume_text: str, job_description: str) -> Optional[dict]:
+    """Analysis and rewrites from one structured LLM call
+    
+    Returns None if the response was unusable, so the caller can make the
+    separate calls instead; a timeout falls back to local scoring.
+    """
+    sections = get_sections_to_rewrite(resume_text)
+    try:
+        with metrics.track("llm_single_shot"):
+            return await asyncio.wait_for(
+                analyze_resume_single_shot(resume_text, job_description, sections),
+                timeout=LLM_CALL_TIMEOUT
+            )
+    except asyncio.TimeoutError as e:
+        print(f"Single-shot analysis timed out after {LLM_CALL_TIMEOUT}s")
+        if llm_client.should_raise(e):
+            raise
+        message = "AI analysis timed out. Please try again."
+    except Exception as e:
+        # An overloaded model won't do better with three calls than with one
+        if not llm_client.is_transient_error(e):
+            print(f"Single-shot analysis failed, using separate calls: {e}")
+            return None
+        if llm_client.should_raise(e):
+            raise
+        message = f"Error in AI analysis: {str(e)}. Please try again."
+    
+    result = fallback_analysis(resume_text, job_description, message)
+    result["rewritten_sections"] = sections
+    return result
+
+def get_sections_to_rewrite(resume_text: str) -> dict:
+    """Resume sections worth rewriting for a job, by name"""
     # Extract common sections (simplified - in production, use NLP)
     sections_to_rewrite = {
         "summary": resume_text[:500] if len(resume_text) > 500 else resume_text,
         "skills": extract_skills_section(resume_text),
     }
+    return {
+        name: text for name, text in sections_to_rewrite.items() if text
+    }
+
+async def get_rewritten_sections(resume_text: str, job_description: str) -> dict:
+    """Get rewritten versions of key resume sections"""
+    
+    sections_to_rewrite = get_sections_to_rewrite(resume_text)
+    
+    # Rewrite all sections concurrently; a slow or failed rewrite keeps the
+    # original text without holding back the others
+    async def rewrite(section_name: str, section_text: str) -> str:
+        with metrics.track(f"llm_rewrite_{section_name}"):
+            return await asyncio.wait_for(
+                rewrite_section(section_text, resume_text, job_description),
+                timeout=LLM_CALL_TIMEOUT
+            )
+    
+    results = await asyncio.gather(*[
+        rewrite(section_name, section_text)
+        for section_name, section_text in sections_to_rewrite.items()
+    ], return_exceptions=True)
     
     rewritten = {}
-    for section_name, section_text in sections_to_rewrite.items():
-        if section_text:
-            try:
-                rewritten_text = await rewrite_section(
-                    section_text, resume_text, job_description
-                )
-                # Only use rewritten text if it's not an error message
-                if rewritten_text and not rewritten_text.startswith("Error"):
-                    rewritten[section_name] = rewritten_text
-                else:
-                    rewritten[section_name] = section_text
-            except Exception as e:
-                print(f"Error rewriting {section_name}: {e}")
-                rewritten[section_name] = section_text
+    for (section_name, section_text), rewritten_text in zip(sections_to_rewrite.items(), results):
+        if isinstance(rewritten_text, Exception) and llm_client.should_raise(rewritten_text):
+            raise rewritten_text
+        if isinstance(rewritten_text, asyncio.TimeoutError):
+            print(f"Rewriting {section_name} timed out after {LLM_CALL_TIMEOUT}s")
+            rewritten[section_name] = section_text
+        elif isinstance(rewritten_text, Exception):
+            print(f"Error rewriting {section_name}: {rewritten_text}")
+            rewritten[section_name] = section_text
+        # Only use rewritten text if it's not an error message
+        elif rewritten_text and not rewritten_text.startswith("Error"):
+            rewritten[section_name] = rewritten_text
+        else:
+            rewritten[section_name] = section_text
     
     return rewritten
 
@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import json
+
+from app import metrics
+
+# Single-flight: concurrent calls with the same key share one in-flight task
+# instead of each doing the work (a double-clicked "Analyze", a frontend
+# retry, many users scraping the same job URL at once). Only work that is
+# still running is shared; finished results are the caches' business.
+_inflight = {}  # key -> asyncio.Task
+_stats = {}  # namespace -> {"calls", "executions", "coalesced", "errors"}
+
+def make_key(namespace: str, *parts) -> str:
+    """Build a content-hash key; the namespace prefix groups the counters"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def _counters(key: str) -> dict:
+    namespace = key.split(":", 1)[0]
+    if namespace not in _stats:
+        _stats[namespace] = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+    return _stats[namespace]
+
+def _finished(key: str, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    # Mark the exception retrieved even if every caller went away
+    if not task.cancelled() and task.exception() is not None:
+        _counters(key)["errors"] += 1
+
+async def run(key: str, func):
+    """Return await func(), sharing one call among concurrent callers with the same key
+
+    The work runs in its own task, so a caller that disconnects doesn't cancel
+    it for the others. Exceptions are raised to every caller.
+    """
+    counters = _counters(key)
+    counters["calls"] += 1
+
+    task = _inflight.get(key)
+    # A task left over from another event loop (tests, benchmarks) can't be awaited here
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        counters["coalesced"] += 1
+        metrics.record_single_flight(key.split(":", 1)[0], "coalesced")
+    else:
+        task = asyncio.get_running_loop().create_task(func())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _finished(key, done))
+        counters["executions"] += 1
+        metrics.record_single_flight(key.split(":", 1)[0], "executed")
+
+    return await asyncio.shield(task)
+
+def get_stats() -> dict:
+    """Per-namespace counters and the number of calls currently in flight"""
+    return {
+        "in_flight": len(_inflight),
+        **{namespace: dict(counters) for namespace, counters in _stats.items()}
+    }
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import zipfile
+
+from fastapi import UploadFile
+from starlette.responses import JSONResponse
+
+# Resume uploads are streamed to a temp file in fixed-size chunks with a hard
+# byte cap, and the file type is taken from the content rather than the name.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Room for multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+def _size_label(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size // (1024 * 1024)} MB"
+    return f"{size // 1024} KB"
+
+class UploadTooLarge(Exception):
+    pass
+
+class UnsupportedFileType(Exception):
+    pass
+
+class SpooledUpload:
+    """An uploaded file written to disk, with its sniffed type"""
+
+    def __init__(self, path: str, size: int, file_type: str):
+        self.path = path
+        self.size = size
+        self.file_type = file_type  # pdf, docx, txt
+
+    def cleanup(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+def sniff_file_type(path: str, head: bytes) -> str:
+    """Detect pdf/docx/txt from magic bytes"""
+    # PDF readers accept the header anywhere in the first 1 KB
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(path) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        raise UnsupportedFileType("ZIP archive is not a DOCX document")
+    if b"\x00" not in head:
+        return "txt"
+    raise UnsupportedFileType("Unsupported file type. Please upload a PDF, DOCX or TXT file")
+
+async def spool_upload(file: UploadFile) -> SpooledUpload:
+    """Copy an upload to a temp file chunk by chunk, enforcing MAX_UPLOAD_BYTES"""
+    fd, path = tempfile.mkstemp(prefix="resume-upload-")
+    size = 0
+    head = b""
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge(f"File is larger than {_size_label(MAX_UPLOAD_BYTES)}")
+                if len(head) < 1024:
+                    head += chunk[:1024 - len(head)]
+                out.write(chunk)
+        if size == 0:
+            raise UnsupportedFileType("Uploaded file is empty")
+        return SpooledUpload(path, size, sniff_file_type(path, head))
+    except Exception:
+        os.remove(path)
+        raise
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies over a byte cap on the given paths while they stream in
+
+    Checks Content-Length up front and counts bytes for chunked bodies, so an
+    oversized upload is refused before it is buffered by the multipart parser.
+    """
+
+    def __init__(self, app, paths: list, max_bytes: int = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        too_large = JSONResponse(
+            {"detail": f"File is larger than {_size_label(MAX_UPLOAD_BYTES)}"},
+            status_code=413
+        )
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise UploadTooLarge()
+            return message
+
+        async def limited_send(message):
+            nonlocal response_started
+            # The body parser turns our error into a generic 400; answer 413 instead
+            if exceeded:
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await too_large(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except UploadTooLarge:
+            if not response_started:
+                await too_large(scope, receive, send)
@@ -0,0 +1,130 @@
+"""Compare on-disk size of stored analyses: JSON text columns vs compact payloads
+
+Writes the same synthetic history (many analyses sharing a handful of resumes
+and job postings) into three throwaway SQLite databases and reports bytes per
+analysis after VACUUM:
+  legacy      - the old three json.dumps Text columns (no texts, no rewrites)
+  legacy-full - the same layout extended to store everything needed to replay
+                an analysis (rewritten sections, resume and job text inline)
+  compact     - the current models: one compressed payload column plus
+                content-hash deduplicated texts
+
+Usage: python -m benchmarks.analysis_storage [--analyses 2000] [--resumes 20] [--jobs 200]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="storage-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'compact.db')}"
+
+WORDS = (
+    "python fastapi postgres redis docker kubernetes aws team led built designed scaled api service "
+    "latency pipeline migrated reduced cost customers data platform engineers mentored shipped "
+    "reliability monitoring tests deployment microservices queue throughput"
+).split()
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def make_history(analyses: int, resumes: int, jobs: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    resume_texts = [text(rng, 600) for _ in range(resumes)]
+    job_texts = [text(rng, 450) for _ in range(jobs)]
+    rows = []
+    for _ in range(analyses):
+        rows.append({
+            "resume": rng.choice(resume_texts),
+            "job": rng.choice(job_texts),
+            "match_score": round(rng.uniform(40, 95), 1),
+            "suggestions": [text(rng, 20) for _ in range(5)],
+            "keywords_missing": [rng.choice(WORDS) for _ in range(8)],
+            "keywords_present": [rng.choice(WORDS) for _ in range(12)],
+            "rewritten_sections": {
+                section: text(rng, 90) for section in ("Summary", "Experience", "Skills")
+            },
+        })
+    return rows
+
+def file_size(path: str) -> int:
+    connection = sqlite3.connect(path)
+    connection.execute("VACUUM")
+    connection.close()
+    return os.path.getsize(path)
+
+def write_legacy(path: str, rows: list, full: bool) -> int:
+    columns = ["user_id", "match_score", "suggestions", "keywords_missing", "keywords_present"]
+    if full:
+        columns += ["rewritten_sections", "resume_text", "job_text"]
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE resume_analyses (id INTEGER PRIMARY KEY, match_score FLOAT, user_id INTEGER, "
+        + ", ".join(f"{column} TEXT" for column in columns[2:]) + ", created_at DATETIME)"
+    )
+    for row in rows:
+        values = [1, row["match_score"], json.dumps(row["suggestions"]),
+                  json.dumps(row["keywords_missing"]), json.dumps(row["keywords_present"])]
+        if full:
+            values += [json.dumps(row["rewritten_sections"]), row["resume"], row["job"]]
+        connection.execute(
+            f"INSERT INTO resume_analyses ({', '.join(columns)}, created_at) "
+            f"VALUES ({', '.join('?' * len(values))}, CURRENT_TIMESTAMP)",
+            values
+        )
+    connection.commit()
+    connection.close()
+    return file_size(path)
+
+def write_compact(rows: list) -> int:
+    from sqlalchemy.dialects.sqlite import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models import ResumeAnalysis, TextBlob
+    from app.repositories import text_hash
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for row in rows:
+            for key in ("resume", "job"):
+                db.execute(insert(TextBlob).values(
+                    hash=text_hash(row[key]), content=row[key], length=len(row[key])
+                ).on_conflict_do_nothing(index_elements=["hash"]))
+            db.add(ResumeAnalysis(
+                user_id=1,
+                match_score=row["match_score"],
+                payload={field: row[field] for field in (
+                    "suggestions", "keywords_missing", "keywords_present", "rewritten_sections"
+                )},
+                resume_hash=text_hash(row["resume"]),
+                job_hash=text_hash(row["job"])
+            ))
+        db.commit()
+    finally:
+        db.close()
+    engine.dispose()
+    return file_size(engine.url.database)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analyses", type=int, default=2000)
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_history(args.analyses, args.resumes, args.jobs)
+    sizes = {
+        "legacy": write_legacy(os.path.join(_db_dir, "legacy.db"), rows, full=False),
+        "legacy-full": write_legacy(os.path.join(_db_dir, "legacy_full.db"), rows, full=True),
+        "compact": write_compact(rows),
+    }
+
+    print(f"{args.analyses} analyses over {args.resumes} resumes and {args.jobs} job postings")
+    for name, size in sizes.items():
+        replayable = "yes" if name != "legacy" else "no "
+        print(f"{name:12s} replayable={replayable} {size / 1024:9.0f} KB  {size / args.analyses:7.0f} B/analysis")
+
+if __name__ == "__main__":
+    main()
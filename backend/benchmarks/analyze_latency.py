@@ -0,0 +1,50 @@
+"""Measure end-to-end resume_analyzer.analyze_resume latency against a stubbed model
+
+Usage: python -m benchmarks.analyze_latency [--latency 0.3] [--runs 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Every call must reach the model, not the response cache
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from benchmarks import stub_gemini  # noqa: E402
+from benchmarks.report import percentile  # noqa: E402
+
+RESUME = """Jane Doe
+Backend engineer with six years of Python experience building APIs.
+
+Technical Skills
+Python, FastAPI, PostgreSQL, Redis, AWS
+"""
+
+JOB = "We are hiring a backend engineer with Python, Docker and Kubernetes experience."
+
+async def run(runs: int) -> list:
+    from app.services import resume_analyzer
+
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await resume_analyzer.analyze_resume(RESUME, JOB)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="stub model latency in seconds")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency)
+    latencies = asyncio.run(run(args.runs))
+
+    print(f"stub latency={args.latency}s, runs={args.runs}")
+    print(f"p50={percentile(latencies, 50):.3f}s  p99={percentile(latencies, 99):.3f}s  "
+          f"mean={statistics.mean(latencies):.3f}s")
+
+if __name__ == "__main__":
+    main()
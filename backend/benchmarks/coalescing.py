@@ -0,0 +1,147 @@
+"""Measure single-flight coalescing of duplicate in-flight work
+
+Two scenarios through the app, with a stubbed model and a mocked job board:
+  double-click - one user sends the same /api/analyze request several times at
+                 once (model calls, analyses charged, history rows saved)
+  shared URL   - many users analyze different resumes against one job URL at
+                 once (job board fetches)
+Each runs with single-flight on and then off for comparison.
+
+Usage: python -m benchmarks.coalescing [--duplicates 5] [--users 20] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="coalescing-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+# Every analysis must reach the model so only coalescing can save calls
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from benchmarks import stub_gemini  # noqa: E402  (sets a dummy GEMINI_API_KEY)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "html", "greenhouse.html")
+JOB_URL = "https://boards.greenhouse.io/acme/jobs/1"
+
+def register_user(uid: str) -> tuple:
+    from app import auth
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        user = User(firebase_uid=uid, email=f"{uid}@example.com", subscription_tier="pro", usage_count=0)
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    finally:
+        db.close()
+    token = f"bench-token-{uid}"
+    auth._token_cache[auth._token_key(token)] = (time.time() + 3600, {"uid": uid, "email": f"{uid}@example.com"})
+    return user_id, token
+
+def user_totals(user_id: int) -> tuple:
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import ResumeAnalysis, User
+
+    db = SessionLocal()
+    try:
+        rows = db.scalar(select(func.count()).select_from(ResumeAnalysis).where(ResumeAnalysis.user_id == user_id))
+        return db.get(User, user_id).usage_count, rows
+    finally:
+        db.close()
+
+def mock_job_board(latency: float) -> dict:
+    """Point the scraper's shared client at an in-process job board; returns its counters"""
+    import httpx
+    from app.services import job_scraper
+
+    with open(FIXTURE, "rb") as f:
+        html = f.read()
+    counters = {"fetches": 0}
+
+    async def handler(request):
+        counters["fetches"] += 1
+        await asyncio.sleep(latency)
+        return httpx.Response(200, content=html, headers={"Content-Type": "text/html"})
+
+    job_scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    job_scraper._client_loop = asyncio.get_running_loop()
+    job_scraper._cache.clear()
+    return counters
+
+async def analyze(client, token: str, body: dict):
+    return await client.post("/api/analyze", headers={"Authorization": f"Bearer {token}"}, json=body)
+
+async def double_click(client, duplicates: int) -> dict:
+    user_id, token = register_user(f"clicker-{time.time_ns()}")
+    calls = stub_gemini.StubModel.calls
+    body = {"resume_text": f"Python developer {time.time_ns()}", "job_description": "Backend role needing Python"}
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[analyze(client, token, body) for _ in range(duplicates)])
+    elapsed = time.perf_counter() - start
+    charged, saved = user_totals(user_id)
+    return {
+        "ok": sum(r.status_code == 200 for r in responses),
+        "model_calls": stub_gemini.StubModel.calls - calls,
+        "charged": charged,
+        "saved": saved,
+        "seconds": elapsed
+    }
+
+async def shared_url(client, users: int, latency: float) -> dict:
+    counters = mock_job_board(latency)
+    tokens = [register_user(f"reader-{n}-{time.time_ns()}")[1] for n in range(users)]
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[
+        analyze(client, token, {"resume_text": f"Engineer number {n}", "job_url": JOB_URL})
+        for n, token in enumerate(tokens)
+    ])
+    return {
+        "ok": sum(r.status_code == 200 for r in responses),
+        "fetches": counters["fetches"],
+        "seconds": time.perf_counter() - start
+    }
+
+async def run(duplicates: int, users: int, latency: float):
+    import httpx
+    import main
+    from app.services import single_flight
+
+    coalesced_run = single_flight.run
+
+    async def passthrough(key, func):
+        return await func()
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        for label, runner in (("on", coalesced_run), ("off", passthrough)):
+            single_flight.run = runner
+            clicks = await double_click(client, duplicates)
+            board = await shared_url(client, users, latency)
+            print(f"single-flight {label}:")
+            print(f"  double-click x{duplicates}: ok={clicks['ok']} model calls={clicks['model_calls']} "
+                  f"charged={clicks['charged']} saved={clicks['saved']} in {clicks['seconds']:.2f}s")
+            print(f"  shared URL x{users} users: ok={board['ok']} job board fetches={board['fetches']} "
+                  f"in {board['seconds']:.2f}s")
+        single_flight.run = coalesced_run
+
+    print(f"counters: {single_flight.get_stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duplicates", type=int, default=5, help="identical requests from one user")
+    parser.add_argument("--users", type=int, default=20, help="users analyzing the same job URL")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub model and job board latency in seconds")
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency)
+    from app import migrations
+    migrations.upgrade_database()
+    asyncio.run(run(args.duplicates, args.users, args.latency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare request-handler DB throughput on the sync Session path vs the async repositories
+
+Each simulated request does what /api/analyze does against the database: load
+the user, reserve usage, insert an analysis and read the history, with a short
+await in between standing in for the model call. The sync path runs those
+queries inline on the event loop (as the handlers used to); the async path
+awaits app.repositories. A ticker coroutine measures how long the event loop
+is stalled.
+
+Usage: python -m benchmarks.db_async_throughput [--concurrency 50] [--requests 1000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="db-async-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from app.database import Base, SessionLocal, AsyncSessionLocal, engine  # noqa: E402
+from app.models import User, ResumeAnalysis  # noqa: E402
+from app import repositories  # noqa: E402
+
+MODEL_AWAIT = 0.005  # stand-in for awaiting the LLM between queries
+
+def analysis_row(user_id: int) -> ResumeAnalysis:
+    return ResumeAnalysis(
+        user_id=user_id, match_score=80.0, suggestions="[]", keywords_missing="[]", keywords_present="[]"
+    )
+
+async def sync_request(uid: str):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.firebase_uid == uid).first()
+        db.commit()
+        user.reserve_usage(db)
+        await asyncio.sleep(MODEL_AWAIT)
+        db.add(analysis_row(user.id))
+        db.commit()
+        db.query(ResumeAnalysis).filter(
+            ResumeAnalysis.user_id == user.id
+        ).order_by(ResumeAnalysis.created_at.desc()).limit(10).all()
+    finally:
+        db.close()
+
+async def async_request(uid: str):
+    async with AsyncSessionLocal() as db:
+        user = await repositories.get_user_by_uid(db, uid)
+        await db.commit()
+        await repositories.reserve_usage(db, user)
+        await asyncio.sleep(MODEL_AWAIT)
+        await repositories.save_analyses(db, [analysis_row(user.id)])
+        await repositories.list_analyses(db, user.id, limit=10)
+
+async def ticker(stop: asyncio.Event, lags: list):
+    """Record how late a 10 ms sleep wakes up, i.e. how long the loop was blocked"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+async def run(handler, uids: list, requests: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lags = []
+
+    async def one(i: int):
+        async with semaphore:
+            await handler(uids[i % len(uids)])
+
+    tick = asyncio.create_task(ticker(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed, lags
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    uids = [f"bench-{n}" for n in range(args.users)]
+    db.add_all([User(firebase_uid=uid, email=f"{uid}@example.com", subscription_tier="pro") for uid in uids])
+    db.commit()
+    db.close()
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}")
+    for name, handler in (("sync session ", sync_request), ("async session", async_request)):
+        elapsed, lags = asyncio.run(run(handler, uids, args.requests, args.concurrency))
+        print(f"{name}: {args.requests / elapsed:7.0f} req/s  "
+              f"loop stall p50={percentile(lags, 50) * 1000:.1f}ms "
+              f"p99={percentile(lags, 99) * 1000:.1f}ms max={max(lags) * 1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
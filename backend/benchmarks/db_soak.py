@@ -0,0 +1,118 @@
+"""Soak the API under concurrent load and watch the database connection pool
+
+Runs a mix of analyze (writes), rewrite-section and history (reads) requests from many
+concurrent clients against a throwaway SQLite database with a stubbed model,
+sampling checked-out connections as it goes. A healthy run keeps the count
+flat and bounded and sees no "database is locked" errors.
+
+Usage: python -m benchmarks.db_soak [--clients 50] [--duration 20] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="db-soak-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'soak.db')}"
+# Persist LLM responses too, so cache writes compete with request writes
+os.environ["LLM_CACHE_PERSIST"] = "true"
+
+from benchmarks import stub_gemini  # noqa: E402  (sets a dummy GEMINI_API_KEY)
+
+def register_user(uid: str):
+    """Pre-verified pro-tier token for uid, so the soak needs no Firebase project"""
+    from app import auth
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        db.add(User(firebase_uid=uid, email=f"{uid}@example.com", subscription_tier="pro", usage_count=0))
+        db.commit()
+    finally:
+        db.close()
+    token = f"soak-token-{uid}"
+    auth._token_cache[auth._token_key(token)] = (time.time() + 3600, {"uid": uid, "email": f"{uid}@example.com"})
+    return token
+
+async def client_loop(client, token: str, client_id: int, deadline: float, stats: dict):
+    headers = {"Authorization": f"Bearer {token}"}
+    i = 0
+    while time.monotonic() < deadline:
+        i += 1
+        if i % 3 == 0:
+            response = await client.get("/api/user/history", headers=headers)
+        elif i % 3 == 1:
+            # A distinct resume per request so every analysis misses the LLM cache
+            response = await client.post("/api/analyze", headers=headers, json={
+                "resume_text": f"Python developer #{client_id}-{i} with FastAPI and SQL experience",
+                "job_description": "Backend role needing Python, Docker and Kubernetes"
+            })
+        else:
+            response = await client.post("/api/rewrite-section", headers=headers, params={
+                "section": "Summary",
+                "resume_text": f"Python developer #{client_id}-{i}",
+                "job_description": "Backend role needing Python"
+            })
+
+        stats["requests"] += 1
+        if response.status_code >= 400:
+            stats["errors"] += 1
+            if "database is locked" in response.text:
+                stats["locked"] += 1
+
+async def sample_pools(deadline: float, samples: list):
+    from app.database import async_engine, async_writer_engine
+
+    while time.monotonic() < deadline:
+        readers = async_engine.pool.checkedout()
+        writers = async_writer_engine.pool.checkedout() if async_writer_engine is not async_engine else 0
+        samples.append(readers + writers)
+        await asyncio.sleep(0.25)
+
+async def run(clients: int, duration: float) -> tuple:
+    import httpx
+    import main
+
+    tokens = [register_user(f"soak-{n}-{time.time_ns()}") for n in range(clients)]
+    stats = {"requests": 0, "errors": 0, "locked": 0}
+    samples = []
+    deadline = time.monotonic() + duration
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://soak", timeout=60) as client:
+        await asyncio.gather(
+            sample_pools(deadline, samples),
+            *[client_loop(client, token, n, deadline, stats) for n, token in enumerate(tokens)]
+        )
+    return stats, samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub model latency in seconds")
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency)
+    from app import migrations
+    from app.database import async_engine
+    migrations.upgrade_database()
+
+    stats, samples = asyncio.run(run(args.clients, args.duration))
+
+    quarter = max(1, len(samples) // 4)
+    print(f"clients={args.clients} duration={args.duration:.0f}s requests={stats['requests']} "
+          f"({stats['requests'] / args.duration:.0f}/s)")
+    print(f"errors={stats['errors']} database_locked={stats['locked']}")
+    print(f"checked-out connections: max={max(samples)} "
+          f"first-quarter avg={sum(samples[:quarter]) / quarter:.1f} "
+          f"last-quarter avg={sum(samples[-quarter:]) / quarter:.1f} "
+          f"after run={async_engine.pool.checkedout()}")
+
+    ok = stats["errors"] == 0 and async_engine.pool.checkedout() == 0
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Build the PDF/DOCX resume fixtures in benchmarks/fixtures/documents
+
+The fixtures are generated rather than collected so they are reproducible and
+free of personal data: the same seed always yields the same text. PDFs are
+written by hand (one Helvetica text stream per page) because PyPDF2 can read
+but not lay out text; DOCX files use python-docx.
+
+Usage: python -m benchmarks.documents
+"""
+import json
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "documents")
+
+LINES_PER_PAGE = 46
+
+# name -> (format, pages of text)
+CORPUS = {
+    "resume_1page.pdf": ("pdf", 1),
+    "resume_3pages.pdf": ("pdf", 3),
+    "resume_12pages.pdf": ("pdf", 12),
+    "resume_1page.docx": ("docx", 1),
+    "resume_3pages.docx": ("docx", 3),
+    "resume_1page.txt": ("txt", 1),
+}
+
+SKILLS = (
+    "Python, FastAPI, Django, PostgreSQL, Redis, Kafka, Docker, Kubernetes, Terraform, AWS, GCP, "
+    "Go, TypeScript, React, GraphQL, Prometheus, Grafana, CI/CD"
+).split(", ")
+VERBS = ["Built", "Led", "Designed", "Migrated", "Scaled", "Automated", "Reduced", "Owned", "Shipped"]
+OBJECTS = [
+    "the billing service", "a real-time event pipeline", "the public REST API", "internal developer tooling",
+    "the search indexing workers", "the payments integration", "observability dashboards", "the CI pipeline",
+]
+
+def resume_lines(pages: int, seed: int = 7) -> list:
+    """Deterministic resume text filling roughly the given number of pages"""
+    rng = random.Random(seed)
+    lines = [
+        "JANE DOE",
+        "Senior Backend Engineer | jane@example.com | Berlin",
+        "",
+        "SUMMARY",
+        "Backend engineer with a decade of experience shipping reliable services.",
+        "",
+        "EXPERIENCE",
+    ]
+    role = 0
+    while len(lines) < pages * LINES_PER_PAGE - 3:
+        lines.append(f"Software Engineer, Company {role} ({2010 + role % 14} - {2011 + role % 14})")
+        for _ in range(5):
+            skills = ", ".join(rng.sample(SKILLS, 2))
+            lines.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {skills}, "
+                         f"cutting latency by {rng.randint(10, 70)}%")
+        role += 1
+    lines.extend(["", "SKILLS", ", ".join(SKILLS)])
+    return lines
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def build_pdf(lines: list) -> bytes:
+    """A minimal text PDF: one page per LINES_PER_PAGE lines"""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in pages:
+        text = "".join(f"({_pdf_escape(line)}) Tj T* " for line in page)
+        stream = f"BT /F1 10 Tf 14 TL 50 790 Td {text}ET".encode("latin-1")
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+def build_docx(lines: list, path: str):
+    from docx import Document
+
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+def build(directory: str = FIXTURES_DIR) -> dict:
+    """Write the corpus to directory; returns name -> file size"""
+    os.makedirs(directory, exist_ok=True)
+    sizes = {}
+    for name, (file_format, pages) in CORPUS.items():
+        path = os.path.join(directory, name)
+        lines = resume_lines(pages)
+        if file_format == "pdf":
+            with open(path, "wb") as f:
+                f.write(build_pdf(lines))
+        elif file_format == "docx":
+            build_docx(lines, path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines))
+        sizes[name] = os.path.getsize(path)
+    with open(os.path.join(directory, "index.json"), "w") as f:
+        json.dump({name: pages for name, (_, pages) in CORPUS.items()}, f, indent=2)
+        f.write("\n")
+    return sizes
+
+def load(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+def main():
+    for name, size in build().items():
+        print(f"{name:22s} {size:8d} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Compare job description extraction speed on the saved HTML fixtures
+
+Runs the extraction engine (job_scraper.extract_job_description) against
+the original BeautifulSoup implementation, when beautifulsoup4 is
+installed, over benchmarks/fixtures/html.
+
+Usage: python -m benchmarks.html_extraction [--iterations 50]
+"""
+import argparse
+import json
+import os
+import time
+
+from app.services import job_extractors
+from app.services.job_scraper import clean_text, extract_job_description
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+def baseline_extract(html: bytes) -> str:
+    """The original BeautifulSoup extraction path, kept for comparison"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    job_selectors = [
+        'div[class*="job-description"]',
+        'div[class*="jobDescription"]',
+        'div[class*="description"]',
+        'div[id*="description"]',
+        'section[class*="description"]',
+        'div[data-testid*="description"]'
+    ]
+    for selector in job_selectors:
+        elements = soup.select(selector)
+        if elements:
+            text = " ".join([elem.get_text(separator=" ", strip=True) for elem in elements])
+            if len(text) > 200:
+                return clean_text(text)
+    return clean_text(soup.get_text(separator=" ", strip=True))
+
+def load_fixtures() -> list:
+    with open(os.path.join(FIXTURES_DIR, "index.json")) as f:
+        urls = json.load(f)
+    fixtures = []
+    for name, url in sorted(urls.items()):
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            fixtures.append((name, url, f.read()))
+    return fixtures
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+def matched_extractor(html: bytes, url: str) -> str:
+    page = job_extractors.Page(html, url)
+    for extractor in job_extractors.EXTRACTORS:
+        text = extractor(page)
+        if text and len(text) > job_extractors.MIN_DESCRIPTION_LENGTH:
+            return extractor.__name__.replace("extract_", "")
+    return "fallback"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    try:
+        import bs4  # noqa: F401
+        has_baseline = True
+    except ImportError:
+        has_baseline = False
+        print("beautifulsoup4 not installed; skipping the baseline column")
+
+    print(f"{'fixture':<22} {'KB':>5} {'extractor':>14} {'engine ms':>10} {'baseline ms':>12} "
+          f"{'speedup':>8} {'chars':>12}")
+    total_engine = total_baseline = 0.0
+    for name, url, html in load_fixtures():
+        engine_ms = time_per_call(lambda: extract_job_description(html, url), args.iterations)
+        total_engine += engine_ms
+        chars = str(len(extract_job_description(html, url)))
+        if has_baseline:
+            baseline_ms = time_per_call(lambda: baseline_extract(html), args.iterations)
+            total_baseline += baseline_ms
+            chars += f"/{len(baseline_extract(html))}"
+            baseline_col = f"{baseline_ms:>12.2f} {baseline_ms / engine_ms:>7.1f}x"
+        else:
+            baseline_col = f"{'-':>12} {'-':>8}"
+        print(f"{name:<22} {len(html) // 1024:>5} {matched_extractor(html, url):>14} "
+              f"{engine_ms:>10.2f} {baseline_col} {chars:>12}")
+
+    if has_baseline:
+        print(f"\ntotal: engine {total_engine:.2f} ms, baseline {total_baseline:.2f} ms "
+              f"({total_baseline / total_engine:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Offline job board serving the saved HTML fixtures to job_scraper"""
+import asyncio
+import json
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+def load_pages() -> dict:
+    """Fixture name -> (URL, HTML bytes) for every page in fixtures/html/index.json"""
+    with open(os.path.join(FIXTURES_DIR, "index.json")) as f:
+        index = json.load(f)
+    pages = {}
+    for name, url in sorted(index.items()):
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            pages[name] = (url, f.read())
+    return pages
+
+def install(latency: float = 0.0) -> dict:
+    """Point the scraper's shared client at the fixtures (call inside the event loop)
+
+    Unknown URLs answer 404. Returns the fetch counters.
+    """
+    import httpx
+    from app.services import job_scraper
+
+    pages = {url: html for url, html in load_pages().values()}
+    counters = {"fetches": 0}
+
+    async def handler(request):
+        counters["fetches"] += 1
+        if latency:
+            await asyncio.sleep(latency)
+        html = pages.get(str(request.url))
+        if html is None:
+            return httpx.Response(404, content=b"Not found")
+        return httpx.Response(200, content=html, headers={"Content-Type": "text/html"})
+
+    job_scraper._client = httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+    job_scraper._client_loop = asyncio.get_running_loop()
+    job_scraper._host_semaphores = {}
+    job_scraper._cache.clear()
+    return counters
@@ -0,0 +1,131 @@
+"""Exercise the background analysis queue: fairness, backpressure, retries and SSE
+
+A heavy user queues a burst of jobs, then a light user queues one; with
+round-robin scheduling the light user's job should finish long before the
+heavy user's backlog drains. The stub model fails a share of calls with a
+transient 503 to exercise retries, one job is followed over SSE, and a final
+burst checks that the per-user bound answers 429.
+
+Usage: python -m benchmarks.job_queue [--heavy 10] [--latency 0.2] [--failure-rate 0.3]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="job-queue-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault("JOB_WORKERS", "2")
+os.environ.setdefault("LLM_RETRY_BASE_DELAY", "0.05")
+os.environ.setdefault("JOB_RETRY_BASE_DELAY", "0.1")
+# Every analysis must reach the model so failures are injected each time
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from benchmarks import stub_gemini  # noqa: E402  (sets a dummy GEMINI_API_KEY)
+
+def register_user(uid: str, tier: str = "pro") -> str:
+    from app import auth
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        db.add(User(firebase_uid=uid, email=f"{uid}@example.com", subscription_tier=tier, usage_count=0))
+        db.commit()
+    finally:
+        db.close()
+    token = f"bench-token-{uid}"
+    auth._token_cache[auth._token_key(token)] = (time.time() + 3600, {"uid": uid, "email": f"{uid}@example.com"})
+    return token
+
+async def submit(client, token: str, n: int):
+    return await client.post("/api/analyze/jobs", headers={"Authorization": f"Bearer {token}"}, json={
+        "resume_text": f"Python developer #{n} with FastAPI experience",
+        "job_description": "Backend role needing Python and Docker"
+    })
+
+async def wait_for(client, token: str, job_id: str) -> dict:
+    while True:
+        response = await client.get(f"/api/analyze/jobs/{job_id}", headers={"Authorization": f"Bearer {token}"})
+        job = response.json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.05)
+
+async def follow(client, token: str, job_id: str) -> list:
+    statuses = []
+    async with client.stream(
+        "GET", f"/api/analyze/jobs/{job_id}/events", headers={"Authorization": f"Bearer {token}"}
+    ) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("data: ") and line != "data: {}":
+                statuses.append(json.loads(line[6:])["status"])
+    return statuses
+
+async def run(heavy_jobs: int):
+    import httpx
+    import main
+    from app.services import analysis_jobs
+
+    await analysis_jobs.start()
+    heavy = register_user(f"heavy-{time.time_ns()}")
+    light = register_user(f"light-{time.time_ns()}")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        start = time.perf_counter()
+        submit_times = []
+        heavy_ids = []
+        for n in range(heavy_jobs):
+            t = time.perf_counter()
+            heavy_ids.append((await submit(client, heavy, n)).json()["job_id"])
+            submit_times.append(time.perf_counter() - t)
+        light_id = (await submit(client, light, 0)).json()["job_id"]
+
+        finished = {}
+        async def track(token, job_id, label):
+            job = await wait_for(client, token, job_id)
+            finished[label] = (time.perf_counter() - start, job)
+
+        sse = asyncio.create_task(follow(client, heavy, heavy_ids[-1]))
+        await asyncio.gather(
+            track(light, light_id, "light"),
+            *[track(heavy, job_id, f"heavy-{n}") for n, job_id in enumerate(heavy_ids)]
+        )
+        statuses = await sse
+
+        order = sorted(finished, key=lambda label: finished[label][0])
+        jobs = [job for _, job in finished.values()]
+        print(f"submit latency: max {max(submit_times) * 1000:.1f} ms over {heavy_jobs} jobs")
+        print(f"light user's job finished #{order.index('light') + 1} of {len(order)} "
+              f"at {finished['light'][0]:.2f}s; last heavy job at {max(t for t, _ in finished.values()):.2f}s")
+        print(f"completed={sum(j['status'] == 'completed' for j in jobs)} "
+              f"failed={sum(j['status'] == 'failed' for j in jobs)} "
+              f"job-level attempts={sum(j['attempts'] for j in jobs)}")
+        print(f"SSE statuses for one job: {' -> '.join(statuses)}")
+
+        # Backpressure: the per-user bound turns a burst into 429s
+        responses = await asyncio.gather(*[submit(client, heavy, n) for n in range(analysis_jobs.JOB_QUEUE_MAX_PER_USER + 5)])
+        codes = [r.status_code for r in responses]
+        rejected = [r for r in responses if r.status_code == 429]
+        print(f"burst of {len(codes)}: 202={codes.count(202)} 429={codes.count(429)} "
+              f"Retry-After={rejected[0].headers.get('Retry-After') if rejected else '-'}")
+
+    await analysis_jobs.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--heavy", type=int, default=10, help="jobs queued by the heavy user")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub model latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.3, help="share of model calls failing with 503")
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency, failure_rate=args.failure_rate)
+    from app import migrations
+    migrations.upgrade_database()
+    asyncio.run(run(args.heavy))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Measure ai_service throughput against a stubbed model at rising concurrency
+
+Usage: python -m benchmarks.llm_concurrency [--latency 0.5] [--requests 32]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+# Every call must reach the model, not the response cache
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from benchmarks import stub_gemini  # noqa: E402
+
+async def _heartbeat(stop: asyncio.Event, lags: list):
+    """Record how late the event loop wakes up while LLM calls are running"""
+    interval = 0.01
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+async def run_level(concurrency: int, total_requests: int) -> dict:
+    from app.services import ai_service
+
+    queue = asyncio.Queue()
+    for _ in range(total_requests):
+        queue.put_nowait(None)
+
+    async def client():
+        while not queue.empty():
+            queue.get_nowait()
+            await ai_service.analyze_resume_match("Python developer resume", "Python job")
+
+    stop = asyncio.Event()
+    lags = []
+    heartbeat = asyncio.create_task(_heartbeat(stop, lags))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+    return {
+        "concurrency": concurrency,
+        "elapsed": elapsed,
+        "rps": total_requests / elapsed,
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="stub model latency in seconds")
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrency level")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="comma separated concurrency levels")
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency)
+    from app.services import llm_client
+
+    print(f"stub latency={args.latency}s, LLM_MAX_CONCURRENCY={llm_client.LLM_MAX_CONCURRENCY}")
+    print(f"{'concurrency':>11} {'elapsed s':>10} {'req/s':>8} {'max loop lag ms':>16}")
+    for level in [int(x) for x in args.levels.split(",")]:
+        result = asyncio.run(run_level(level, args.requests))
+        print(f"{result['concurrency']:>11} {result['elapsed']:>10.2f} "
+              f"{result['rps']:>8.2f} {result['max_loop_lag_ms']:>16.1f}")
+
+if __name__ == "__main__":
+    main()
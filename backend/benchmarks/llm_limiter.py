@@ -0,0 +1,84 @@
+"""Overload the stub model and compare fixed vs adaptive LLM concurrency by subscription tier
+
+The stub answers 429 once more than --capacity calls are in flight, like a
+quota shared by the whole key. Half the clients are pro users and half free,
+each sending section rewrites back to back. Reports per tier: completed and
+failed calls (a 429 that survived the retry) and latency percentiles, then
+how often the stub rejected a call and the limiter's final state.
+
+--fixed pins the concurrency limit at LLM_MAX_CONCURRENCY (no AIMD) and
+--no-priority queues free users like paid ones, to compare against.
+
+Usage: python -m benchmarks.llm_limiter [--clients 32] [--duration 15] [--capacity 4] [--latency 0.3]
+                                        [--fixed] [--no-priority]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from benchmarks import report, stub_gemini  # noqa: E402
+
+TIERS = ("pro", "free")
+_sequence = itertools.count()
+
+async def client(tier: str, deadline: float, samples: dict):
+    from app.services import ai_service, llm_limiter
+
+    llm_limiter.set_tier(tier)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        result = await ai_service.rewrite_section(
+            f"Built internal tools in Python ({next(_sequence)})", "Python developer resume", "Python backend job"
+        )
+        outcome = "failed" if result.startswith("Error") else "ok"
+        samples[tier][outcome].append(time.perf_counter() - start)
+        if outcome == "failed":
+            # A user seeing an error waits a moment before trying again
+            await asyncio.sleep(0.5)
+
+async def run(clients: int, duration: float) -> dict:
+    samples = {tier: {"ok": [], "failed": []} for tier in TIERS}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[client(TIERS[n % len(TIERS)], deadline, samples) for n in range(clients)])
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds measured")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub model latency in seconds")
+    parser.add_argument("--capacity", type=int, default=4, help="calls in flight the stub accepts before 429")
+    parser.add_argument("--fixed", action="store_true", help="keep the concurrency limit at its maximum")
+    parser.add_argument("--no-priority", action="store_true", help="queue free users like paid ones")
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency, capacity=args.capacity)
+    from app.services import llm_limiter
+
+    if args.fixed:
+        llm_limiter.LLM_MIN_CONCURRENCY = llm_limiter.LLM_MAX_CONCURRENCY
+    if args.no_priority:
+        llm_limiter.TIER_DELAYS["free"] = 0.0
+
+    samples = asyncio.run(run(args.clients, args.duration))
+
+    print(f"{args.clients} clients, {args.duration:g}s, stub latency={args.latency}s capacity={args.capacity}, "
+          f"LLM_MAX_CONCURRENCY={llm_limiter.LLM_MAX_CONCURRENCY}, "
+          f"{'fixed' if args.fixed else 'adaptive'} limit, {'no ' if args.no_priority else ''}tier priority")
+    print(f"{'tier':<6} {'ok':>6} {'failed':>7} {'req/s':>7} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for tier in TIERS:
+        ok, failed = samples[tier]["ok"], samples[tier]["failed"]
+        summary = report.summarize(ok)
+        print(f"{tier:<6} {len(ok):>6} {len(failed):>7} {len(ok) / args.duration:>7.1f} "
+              + " ".join(f"{report.format_seconds(summary[key]):>10}" for key in ("p50", "p95", "p99")))
+    stats = llm_limiter.get_stats()
+    print(f"stub calls={stub_gemini.StubModel.calls} rejected with 429={stub_gemini.StubModel.rejected}; "
+          f"limit now {stats['concurrency_limit']} after {stats['cuts']} cuts, "
+          f"queued={stats['queued']}, queue timeouts={stats['timeouts']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""End-to-end load generator: throughput and p50/p95/p99 per endpoint
+
+Sends a weighted mix of requests (analyze by text and by job URL, keyword
+preview, resume upload, rewrite, cover letter, history, health) and reports
+per endpoint: requests, errors, throughput and latency percentiles.
+
+By default the app runs in-process with the stub model (latency, jitter and
+failure injection configurable) and the saved job pages as an offline job
+board, against a throwaway SQLite database. With --url it loads a running
+server instead, normally one started with python -m benchmarks.serve, which
+installs the same stubs and accepts the same tokens.
+
+Closed loop (default): --clients send back to back. Open loop: --rate
+requests per second arrive on a Poisson schedule whatever the latency, and
+latency counts from the scheduled time, so queueing shows up in the tail.
+
+Usage: python -m benchmarks.load [--clients 20] [--duration 30] [--rate 50]
+                                 [--mix analyze=4,history=2] [--url http://localhost:8000]
+                                 [--latency 0.3] [--jitter 0.2] [--failure-rate 0.05]
+                                 [--json out.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+if "--url" not in sys.argv:
+    _db_dir = tempfile.mkdtemp(prefix="load-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from benchmarks import documents, job_board, report, stub_gemini  # noqa: E402  (sets a dummy GEMINI_API_KEY)
+
+JOB_DESCRIPTION = (
+    "Senior backend engineer. Requirements: Python, FastAPI, PostgreSQL, Redis, Docker, Kubernetes, "
+    "AWS and CI/CD. You will own our event pipeline on Kafka and mentor engineers."
+)
+JOB_URLS = [url for url, _ in job_board.load_pages().values()]
+RESUME = "\n".join(documents.resume_lines(1))
+UPLOAD = ("resume_1page.pdf", documents.load("resume_1page.pdf"), "application/pdf")
+
+DEFAULT_MIX = {
+    "analyze": 4,
+    "analyze_url": 2,
+    "preview": 2,
+    "history": 2,
+    "upload": 1,
+    "rewrite": 1,
+    "cover_letter": 1,
+    "health": 1,
+}
+
+_sequence = itertools.count()
+
+def register_users(count: int) -> list:
+    """Pro-tier users with pre-verified tokens load-token-<n>; existing users are reused
+
+    Runs in the process serving the app, since tokens live in its cache.
+    """
+    from app import auth
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        for n in range(count):
+            uid = f"load-user-{n}"
+            if db.query(User).filter(User.firebase_uid == uid).first() is None:
+                db.add(User(firebase_uid=uid, email=f"{uid}@example.com", subscription_tier="pro", usage_count=0))
+        db.commit()
+    finally:
+        db.close()
+
+    tokens = []
+    for n in range(count):
+        token = f"load-token-{n}"
+        claims = {"uid": f"load-user-{n}", "email": f"load-user-{n}@example.com"}
+        auth._token_cache[auth._token_key(token)] = (time.time() + 24 * 3600, claims)
+        tokens.append(token)
+    return tokens
+
+def resume_text(cache_share: float) -> str:
+    """The fixture resume, made unique unless this request should hit the caches"""
+    if random.random() < cache_share:
+        return RESUME
+    # At the top, where prompt_builder always keeps it
+    return f"Reference {next(_sequence)}\n{RESUME}"
+
+async def send(client, endpoint: str, token: str, cache_share: float):
+    headers = {"Authorization": f"Bearer {token}"}
+    if endpoint == "analyze":
+        return await client.post("/api/analyze", headers=headers, json={
+            "resume_text": resume_text(cache_share), "job_description": JOB_DESCRIPTION
+        })
+    if endpoint == "analyze_url":
+        return await client.post("/api/analyze", headers=headers, json={
+            "resume_text": resume_text(cache_share), "job_url": random.choice(JOB_URLS)
+        })
+    if endpoint == "preview":
+        return await client.post("/api/analyze/preview", headers=headers, json={
+            "resume_text": resume_text(cache_share), "job_description": JOB_DESCRIPTION
+        })
+    if endpoint == "history":
+        return await client.get("/api/user/history", headers=headers)
+    if endpoint == "upload":
+        return await client.post("/api/upload-resume", headers=headers, files={"file": UPLOAD})
+    if endpoint == "rewrite":
+        return await client.post("/api/rewrite-section", headers=headers, params={
+            "section": "Built internal tools in Python and maintained the CI pipeline.",
+            "resume_text": resume_text(cache_share), "job_description": JOB_DESCRIPTION
+        })
+    if endpoint == "cover_letter":
+        return await client.post("/api/generate-cover-letter", headers=headers, json={
+            "resume_text": resume_text(cache_share), "job_description": JOB_DESCRIPTION,
+            "company_name": "Acme"
+        })
+    if endpoint == "health":
+        return await client.get("/health")
+    raise ValueError(f"Unknown endpoint {endpoint!r}")
+
+async def timed(client, endpoint: str, token: str, cache_share: float, start: float, samples: list):
+    try:
+        response = await send(client, endpoint, token, cache_share)
+        status = response.status_code
+    except Exception as e:
+        status = type(e).__name__
+    samples.append((endpoint, status, time.perf_counter() - start))
+
+async def closed_loop(client, tokens: list, mix: dict, deadline: float, cache_share: float, samples: list):
+    endpoints, weights = list(mix), list(mix.values())
+
+    async def client_loop(token: str):
+        while time.perf_counter() < deadline:
+            endpoint = random.choices(endpoints, weights)[0]
+            await timed(client, endpoint, token, cache_share, time.perf_counter(), samples)
+
+    await asyncio.gather(*[client_loop(token) for token in tokens])
+
+async def open_loop(client, tokens: list, mix: dict, deadline: float, cache_share: float, rate: float,
+                    samples: list):
+    endpoints, weights = list(mix), list(mix.values())
+    tasks = []
+    scheduled = time.perf_counter()
+    while scheduled < deadline:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        endpoint = random.choices(endpoints, weights)[0]
+        tasks.append(asyncio.create_task(
+            timed(client, endpoint, random.choice(tokens), cache_share, scheduled, samples)
+        ))
+        scheduled += random.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+async def run(args, mix: dict) -> tuple:
+    import httpx
+
+    if args.url:
+        tokens = [f"load-token-{n}" for n in range(args.users)]
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        import main
+
+        tokens = register_users(args.users)
+        job_board.install(args.job_board_latency)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://load", timeout=args.timeout
+        )
+
+    samples = []
+    async with client:
+        if args.warmup:
+            await closed_loop(client, tokens[:args.clients], mix, time.perf_counter() + args.warmup,
+                              args.cache_share, [])
+        start = time.perf_counter()
+        deadline = start + args.duration
+        if args.rate:
+            await open_loop(client, tokens, mix, deadline, args.cache_share, args.rate, samples)
+        else:
+            # Clients take the users round-robin when there are more clients than users
+            clients = [tokens[n % len(tokens)] for n in range(args.clients)]
+            await closed_loop(client, clients, mix, deadline, args.cache_share, samples)
+        elapsed = time.perf_counter() - start
+    return samples, elapsed
+
+def summarize(samples: list, elapsed: float) -> dict:
+    results = {}
+    for endpoint in sorted({sample[0] for sample in samples}) + ["total"]:
+        selected = [s for s in samples if endpoint in ("total", s[0])]
+        errors = {}
+        for _, status, _ in selected:
+            if not isinstance(status, int) or status >= 400:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+        results[endpoint] = {
+            **report.summarize([latency for _, _, latency in selected]),
+            "errors": errors,
+            "throughput": len(selected) / elapsed,
+        }
+    return results
+
+def parse_mix(value: str) -> dict:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}; choose from {', '.join(DEFAULT_MIX)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="load a running server instead of the app in-process")
+    parser.add_argument("--clients", type=int, default=20, help="concurrent clients (closed loop)")
+    parser.add_argument("--rate", type=float, default=0.0, help="arrivals per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds measured")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds run before measuring")
+    parser.add_argument("--users", type=int, default=20, help="distinct users the requests are spread over")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(""),
+                        help="endpoint=weight pairs, e.g. analyze=4,history=2 (default: all endpoints)")
+    parser.add_argument("--cache-share", type=float, default=0.0,
+                        help="share of requests reusing the same resume, so they can hit the caches")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout in seconds")
+    parser.add_argument("--job-board-latency", type=float, default=0.05, help="offline job board latency")
+    stub_gemini.add_arguments(parser)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare p95s against this file (written if missing)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    if not args.url:
+        stub_gemini.install_from_args(args)
+        from app import migrations
+        migrations.upgrade_database()
+
+    samples, elapsed = asyncio.run(run(args, args.mix))
+    results = summarize(samples, elapsed)
+
+    mode = f"open loop {args.rate:g}/s" if args.rate else f"closed loop {args.clients} clients"
+    if args.url:
+        print(f"{args.url}, {mode}, {elapsed:.1f}s")
+    else:
+        print(f"in-process, {mode}, {elapsed:.1f}s, stub latency={args.latency}s jitter={args.jitter}s "
+              f"failure rate={args.failure_rate} ({args.failure})")
+    print(f"{'endpoint':<14} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50':>10} {'p95':>10} {'p99':>10}  errors")
+    for endpoint, result in results.items():
+        errors = sum(result["errors"].values())
+        print(f"{endpoint:<14} {result['count']:>9} {errors:>7} {result['throughput']:>8.1f} "
+              + " ".join(f"{report.format_seconds(result[key]):>10}" for key in ("p50", "p95", "p99"))
+              + (f"  {result['errors']}" if errors else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        regressions = report.compare(results, args.baseline, "p95", args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} endpoint(s) slower than the baseline")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Micro-benchmarks for text extraction, job page parsing and clean_text
+
+Times, per fixture:
+  extract_text_from_file  - the PDF/DOCX/TXT fixtures in fixtures/documents,
+                            through the extraction process pool (warmed first)
+  parse_document          - the same PDF/DOCX parsing in-process, without the
+                            pool round trip
+  scrape_job_description  - a full scrape of each fixtures/html page from an
+                            offline job board, URL cache cleared every call
+  extract_job_description - HTML parsing and cleanup alone
+  clean_text              - normalizing each page's raw extracted text
+
+Results can be saved and compared against a baseline to catch regressions:
+the first run with --baseline writes the file, later runs exit non-zero when
+a benchmark's p50 is slower than the baseline by more than --tolerance.
+
+Usage: python -m benchmarks.micro [--iterations 50] [--filter pdf] [--json out.json]
+                                  [--baseline baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub-key")
+
+from app.services import document_extractor, job_extractors, resume_analyzer  # noqa: E402
+from app.services.job_scraper import clean_text, extract_job_description, scrape_job_description  # noqa: E402
+from benchmarks import documents, job_board, report  # noqa: E402
+
+def time_sync(fn, iterations: int) -> list:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+async def time_async(fn, iterations: int) -> list:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def parse_document(name: str, content: bytes):
+    if name.endswith(".pdf"):
+        return lambda: document_extractor._extract_pdf_pages(content, 0, document_extractor.EXTRACT_MAX_PAGES)
+    return lambda: document_extractor._extract_docx(content)
+
+async def run_async(iterations: int, wanted) -> dict:
+    from app.services import job_scraper
+
+    results = {}
+    names = sorted(documents.CORPUS)
+    # Start the pool's workers before timing anything
+    for name in names:
+        await resume_analyzer.extract_text_from_file(documents.load(name), name)
+
+    for name in names:
+        label = f"extract_text_from_file[{name}]"
+        if wanted(label):
+            content = documents.load(name)
+            results[label] = await time_async(
+                lambda: resume_analyzer.extract_text_from_file(content, name), iterations
+            )
+
+    job_board.install()
+    for name, (url, _) in job_board.load_pages().items():
+        label = f"scrape_job_description[{name}]"
+        if wanted(label):
+            async def scrape():
+                job_scraper._cache.clear()
+                await scrape_job_description(url)
+            results[label] = await time_async(scrape, iterations)
+    return results
+
+def run(iterations: int, pattern: str) -> dict:
+    def wanted(label: str) -> bool:
+        return not pattern or pattern in label
+
+    results = asyncio.run(run_async(iterations, wanted))
+    document_extractor.shutdown()
+
+    for name in sorted(documents.CORPUS):
+        label = f"parse_document[{name}]"
+        if wanted(label) and not name.endswith(".txt"):
+            parse = parse_document(name, documents.load(name))
+            parse()  # imports the parser
+            results[label] = time_sync(parse, iterations)
+
+    for name, (url, html) in job_board.load_pages().items():
+        label = f"extract_job_description[{name}]"
+        if wanted(label):
+            results[label] = time_sync(lambda: extract_job_description(html, url), iterations)
+        label = f"clean_text[{name}]"
+        if wanted(label):
+            raw = job_extractors.extract(html, url)
+            results[label] = time_sync(lambda: clean_text(raw), iterations)
+
+    return {label: report.summarize(latencies) for label, latencies in results.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50, help="timed calls per benchmark")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare p50s against this file (written if missing)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.filter)
+    print(f"{'benchmark':<50} {'mean':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+    for label, summary in results.items():
+        print(f"{label:<50} " + " ".join(
+            f"{report.format_seconds(summary[key]):>10}" for key in ("mean", "p50", "p95", "p99")
+        ))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        regressions = report.compare(results, args.baseline, "p50", args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than the baseline")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
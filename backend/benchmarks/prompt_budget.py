@@ -0,0 +1,154 @@
+"""Compare prompt inputs built by prompt_builder against the old character cuts
+
+For each call type (analysis, rewrite, cover letter) and each resume/job pair,
+reports estimated input tokens and how many of the job's skills survive in
+the prompt: skills the job asks for (job recall) and skills the resume has
+that the job asks for (resume recall). Pairs are a long synthetic resume
+with its skills listed last, a pasted job posting with navigation and an
+EEO statement, and the scraped job pages in fixtures/html.
+
+Usage: python -m benchmarks.prompt_budget [--repeat 50]
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub-key")
+
+from app.services import keyword_matcher, prompt_builder  # noqa: E402
+from app.services.job_scraper import extract_job_description  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+# The truncation each prompt used before prompt_builder (None: sent whole)
+OLD_LIMITS = {
+    "analysis": (5000, 3000),
+    "rewrite": (1000, None),
+    "cover_letter": (2000, None),
+}
+
+SECTION = "Built internal tools in Python and maintained the CI pipeline."
+
+def long_resume() -> str:
+    roles = []
+    for n in range(12):
+        roles.append(f"Software Engineer, Company {n} ({2008 + n} - {2009 + n})")
+        roles.extend([
+            f"- Led the migration of a legacy billing system serving {n + 2} million customers to a new platform",
+            f"- Coordinated quarterly planning for {n + 3} product lines with marketing, sales and finance",
+            f"- Presented roadmap updates at {n + 4} all-hands meetings and wrote the internal newsletter",
+            f"- Improved onboarding documentation and ran office hours for {n * 5 + 10} new hires",
+            f"- Interviewed {n * 7 + 20} candidates and helped define the engineering career ladder",
+            f"- Reduced vendor spend by {n + 10}% by renegotiating contracts and retiring unused tools",
+        ])
+        if n % 3 == 0:
+            roles.append("- Designed REST APIs in Python with FastAPI and PostgreSQL, deployed with Docker on AWS")
+    return "\n".join([
+        "JANE DOE",
+        "Senior Backend Engineer | jane@example.com | Berlin",
+        "",
+        "SUMMARY",
+        "Backend engineer with a decade of experience shipping reliable services and leading teams.",
+        "",
+        "EXPERIENCE",
+        *roles,
+        "",
+        "EDUCATION",
+        "B.Sc. Computer Science, Technical University (2006 - 2010)",
+        "",
+        "INTERESTS",
+        "Cycling, photography, board games, volunteering at the local animal shelter",
+        "",
+        "SKILLS",
+        "Python, Go, Kubernetes, Terraform, Kafka, Redis, GraphQL, Prometheus, Grafana, CI/CD",
+    ])
+
+def pasted_job() -> str:
+    return "\n".join([
+        "Home", "Jobs", "Teams", "Locations", "Sign in",
+        "",
+        "About us",
+        "Acme builds hiring software used by thousands of companies worldwide. " * 6,
+        "",
+        "What you'll do",
+        "Design and operate Python and Go services on Kubernetes in AWS.",
+        "Own our Kafka event pipeline and the PostgreSQL and Redis data layer.",
+        "",
+        "Requirements:",
+        "5+ years building backend systems. Strong Python, Docker and CI/CD experience.",
+        "Nice to have: Terraform, GraphQL, Prometheus and Grafana.",
+        "",
+        "Benefits",
+        "Competitive salary, equity, generous parental leave, wellness budget and team offsites. " * 4,
+        "",
+        "Acme is an equal opportunity employer. All qualified applicants will receive consideration "
+        "for employment without regard to race, color, religion, sex, sexual orientation, gender identity, "
+        "national origin, disability or protected veteran status. " * 2,
+        "We use cookies to improve your experience. Read our privacy policy.",
+        "Share this job", "Apply now", "Similar jobs",
+    ])
+
+def job_pairs() -> list:
+    pairs = [("pasted posting", pasted_job())]
+    with open(os.path.join(FIXTURES, "index.json")) as f:
+        index = json.load(f)
+    for name, url in index.items():
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            pairs.append((name, extract_job_description(f.read(), url)))
+    return pairs
+
+def skills(text: str) -> set:
+    return set(keyword_matcher.extract_skills(keyword_matcher.tokenize(text)))
+
+def old_inputs(kind: str, resume: str, job: str) -> tuple:
+    resume_limit, job_limit = OLD_LIMITS[kind]
+    return resume[:resume_limit], job if job_limit is None else job[:job_limit]
+
+def new_inputs(kind: str, resume: str, job: str) -> tuple:
+    if kind == "analysis":
+        return prompt_builder.analysis_inputs(resume, job)
+    if kind == "rewrite":
+        return prompt_builder.rewrite_inputs(SECTION, resume, job)
+    return prompt_builder.cover_letter_inputs(resume, job)
+
+def recall(kept: str, wanted: set) -> str:
+    return f"{len(skills(kept) & wanted)}/{len(wanted)}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50, help="builds timed per call type")
+    args = parser.parse_args()
+
+    resume = long_resume()
+    print(f"resume: {len(resume)} chars, ~{prompt_builder.estimate_tokens(resume)} tokens")
+    print(f"{'job':20s} {'call':12s} {'tokens old':>10s} {'new':>6s}  {'job recall old':>14s} {'new':>6s}  "
+          f"{'resume recall old':>17s} {'new':>6s}")
+    for name, job in job_pairs():
+        job_skills = skills(job)
+        shared = job_skills & skills(resume)
+        for kind in OLD_LIMITS:
+            before = old_inputs(kind, resume, job)
+            after = new_inputs(kind, resume, job)
+            print(f"{name:20s} {kind:12s} "
+                  f"{sum(map(prompt_builder.estimate_tokens, before)):10d} "
+                  f"{sum(map(prompt_builder.estimate_tokens, after)):6d}  "
+                  f"{recall(before[1], job_skills):>14s} {recall(after[1], job_skills):>6s}  "
+                  f"{recall(before[0], shared):>17s} {recall(after[0], shared):>6s}")
+
+    job = pasted_job()
+    caches = (prompt_builder._blocks, prompt_builder._terms, prompt_builder._cost)
+    for kind in OLD_LIMITS:
+        timings = {}
+        for label, cold in (("cold", True), ("warm", False)):
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                if cold:
+                    for cache in caches:
+                        cache.cache_clear()
+                new_inputs(kind, resume, job)
+            timings[label] = (time.perf_counter() - start) / args.repeat
+        print(f"build time {kind:12s}: cold {timings['cold'] * 1000:.2f} ms, warm {timings['warm'] * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Latency summaries and baseline comparison shared by the benchmarks"""
+import json
+import statistics
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(latencies: list) -> dict:
+    """Count, mean and p50/p95/p99 of a list of latencies in seconds"""
+    if not latencies:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    return {
+        "count": len(latencies),
+        "mean": statistics.mean(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.3f}s"
+
+def compare(results: dict, baseline_path: str, metric: str, tolerance: float) -> list:
+    """Names whose metric got slower than the baseline file by more than tolerance (0.2 = 20%)
+
+    A missing baseline file is written from results instead, so the first run
+    on a known-good commit records it.
+    """
+    try:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {baseline_path}")
+        return []
+
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name, {}).get(metric)
+        if not before:
+            continue
+        change = result[metric] / before - 1
+        flag = "  REGRESSION" if change > tolerance else ""
+        print(f"  {name:50s} {metric} {format_seconds(before):>10s} -> {format_seconds(result[metric]):>10s} "
+              f"({change:+.0%}){flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
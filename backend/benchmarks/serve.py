@@ -0,0 +1,46 @@
+"""Run the API on uvicorn with the stub model and the offline job board
+
+For load testing a real server process (workers, sockets, the full middleware
+stack) without a Gemini key or network access. Registers the load-token-<n>
+users that benchmarks.load --url sends requests as.
+
+Usage: python -m benchmarks.serve [--port 8000] [--users 20] [--latency 0.3] [--failure-rate 0.05]
+"""
+import argparse
+from contextlib import asynccontextmanager
+
+from benchmarks import job_board, stub_gemini
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--users", type=int, default=20, help="load-token-<n> users to register")
+    parser.add_argument("--job-board-latency", type=float, default=0.05, help="offline job board latency")
+    stub_gemini.add_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    import main as api
+    from app import migrations
+    from benchmarks.load import register_users
+
+    stub_gemini.install_from_args(args)
+    migrations.upgrade_database()
+    register_users(args.users)
+
+    # The scraper's client is bound to the server's event loop, so swap it in there
+    app_lifespan = api.app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with app_lifespan(app) as state:
+            job_board.install(args.job_board_latency)
+            yield state
+
+    api.app.router.lifespan_context = lifespan
+
+    uvicorn.run(api.app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
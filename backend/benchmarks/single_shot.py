@@ -0,0 +1,72 @@
+"""Compare the separate-call analysis with the single-shot JSON analysis
+
+Runs resume_analyzer.analyze_resume against a stubbed model in both modes and
+reports model calls, estimated input tokens and latency per analysis, and
+whether every single-shot result validated without falling back.
+
+Usage: python -m benchmarks.single_shot [--runs 10] [--latency 0.3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Every analysis must reach the model
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from benchmarks import stub_gemini  # noqa: E402  (sets a dummy GEMINI_API_KEY)
+from benchmarks.prompt_budget import long_resume, pasted_job  # noqa: E402
+
+async def run(runs: int) -> dict:
+    from app.services import ai_service, prompt_builder, resume_analyzer
+
+    counters = {"calls": 0, "input_tokens": 0}
+    generate = stub_gemini.StubModel.generate_content
+
+    def counting_generate(self, prompt, **kwargs):
+        counters["calls"] += 1
+        counters["input_tokens"] += prompt_builder.estimate_tokens(prompt)
+        return generate(self, prompt, **kwargs)
+
+    stub_gemini.StubModel.generate_content = counting_generate
+    resume, job = long_resume(), pasted_job()
+    results = {}
+    try:
+        for label, single_shot in (("separate calls", False), ("single-shot", True)):
+            ai_service.SINGLE_SHOT_ANALYSIS = single_shot
+            counters.update(calls=0, input_tokens=0)
+            latencies = []
+            sections = set()
+            for n in range(runs):
+                start = time.perf_counter()
+                # Vary the job text so nothing is shared between runs
+                analysis = await resume_analyzer.analyze_resume(resume, f"{job}\nReference {n}")
+                latencies.append(time.perf_counter() - start)
+                sections.add(tuple(sorted(analysis["rewritten_sections"].items())))
+            results[label] = {
+                "calls": counters["calls"] / runs,
+                "input_tokens": counters["input_tokens"] / runs,
+                "latency": statistics.mean(latencies),
+                "rewritten": all(
+                    text == stub_gemini.STUB_TEXT for result in sections for _, text in result
+                )
+            }
+    finally:
+        stub_gemini.StubModel.generate_content = generate
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub model latency in seconds")
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=args.latency)
+    results = asyncio.run(run(args.runs))
+    for label, result in results.items():
+        print(f"{label:15s} calls/analysis={result['calls']:.1f} input tokens/analysis={result['input_tokens']:.0f} "
+              f"mean latency={result['latency']:.3f}s all sections rewritten={result['rewritten']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Measure cold start: time to first response and first-request latency
+
+Every run starts a fresh uvicorn process on a fresh SQLite database, with the
+stub model and a stub model listing that takes --list-latency seconds (a
+round trip to the Gemini API). Reports the median over --runs of:
+  import      - import main, in the server process
+  ready       - from spawning the process until /health first answers
+  first       - the first /api/analyze after that
+  second      - the next /api/analyze
+
+Usage: python -m benchmarks.startup [--runs 5] [--latency 0.3] [--list-latency 0.5]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+STAGES = ("import", "ready", "first", "second")
+
+def serve(port: int, latency: float, list_latency: float):
+    """The server process: import the app as uvicorn would, then serve it"""
+    start = time.perf_counter()
+    import main
+    print(json.dumps({"import": time.perf_counter() - start}), flush=True)
+
+    import uvicorn
+    from benchmarks import stub_gemini
+
+    stub_gemini.install(latency=latency, discover=True)
+    stub_gemini.list_models_latency = list_latency
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def cold_start(latency: float, list_latency: float) -> dict:
+    import httpx
+
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="startup-bench-") as db_dir:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+            GEMINI_API_KEY="benchmark-stub-key",
+            LLM_CACHE_ENABLED="false"
+        )
+        spawned = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.startup", "--serve", str(port),
+             "--latency", str(latency), "--list-latency", str(list_latency)],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        )
+        try:
+            timings = {}
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+                while True:
+                    try:
+                        if client.get("/health").status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    if server.poll() is not None:
+                        raise SystemExit("server exited during startup")
+                    time.sleep(0.005)
+                timings["ready"] = time.perf_counter() - spawned
+
+                headers = {"Authorization": "Bearer demo-token-123"}
+                for stage in ("first", "second"):
+                    mark = time.perf_counter()
+                    response = client.post("/api/analyze", headers=headers, json={
+                        "resume_text": f"Python developer, {stage} request",
+                        "job_description": "Backend role needing Python"
+                    })
+                    timings[stage] = time.perf_counter() - mark
+                    if response.status_code != 200:
+                        raise SystemExit(f"/api/analyze answered {response.status_code}: {response.text}")
+            timings.update(json.loads(server.stdout.readline()))
+        finally:
+            server.terminate()
+            server.wait()
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub model latency in seconds")
+    parser.add_argument("--list-latency", type=float, default=0.5, help="stub model listing latency in seconds")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.latency, args.list_latency)
+        return
+
+    runs = [cold_start(args.latency, args.list_latency) for _ in range(args.runs)]
+    print(f"stub latency={args.latency}s, model listing={args.list_latency}s, median of {args.runs} cold starts")
+    for stage in STAGES:
+        values = [run[stage] for run in runs]
+        print(f"  {stage:8s} {statistics.median(values):.3f}s  (min {min(values):.3f}s, max {max(values):.3f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Offline stand-in for the Gemini SDK used by the benchmarks"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from google.api_core import exceptions as google_exceptions
+
+# ai_service refuses to import without a key; the stub never uses it
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub-key")
+
+ANALYSIS_JSON = json.dumps({
+    "match_score": 82,
+    "keywords_missing": ["Docker", "Kubernetes"],
+    "keywords_present": ["Python", "FastAPI", "SQL"],
+    "suggestions": ["Mention container experience", "Quantify API performance work"]
+})
+
+STUB_TEXT = "Stub rewrite of the requested section."
+
+# Errors the stub can inject, as the SDK raises them
+FAILURES = {
+    "unavailable": lambda: google_exceptions.ServiceUnavailable("stub: model overloaded"),
+    "quota": lambda: google_exceptions.ResourceExhausted("stub: quota exceeded"),
+    "timeout": lambda: google_exceptions.DeadlineExceeded("stub: deadline exceeded"),
+    "invalid": lambda: google_exceptions.InvalidArgument("stub: request rejected"),
+}
+
+def single_shot_json(prompt: str) -> str:
+    """Combined analysis answer, rewriting every section named in the prompt"""
+    names = re.findall(r'^Section "([^"]+)":$', prompt, re.MULTILINE)
+    return json.dumps({
+        **json.loads(ANALYSIS_JSON),
+        "rewritten_sections": {name: STUB_TEXT for name in names}
+    })
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+        self.candidates = []
+
+class StubModel:
+    """Mimics genai.GenerativeModel with a blocking latency per call"""
+    latency = 0.5
+    # Extra latency drawn uniformly from [0, jitter] per call
+    jitter = 0.0
+    # Share of calls that fail after the latency, with an error from FAILURES
+    failure_rate = 0.0
+    failure = "unavailable"
+    # Models the failures apply to; empty for every model
+    failing_models = ()
+    # Calls in flight beyond this are rejected with a quick 429, like a quota
+    # (0 for no limit)
+    capacity = 0
+    in_flight = 0
+    rejected = 0
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, model_name="models/stub", **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        StubModel.calls += 1
+        if '"rewritten_sections"' in prompt:
+            text = single_shot_json(prompt)
+        else:
+            text = ANALYSIS_JSON if "Return ONLY valid JSON" in prompt else STUB_TEXT
+        if stream:
+            return self._stream(text)
+        with self._admitted():
+            time.sleep(self._latency())
+        self._maybe_fail()
+        return StubResponse(text)
+
+    @contextmanager
+    def _admitted(self):
+        with StubModel._lock:
+            admitted = not self.capacity or StubModel.in_flight < self.capacity
+            if admitted:
+                StubModel.in_flight += 1
+            else:
+                StubModel.rejected += 1
+        if not admitted:
+            time.sleep(0.02)
+            raise google_exceptions.ResourceExhausted("stub: too many requests in flight")
+        try:
+            yield
+        finally:
+            with StubModel._lock:
+                StubModel.in_flight -= 1
+
+    def _latency(self) -> float:
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _maybe_fail(self):
+        if self.failing_models and self.model_name not in self.failing_models:
+            return
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise FAILURES[self.failure]()
+
+    def _stream(self, text):
+        """Spread the latency across word-sized chunks like a streamed completion"""
+        words = text.split(" ")
+        latency = self._latency()
+        for i, word in enumerate(words):
+            time.sleep(latency / len(words))
+            # A failed stream breaks off after its first chunk
+            if i == 1:
+                self._maybe_fail()
+            yield StubResponse(word if i == 0 else " " + word)
+
+class StubModelInfo:
+    def __init__(self, name):
+        self.name = name
+        self.supported_generation_methods = ["generateContent", "countTokens"]
+
+# Models the stub's list_models reports, and how long the listing takes
+LISTED_MODELS = ["models/gemini-2.5-flash", "models/gemini-2.5-flash-lite", "models/gemini-2.5-pro"]
+list_models_latency = 0.5
+
+def list_models():
+    time.sleep(list_models_latency)
+    return iter([StubModelInfo(name) for name in LISTED_MODELS])
+
+def install(latency=0.5, failure_rate=0.0, jitter=0.0, failure="unavailable", discover=False,
+            models=("models/stub",), failing_models=(), capacity=0):
+    """Swap the real Gemini model and model listing for the stub
+
+    Unless discover is set, the router gets models up front, as if discovery
+    had already listed them. failing_models limits the injected failures to
+    those models, to watch the router fail over.
+    """
+    from app.services import ai_service, model_router
+
+    if failure not in FAILURES:
+        raise ValueError(f"Unknown failure {failure!r}; choose from {', '.join(FAILURES)}")
+    StubModel.latency = latency
+    StubModel.jitter = jitter
+    StubModel.failure_rate = failure_rate
+    StubModel.failure = failure
+    StubModel.failing_models = tuple(failing_models)
+    StubModel.capacity = capacity
+
+    # Patch the SDK when ai_service loads it, so it is still imported (and
+    # timed) when the app would import it
+    load_sdk = ai_service._sdk
+
+    def stub_sdk():
+        genai = load_sdk()
+        genai.GenerativeModel = StubModel
+        genai.list_models = list_models
+        return genai
+
+    ai_service._sdk = stub_sdk
+    ai_service._models.clear()
+    if not discover:
+        model_router.set_models(list(models))
+        ai_service.refresh_models = lambda: list(models)
+
+def _names(value: str) -> list:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+def add_arguments(parser):
+    """The stub's latency and failure injection options, for benchmark CLIs"""
+    parser.add_argument("--latency", type=float, default=0.3, help="stub model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of model calls that fail")
+    parser.add_argument("--failure", choices=sorted(FAILURES), default="unavailable",
+                        help="error raised by failing calls")
+    parser.add_argument("--models", type=_names, default=["models/stub"],
+                        help="comma-separated models the router can use, e.g. "
+                             "models/gemini-2.5-flash,models/gemini-2.5-flash-lite")
+    parser.add_argument("--failing-models", type=_names, default=[],
+                        help="comma-separated models the failures apply to (default: all)")
+    parser.add_argument("--capacity", type=int, default=0,
+                        help="calls in flight the stub accepts before answering 429 (default: no limit)")
+
+def install_from_args(args):
+    install(latency=args.latency, failure_rate=args.failure_rate, jitter=args.jitter, failure=args.failure,
+            models=args.models, failing_models=args.failing_models, capacity=args.capacity)
@@ -0,0 +1,129 @@
+"""Check that usage accounting loses no increments and never overshoots the limit
+
+Fires parallel reservations straight at the database from many threads, then
+parallel /api/analyze requests through the app with a stubbed model, using a
+throwaway SQLite database. The API requests differ so each is charged on its
+own; a last case sends identical ones, which single-flight joins into one
+analysis charged once.
+
+Usage: python -m benchmarks.usage_concurrency [--threads 32] [--requests 20]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_db_dir = tempfile.mkdtemp(prefix="usage-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+
+from benchmarks import stub_gemini  # noqa: E402  (sets a dummy GEMINI_API_KEY)
+
+def create_user(uid: str, tier: str) -> int:
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        user = User(firebase_uid=uid, email=f"{uid}@example.com", subscription_tier=tier, usage_count=0)
+        db.add(user)
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+def usage_count(user_id: int) -> int:
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        return db.get(User, user_id).usage_count
+    finally:
+        db.close()
+
+def reserve(user_id: int) -> bool:
+    from app.database import SessionLocal
+    from app.models import User
+
+    db = SessionLocal()
+    try:
+        return db.get(User, user_id).reserve_usage(db)
+    finally:
+        db.close()
+
+def run_db_level(threads: int, attempts: int, tier: str) -> tuple:
+    user_id = create_user(f"bench-{tier}-{time.time_ns()}", tier)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: reserve(user_id), range(attempts)))
+    return sum(results), usage_count(user_id)
+
+async def run_api_level(requests: int, identical: bool = False) -> tuple:
+    import httpx
+    import main
+    from app import auth
+
+    uid = f"bench-api-{time.time_ns()}"
+    user_id = create_user(uid, "free")
+    # Pre-verified claims so the benchmark needs no Firebase project
+    token = f"bench-token-{uid}"
+    auth._token_cache[auth._token_key(token)] = (time.time() + 3600, {"uid": uid, "email": f"{uid}@example.com"})
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        responses = await asyncio.gather(*[
+            client.post(
+                "/api/analyze",
+                json={
+                    "resume_text": "Python developer" if identical else f"Python developer #{n}",
+                    "job_description": "Python role"
+                },
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            for n in range(requests)
+        ])
+    statuses = [r.status_code for r in responses]
+    return statuses.count(200), statuses.count(403), usage_count(user_id)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    stub_gemini.install(latency=0.05)
+    from app import migrations
+    migrations.upgrade_database()
+
+    ok = True
+
+    reserved, count = run_db_level(args.threads, args.attempts, "pro")
+    passed = reserved == args.attempts and count == args.attempts
+    ok &= passed
+    print(f"pro  user, {args.attempts} parallel reservations: reserved={reserved} usage_count={count} "
+          f"-> {'OK' if passed else 'LOST INCREMENTS'}")
+
+    reserved, count = run_db_level(args.threads, args.attempts, "free")
+    passed = reserved == 3 and count == 3
+    ok &= passed
+    print(f"free user, {args.attempts} parallel reservations: reserved={reserved} usage_count={count} "
+          f"-> {'OK' if passed else 'LIMIT OVERSHOOT'}")
+
+    succeeded, rejected, count = asyncio.run(run_api_level(args.requests))
+    passed = succeeded == 3 and count == 3 and rejected == args.requests - 3
+    ok &= passed
+    print(f"free user, {args.requests} parallel /api/analyze: 200={succeeded} 403={rejected} "
+          f"usage_count={count} -> {'OK' if passed else 'FAIL'}")
+
+    succeeded, rejected, count = asyncio.run(run_api_level(args.requests, identical=True))
+    passed = succeeded == args.requests and count == 1
+    ok &= passed
+    print(f"free user, {args.requests} identical parallel /api/analyze: 200={succeeded} 403={rejected} "
+          f"usage_count={count} -> {'OK' if passed else 'NOT COALESCED'}")
+
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,56 @@
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, List
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
 from dotenv import load_dotenv
-import uvicorn
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import SessionLocal, engine, Base
+from app.database import AsyncSessionLocal, get_async_db, dispose_engines
 from app.models import User, ResumeAnalysis
-from app.services import resume_analyzer, job_scraper, ai_service
-from app.auth import verify_token, get_current_user
+from app.schemas import ResumeAnalysisResponse
+from app.services import resume_analyzer, job_scraper, ai_service, document_extractor, keyword_matcher, llm_cache, llm_client, llm_limiter, model_router, uploads, analysis_jobs, single_flight
+from app import auth, metrics, migrations, repositories
+from app.auth import get_current_user, get_cached_user
 
 load_dotenv()
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Importing this module does no I/O; setup happens here, and anything slow
+    # or networked (Firebase, certificates, Gemini model discovery) runs in
+    # background tasks so the server starts accepting requests right away
+    if migrations.DB_AUTO_MIGRATE:
+        # Bring the schema up to date (Alembic migrations in migrations/)
+        migrations.upgrade_database()
+    auth.start_certificate_refresh()
+    ai_service.start_model_discovery()
+    await analysis_jobs.start()
+    
+    yield
+    
+    ai_service.stop_model_discovery()
+    auth.stop_certificate_refresh()
+    await analysis_jobs.stop()
+    llm_client.shutdown()
+    document_extractor.shutdown()
+    await job_scraper.close()
+    await dispose_engines()
 
-app = FastAPI(title="ResumeAI API", version="1.0.0")
+app = FastAPI(title="ResumeAI API", version="1.0.0", lifespan=lifespan)
 
-# CORS middleware
+# Refuse oversized uploads while the body is still streaming in
+app.add_middleware(uploads.UploadSizeLimitMiddleware, paths=["/api/upload-resume"])
+
+# Per-endpoint latency histograms (see /metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# CORS middleware (added last so it wraps every response, including 413s)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[os.getenv("FRONTEND_URL", "http://localhost:3000")],
@@ -29,16 +61,45 @@ app.add_middleware(
 
 security = HTTPBearer()
 
+MAX_BATCH_JOBS = int(os.getenv("MAX_BATCH_JOBS", "50"))
+MAX_HISTORY_PAGE_SIZE = 50
+# How often a job event stream re-checks the database (jobs may run in
+# another worker process) and sends a keep-alive
+JOB_EVENTS_POLL_SECONDS = 15
+
 # Pydantic models
 class ResumeAnalysisRequest(BaseModel):
     resume_text: str
     job_url: Optional[str] = None
     job_description: Optional[str] = None
 
-class ResumeAnalysisResponse(BaseModel):
+class BatchJob(BaseModel):
+    job_url: Optional[str] = None
+    job_description: Optional[str] = None
+
+class BatchAnalysisRequest(BaseModel):
+    resume_text: str
+    jobs: List[BatchJob]
+
+class BatchAnalysisResult(BaseModel):
+    index: int  # position in the request's jobs list
+    job_url: Optional[str] = None
+    status: str  # completed, failed
+    analysis_id: Optional[int] = None
+    match_score: Optional[float] = None
+    suggestions: List[str] = []
+    keywords_missing: List[str] = []
+    keywords_present: List[str] = []
+    error: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchAnalysisResult]  # ranked by match score, failures last
+    completed: int
+    failed: int
+
+class KeywordPreviewResponse(BaseModel):
     match_score: float
     suggestions: List[str]
-    rewritten_sections: dict
     keywords_missing: List[str]
     keywords_present: List[str]
 
@@ -51,85 +112,361 @@ class CoverLetterRequest(BaseModel):
 class CoverLetterResponse(BaseModel):
     cover_letter: str
 
+def sse_response(chunks) -> StreamingResponse:
+    """Send text chunks to the client as Server-Sent Events"""
+    async def events():
+        try:
+            async for chunk in chunks:
+                yield f"data: {json.dumps({'text': chunk})}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/")
 async def root():
     return {"message": "ResumeAI API", "version": "1.0.0"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "models": model_router.current_models()}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics: per-endpoint and per-stage latency, LLM calls and tokens, cache hits"""
+    body, content_type = metrics.render()
+    return Response(content=body, headers={"Content-Type": content_type})
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """LLM response cache hit/miss counters and coalesced in-flight calls"""
+    return {**llm_cache.get_stats(), "single_flight": single_flight.get_stats()}
+
+@app.get("/api/models/stats")
+async def model_stats():
+    """Gemini model routing (models each task would try, circuit state and latency per model) and the outbound limiter"""
+    return {**model_router.get_stats(), "limiter": llm_limiter.get_stats()}
+
+async def run_analysis(user: User, request: ResumeAnalysisRequest) -> dict:
+    """Scrape, reserve usage, analyze and save one analysis request"""
+    # Own session: coalesced callers may outlive the request that started it
+    async with AsyncSessionLocal() as db:
+        # Scrape job description if URL provided
+        job_description = request.job_description
+        if request.job_url and not job_description:
+            job_description = await job_scraper.scrape_job_description(request.job_url)
+        
+        if not job_description:
+            raise HTTPException(status_code=400, detail="Job description is required")
+        
+        # Reserve the analysis atomically so parallel requests can't overshoot the limit
+        with metrics.track("usage_reservation"):
+            reserved = await repositories.reserve_usage(db, user)
+        if not reserved:
+            raise HTTPException(status_code=403, detail="Usage limit exceeded. Please upgrade to Pro.")
+        auth.invalidate_user(user.firebase_uid)
+        
+        try:
+            # Analyze resume
+            analysis = await resume_analyzer.analyze_resume(
+                resume_text=request.resume_text,
+                job_description=job_description
+            )
+            
+            # Save the analysis with its inputs so history can be replayed without the LLM
+            with metrics.track("db_save"):
+                await repositories.save_analysis_result(
+                    db, user.id, analysis, request.resume_text, job_description, request.job_url
+                )
+        except Exception:
+            await db.rollback()
+            await repositories.release_usage(db, user)
+            raise
+        
+        return analysis
 
 @app.post("/api/analyze", response_model=ResumeAnalysisResponse)
 async def analyze_resume(
     request: ResumeAnalysisRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: SessionLocal = Depends(lambda: SessionLocal())
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Analyze resume against job description"""
     try:
         user = await get_current_user(credentials.credentials, db)
+        # Gemini calls made for this request queue at the user's tier priority
+        llm_limiter.set_tier(user.subscription_tier)
         
         # Check usage limits
         if not user.check_usage_limit():
             raise HTTPException(status_code=403, detail="Usage limit exceeded. Please upgrade to Pro.")
         
-        # Scrape job description if URL provided
-        job_description = request.job_description
-        if request.job_url and not job_description:
-            job_description = await job_scraper.scrape_job_description(request.job_url)
+        # A double-click or client retry joins the analysis already running for
+        # the same user and inputs instead of being charged and saved twice
+        key = single_flight.make_key(
+            "analyze_request", user.id, request.resume_text, request.job_url, request.job_description
+        )
+        analysis = await single_flight.run(key, lambda: run_analysis(user, request))
         
-        if not job_description:
+        return ResumeAnalysisResponse(**analysis)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        print(f"Error in analyze_resume endpoint: {error_details}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.post("/api/analyze/jobs", status_code=202)
+async def submit_analysis_job(
+    request: ResumeAnalysisRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue an analysis and return its job id immediately"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        
+        if not request.job_description and not request.job_url:
             raise HTTPException(status_code=400, detail="Job description is required")
         
-        # Analyze resume
-        analysis = await resume_analyzer.analyze_resume(
-            resume_text=request.resume_text,
-            job_description=job_description
-        )
+        # Cheap rejection before anything is reserved
+        try:
+            analysis_jobs.check_capacity(user.id)
+        except analysis_jobs.QueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        
+        if not await repositories.reserve_usage(db, user):
+            raise HTTPException(status_code=403, detail="Usage limit exceeded. Please upgrade to Pro.")
+        auth.invalidate_user(user.firebase_uid)
+        
+        job = await repositories.create_job(db, user.id, request.model_dump())
+        try:
+            analysis_jobs.enqueue(user.id, job.id)
+        except analysis_jobs.QueueFull as e:
+            # Filled up while we were reserving
+            await repositories.delete_job(db, job.id)
+            await repositories.release_usage(db, user)
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
         
-        # Save analysis to database
-        import json
-        db_analysis = ResumeAnalysis(
-            user_id=user.id,
-            match_score=analysis["match_score"],
-            suggestions=json.dumps(analysis["suggestions"]),
-            keywords_missing=json.dumps(analysis["keywords_missing"]),
-            keywords_present=json.dumps(analysis["keywords_present"])
+        return JSONResponse(
+            status_code=202,
+            content=analysis_jobs.job_status(job),
+            headers={"Location": f"/api/analyze/jobs/{job.id}"}
         )
-        db.add(db_analysis)
-        user.increment_usage()
-        db.commit()
         
-        return ResumeAnalysisResponse(**analysis)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/analyze/jobs/{job_id}")
+async def get_analysis_job(
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Poll a queued analysis; the result is included once it has completed"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        job = await repositories.get_job(db, job_id, user.id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return analysis_jobs.job_status(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/analyze/jobs/{job_id}/events")
+async def stream_analysis_job(
+    job_id: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Follow a queued analysis as Server-Sent Events until it completes or fails"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        # Subscribe before reading, so no update falls between the two
+        updates = analysis_jobs.watch(job_id)
+        job = await repositories.get_job(db, job_id, user.id)
+        if not job:
+            analysis_jobs.unwatch(job_id, updates)
+            raise HTTPException(status_code=404, detail="Job not found")
+        status = analysis_jobs.job_status(job)
+        # Don't hold a pooled connection for the life of the stream
+        await db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        nonlocal status
+        try:
+            yield f"event: status\ndata: {json.dumps(status)}\n\n"
+            while status["status"] not in analysis_jobs.TERMINAL_STATUSES:
+                try:
+                    latest = await asyncio.wait_for(updates.get(), timeout=JOB_EVENTS_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    job = await repositories.get_job(db, job_id)
+                    await db.commit()
+                    latest = analysis_jobs.job_status(job)
+                    if latest["status"] == status["status"] and latest["attempts"] == status["attempts"]:
+                        yield ": keep-alive\n\n"
+                        continue
+                status = latest
+                yield f"event: status\ndata: {json.dumps(status)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            analysis_jobs.unwatch(job_id, updates)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(
+    request: BatchAnalysisRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Score one resume against many job descriptions and rank the results"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        llm_limiter.set_tier(user.subscription_tier)
+        
+        if not request.jobs:
+            raise HTTPException(status_code=400, detail="At least one job is required")
+        if len(request.jobs) > MAX_BATCH_JOBS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_JOBS} jobs per batch")
+        
+        # Every job counts as one analysis; reserve them all up front and give
+        # back the ones that fail
+        if not await repositories.reserve_usage(db, user, len(request.jobs)):
+            raise HTTPException(status_code=403, detail="Usage limit exceeded. Please upgrade to Pro.")
+        auth.invalidate_user(user.firebase_uid)
+        
+        try:
+            outcomes = await resume_analyzer.analyze_batch(
+                request.resume_text,
+                [job.model_dump() for job in request.jobs]
+            )
+            
+            # Save all successful analyses in one transaction; the resume text is stored once
+            completed = [index for index, outcome in enumerate(outcomes) if not outcome["error"]]
+            hashes = await repositories.store_texts(
+                db, [request.resume_text] + [outcomes[index]["job_description"] for index in completed]
+            ) if completed else []
+            saved = {}
+            for index, job_hash in zip(completed, hashes[1:]):
+                outcome = outcomes[index]
+                saved[index] = ResumeAnalysis(
+                    user_id=user.id,
+                    match_score=outcome["match_score"],
+                    payload=repositories.analysis_payload(outcome),
+                    resume_hash=hashes[0],
+                    job_hash=job_hash,
+                    job_url=request.jobs[index].job_url
+                )
+            if saved:
+                with metrics.track("db_save"):
+                    await repositories.save_analyses(db, list(saved.values()))
+        except Exception:
+            # Nothing was saved, so nothing is charged
+            await db.rollback()
+            await repositories.release_usage(db, user, len(request.jobs))
+            raise
+        
+        if len(saved) < len(request.jobs):
+            await repositories.release_usage(db, user, len(request.jobs) - len(saved))
+        
+        results = []
+        for index, (job, outcome) in enumerate(zip(request.jobs, outcomes)):
+            if outcome["error"]:
+                results.append(BatchAnalysisResult(
+                    index=index, job_url=job.job_url, status="failed", error=outcome["error"]
+                ))
+            else:
+                results.append(BatchAnalysisResult(
+                    index=index,
+                    job_url=job.job_url,
+                    status="completed",
+                    analysis_id=saved[index].id,
+                    **{k: v for k, v in outcome.items() if k not in ("error", "job_description")}
+                ))
+        results.sort(key=lambda r: (r.status != "completed", -(r.match_score or 0)))
+        
+        return BatchAnalysisResponse(
+            results=results,
+            completed=len(saved),
+            failed=len(results) - len(saved)
+        )
         
     except HTTPException:
         raise
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        print(f"Error in analyze_resume endpoint: {error_details}")
+        print(f"Error in analyze_batch endpoint: {error_details}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/api/analyze/preview", response_model=KeywordPreviewResponse)
+async def preview_analysis(
+    request: ResumeAnalysisRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Fast keyword-based score computed locally (no AI call, doesn't count toward usage)"""
+    try:
+        await get_current_user(credentials.credentials, db)
+        
+        job_description = request.job_description
+        if request.job_url and not job_description:
+            job_description = await job_scraper.scrape_job_description(request.job_url)
+        
+        if not job_description:
+            raise HTTPException(status_code=400, detail="Job description is required")
+        
+        return KeywordPreviewResponse(
+            **keyword_matcher.score_resume(request.resume_text, job_description)
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/rewrite-section")
 async def rewrite_section(
     section: str,
     resume_text: str,
     job_description: str,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: SessionLocal = Depends(lambda: SessionLocal())
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Rewrite a specific resume section using AI"""
     try:
         user = await get_current_user(credentials.credentials, db)
+        llm_limiter.set_tier(user.subscription_tier)
         
         if not user.is_pro_user():
             raise HTTPException(status_code=403, detail="Pro subscription required")
         
-        rewritten = await ai_service.rewrite_section(
-            section=section,
-            resume_text=resume_text,
-            job_description=job_description
-        )
+        with metrics.track("llm_rewrite"):
+            rewritten = await ai_service.rewrite_section(
+                section=section,
+                resume_text=resume_text,
+                job_description=job_description
+            )
         
         return {"rewritten_section": rewritten}
         
@@ -140,24 +477,79 @@ async def rewrite_section(
 async def generate_cover_letter(
     request: CoverLetterRequest,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: SessionLocal = Depends(lambda: SessionLocal())
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate cover letter using AI"""
     try:
         user = await get_current_user(credentials.credentials, db)
+        llm_limiter.set_tier(user.subscription_tier)
+        
+        if not user.is_pro_user():
+            raise HTTPException(status_code=403, detail="Pro subscription required")
+        
+        with metrics.track("llm_cover_letter"):
+            cover_letter = await ai_service.generate_cover_letter(
+                resume_text=request.resume_text,
+                job_description=request.job_description,
+                recipient_name=request.recipient_name,
+                company_name=request.company_name
+            )
+        
+        return CoverLetterResponse(cover_letter=cover_letter)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/rewrite-section/stream")
+async def rewrite_section_stream(
+    section: str,
+    resume_text: str,
+    job_description: str,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream a rewritten resume section as Server-Sent Events"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        llm_limiter.set_tier(user.subscription_tier)
         
         if not user.is_pro_user():
             raise HTTPException(status_code=403, detail="Pro subscription required")
         
-        cover_letter = await ai_service.generate_cover_letter(
+        return sse_response(ai_service.stream_rewrite_section(
+            section=section,
+            resume_text=resume_text,
+            job_description=job_description
+        ))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/generate-cover-letter/stream")
+async def generate_cover_letter_stream(
+    request: CoverLetterRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream a generated cover letter as Server-Sent Events"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        llm_limiter.set_tier(user.subscription_tier)
+        
+        if not user.is_pro_user():
+            raise HTTPException(status_code=403, detail="Pro subscription required")
+        
+        return sse_response(ai_service.stream_cover_letter(
             resume_text=request.resume_text,
             job_description=request.job_description,
             recipient_name=request.recipient_name,
             company_name=request.company_name
-        )
-        
-        return CoverLetterResponse(cover_letter=cover_letter)
+        ))
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -165,35 +557,43 @@ async def generate_cover_letter(
 async def upload_resume(
     file: UploadFile = File(...),
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: SessionLocal = Depends(lambda: SessionLocal())
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload and extract text from resume file"""
     try:
         user = await get_current_user(credentials.credentials, db)
         
-        # Extract text from file
-        content = await file.read()
-        resume_text = await resume_analyzer.extract_text_from_file(
-            content, file.filename
-        )
+        # Stream the upload to disk with a size cap, then extract by sniffed type
+        upload = await uploads.spool_upload(file)
+        try:
+            with metrics.track(f"extract_{upload.file_type}"):
+                resume_text = await resume_analyzer.extract_text_from_upload(
+                    upload.path, upload.file_type
+                )
+        finally:
+            upload.cleanup()
         
         return {"resume_text": resume_text}
         
+    except uploads.UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except uploads.UnsupportedFileType as e:
+        raise HTTPException(status_code=415, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/user/profile")
 async def get_user_profile(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: SessionLocal = Depends(lambda: SessionLocal())
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user profile and usage stats"""
     try:
-        user = await get_current_user(credentials.credentials, db)
+        user = await get_cached_user(credentials.credentials, db)
         return {
             "email": user.email,
             "subscription": user.subscription_tier,
-            "usage_count": user.usage_count,
+            "usage_count": user.get_usage_count(),
             "usage_limit": user.get_usage_limit(),
             "remaining_analyses": user.get_remaining_analyses()
         }
@@ -202,24 +602,70 @@ async def get_user_profile(
 
 @app.get("/api/user/history")
 async def get_analysis_history(
+    limit: int = 10,
+    cursor: Optional[str] = None,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: SessionLocal = Depends(lambda: SessionLocal())
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get user's analysis history"""
+    """Get user's analysis history, newest first; pass next_cursor back to get the next page"""
     try:
+        if not 1 <= limit <= MAX_HISTORY_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_HISTORY_PAGE_SIZE}")
+        try:
+            before = repositories.decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
         user = await get_current_user(credentials.credentials, db)
-        analyses = db.query(ResumeAnalysis).filter(
-            ResumeAnalysis.user_id == user.id
-        ).order_by(ResumeAnalysis.created_at.desc()).limit(10).all()
-        
-        return [{
-            "id": a.id,
-            "match_score": a.match_score,
-            "created_at": a.created_at.isoformat()
-        } for a in analyses]
+        # One extra row tells us whether there is another page
+        analyses = await repositories.list_analyses(db, user.id, limit=limit + 1, before=before)
+        page = analyses[:limit]
+        
+        return {
+            "items": [{
+                "id": a.id,
+                "match_score": a.match_score,
+                "created_at": a.created_at.isoformat()
+            } for a in page],
+            "next_cursor": repositories.encode_cursor(page[-1]) if len(analyses) > limit else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/user/history/{analysis_id}")
+async def get_analysis_detail(
+    analysis_id: int,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get one stored analysis with its results and inputs (no AI call)"""
+    try:
+        user = await get_current_user(credentials.credentials, db)
+        analysis = await repositories.get_analysis(db, user.id, analysis_id)
+        if not analysis:
+            raise HTTPException(status_code=404, detail="Analysis not found")
+        
+        payload = analysis.payload or {}
+        return {
+            "id": analysis.id,
+            "match_score": analysis.match_score,
+            "created_at": analysis.created_at.isoformat(),
+            "suggestions": payload.get("suggestions", []),
+            "keywords_missing": payload.get("keywords_missing", []),
+            "keywords_present": payload.get("keywords_present", []),
+            "rewritten_sections": payload.get("rewritten_sections", {}),
+            "resume_text": analysis.resume.content if analysis.resume else None,
+            "job_description": analysis.job.content if analysis.job else None,
+            "job_url": analysis.job_url
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
 
@@ -0,0 +1,54 @@
+"""Initial schema (users, resume_analyses)
+
+Matches the tables Base.metadata.create_all produced before migrations were
+introduced; app.migrations stamps such databases at this revision. Tables
+added since, even ones create_all may already have made, come in later
+revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String()),
+        sa.Column("firebase_uid", sa.String()),
+        sa.Column("subscription_tier", sa.String()),
+        sa.Column("stripe_customer_id", sa.String(), nullable=True),
+        sa.Column("usage_count", sa.Integer()),
+        sa.Column("usage_reset_date", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_firebase_uid", "users", ["firebase_uid"], unique=True)
+
+    op.create_table(
+        "resume_analyses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("match_score", sa.Float()),
+        sa.Column("suggestions", sa.Text()),
+        sa.Column("keywords_missing", sa.Text()),
+        sa.Column("keywords_present", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_resume_analyses_id", "resume_analyses", ["id"])
+
+
+def downgrade():
+    op.drop_table("resume_analyses")
+    op.drop_table("users")
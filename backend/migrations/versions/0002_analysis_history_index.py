@@ -0,0 +1,30 @@
+"""Composite (user_id, created_at) index for the analysis history
+
+Lets /api/user/history seek straight to a user's newest analyses instead of
+scanning and sorting the table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_resume_analyses_user_id_created_at"
+
+
+def upgrade():
+    # Databases created by create_all from the current models already have it
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("resume_analyses")}
+    if INDEX_NAME not in existing:
+        op.create_index(INDEX_NAME, "resume_analyses", ["user_id", "created_at"])
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name="resume_analyses")
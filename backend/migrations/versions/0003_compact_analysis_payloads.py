@@ -0,0 +1,87 @@
+"""Compact analysis payloads and deduplicated resume/job texts
+
+Moves suggestions / keywords_missing / keywords_present from three JSON text
+columns into one payload column (JSONB on Postgres, zlib-compressed JSON
+elsewhere) and adds content-hash references to the analyzed texts.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db_types import CompactJSON, CompressedText
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+PAYLOAD_FIELDS = ("suggestions", "keywords_missing", "keywords_present")
+
+
+def upgrade():
+    op.create_table(
+        "text_blobs",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("content", CompressedText()),
+        sa.Column("length", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+
+    with op.batch_alter_table("resume_analyses") as batch:
+        batch.add_column(sa.Column("payload", CompactJSON()))
+        batch.add_column(sa.Column("resume_hash", sa.String(64), nullable=True))
+        batch.add_column(sa.Column("job_hash", sa.String(64), nullable=True))
+        batch.add_column(sa.Column("job_url", sa.String(), nullable=True))
+        batch.create_foreign_key("fk_resume_analyses_resume_hash", "text_blobs", ["resume_hash"], ["hash"])
+        batch.create_foreign_key("fk_resume_analyses_job_hash", "text_blobs", ["job_hash"], ["hash"])
+
+    analyses = sa.table(
+        "resume_analyses",
+        sa.column("id", sa.Integer()),
+        sa.column("payload", CompactJSON()),
+        *[sa.column(field, sa.Text()) for field in PAYLOAD_FIELDS]
+    )
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(analyses.c.id, *[analyses.c[field] for field in PAYLOAD_FIELDS])).all()
+    for row in rows:
+        payload = {field: json.loads(getattr(row, field) or "[]") for field in PAYLOAD_FIELDS}
+        payload["rewritten_sections"] = {}
+        connection.execute(analyses.update().where(analyses.c.id == row.id).values(payload=payload))
+
+    with op.batch_alter_table("resume_analyses") as batch:
+        for field in PAYLOAD_FIELDS:
+            batch.drop_column(field)
+
+
+def downgrade():
+    with op.batch_alter_table("resume_analyses") as batch:
+        for field in PAYLOAD_FIELDS:
+            batch.add_column(sa.Column(field, sa.Text()))
+
+    analyses = sa.table(
+        "resume_analyses",
+        sa.column("id", sa.Integer()),
+        sa.column("payload", CompactJSON()),
+        *[sa.column(field, sa.Text()) for field in PAYLOAD_FIELDS]
+    )
+    connection = op.get_bind()
+    for row in connection.execute(sa.select(analyses.c.id, analyses.c.payload)).all():
+        payload = row.payload or {}
+        connection.execute(analyses.update().where(analyses.c.id == row.id).values(**{
+            field: json.dumps(payload.get(field, [])) for field in PAYLOAD_FIELDS
+        }))
+
+    with op.batch_alter_table("resume_analyses") as batch:
+        batch.drop_constraint("fk_resume_analyses_job_hash", type_="foreignkey")
+        batch.drop_constraint("fk_resume_analyses_resume_hash", type_="foreignkey")
+        batch.drop_column("job_url")
+        batch.drop_column("job_hash")
+        batch.drop_column("resume_hash")
+        batch.drop_column("payload")
+    op.drop_table("text_blobs")
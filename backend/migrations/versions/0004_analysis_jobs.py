@@ -0,0 +1,39 @@
+"""Background analysis jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db_types import CompactJSON
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("status", sa.String(16)),
+        sa.Column("request", CompactJSON()),
+        sa.Column("result", CompactJSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("analysis_id", sa.Integer(), sa.ForeignKey("resume_analyses.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_analysis_jobs_user_id", "analysis_jobs", ["user_id"])
+    op.create_index("ix_analysis_jobs_status_created_at", "analysis_jobs", ["status", "created_at"])
+
+
+def downgrade():
+    op.drop_table("analysis_jobs")
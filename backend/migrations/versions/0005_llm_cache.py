@@ -0,0 +1,36 @@
+"""Persistent LLM response cache table
+
+Used by llm_cache when LLM_CACHE_PERSIST=true. Skipped where the table
+exists already: create_all made it before migrations existed, and 0001
+created it until it was moved here.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "llm_cache" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "llm_cache",
+        sa.Column("key", sa.String(), primary_key=True),
+        sa.Column("value", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("expires_at", sa.DateTime()),
+    )
+    op.create_index("ix_llm_cache_created_at", "llm_cache", ["created_at"])
+    op.create_index("ix_llm_cache_expires_at", "llm_cache", ["expires_at"])
+
+
+def downgrade():
+    op.drop_table("llm_cache")
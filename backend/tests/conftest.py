@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Tests import the app as the server does, from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "test-stub-key")
+# Never touch the development database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='resume-tests-'), 'test.db')}")
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from app.services import llm_client, model_router, resume_analyzer
+from benchmarks import stub_gemini
+
+RESUME = "Python developer\nSkills: Python, FastAPI, Docker"
+JOB = "Backend role needing Python, Docker and AWS"
+
+@pytest.fixture
+def failing_gemini():
+    stub_gemini.install(latency=0.0, failure_rate=1.0)
+    model_router._circuits.clear()
+    yield
+    stub_gemini.install(latency=0.0)
+    model_router._circuits.clear()
+
+async def _analyze():
+    with llm_client.retry_transient_errors(0):
+        return await resume_analyzer.analyze_resume(RESUME, JOB)
+
+def test_request_falls_back_to_keyword_scoring(failing_gemini):
+    result = asyncio.run(_analyze())
+    assert result["suggestions"][0].startswith("Error in AI analysis")
+    assert "Docker" in result["keywords_present"]
+
+def test_job_sees_the_transient_error(failing_gemini):
+    async def in_job():
+        with llm_client.raise_transient_errors():
+            return await _analyze()
+
+    with pytest.raises(Exception) as raised:
+        asyncio.run(in_job())
+    assert llm_client.is_transient_error(raised.value)
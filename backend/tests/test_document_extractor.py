@@ -0,0 +1,54 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from app.services import document_extractor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "documents")
+DOCX = os.path.join(FIXTURES, "resume_1page.docx")
+
+async def _stuck(pool, source):
+    # Stands in for a crafted file that keeps a worker parsing
+    return await asyncio.get_running_loop().run_in_executor(pool, time.sleep, 60)
+
+@pytest.fixture
+def small_pool(monkeypatch):
+    monkeypatch.setattr(document_extractor, "EXTRACT_MAX_WORKERS", 1)
+    monkeypatch.setattr(document_extractor, "EXTRACT_TIMEOUT", 2.0)
+    document_extractor.shutdown()
+    yield
+    document_extractor.shutdown()
+
+def test_timed_out_extraction_frees_the_pool(small_pool):
+    async def scenario():
+        stuck = asyncio.create_task(document_extractor._run_extraction("PDF", _stuck, None))
+        await asyncio.sleep(0.5)
+        workers = list(document_extractor._get_pool()._processes.values())
+        with pytest.raises(Exception, match="timed out"):
+            await stuck
+        # The next upload gets a fresh worker instead of queueing behind the stuck one
+        start = time.perf_counter()
+        text = await document_extractor.extract_docx_text(DOCX)
+        return workers, text, time.perf_counter() - start
+
+    workers, text, seconds = asyncio.run(scenario())
+    assert text.strip()
+    assert seconds < document_extractor.EXTRACT_TIMEOUT
+    assert workers
+    for process in workers:
+        process.join(5)
+        assert not process.is_alive()
+
+def test_extraction_queued_behind_a_timeout_is_retried(small_pool):
+    async def scenario():
+        stuck = asyncio.create_task(document_extractor._run_extraction("PDF", _stuck, None))
+        await asyncio.sleep(0.5)
+        queued = asyncio.create_task(document_extractor.extract_docx_text(DOCX))
+        results = await asyncio.gather(stuck, queued, return_exceptions=True)
+        return results
+
+    stuck_result, queued_result = asyncio.run(scenario())
+    assert "timed out" in str(stuck_result)
+    assert isinstance(queued_result, str) and queued_result.strip()
@@ -0,0 +1,37 @@
+from app.services import keyword_matcher
+
+def skills(text: str) -> set:
+    return set(keyword_matcher.extract_skills(keyword_matcher.tokenize(text)))
+
+def test_technical_resume_matches_unambiguous_forms():
+    text = ("Built React.js and Node.js services with Spring Boot, shipped an iOS Swift app "
+            "in SwiftUI and trained machine learning models with PySpark on AWS")
+    assert {"React", "Node.js", "Spring Boot", "Swift", "Machine Learning", "Spark", "AWS"} <= skills(text)
+
+def test_everyday_words_are_not_skills():
+    text = ("Marketing manager. Led the Spring product launch and helped the team react to swift "
+            "changes in the market. Kept the node of regional partners informed, ran the rust belt "
+            "campaign, handled security deposits for events and sent the ML (mailing list) and "
+            "TS (team sync) notes.")
+    assert skills(text) == set()
+
+    text = ("Events and hospitality manager. Wore a ruby brooch to the launch bash, served Java coffee "
+            "at an angular marble bar and kept a flask on hand. Stayed agile when plans changed, kept "
+            "airflow steady in the marquee and photographed the snowflake display. Monitoring the "
+            "budget and clear communication with stakeholders kept the roadmap on track; the pandas "
+            "exhibit, a Kafka reading, the tableau vivant, Mr Jenkins, the vue from the terrace and "
+            "the grumpy old git all made the newsletter.")
+    assert skills(text) == set()
+    result = keyword_matcher.score_resume(
+        text, "Senior engineer: Ruby, Bash, Java, Angular, Snowflake, Airflow, Flask, Agile"
+    )
+    assert result["keywords_present"] == []
+    assert result["match_score"] < 20
+
+def test_non_technical_resume_scores_no_skills_for_a_developer_job():
+    resume = ("Events coordinator. Planned the spring gala, reacted quickly to swift schedule "
+              "changes and looked after venue security.")
+    job = "Frontend developer: React.js, TypeScript, Node.js and Swift experience required."
+    result = keyword_matcher.score_resume(resume, job)
+    assert result["keywords_present"] == []
+    assert {"React", "TypeScript", "Node.js"} <= set(result["keywords_missing"])
@@ -0,0 +1,36 @@
+import sqlalchemy as sa
+
+from app import migrations
+
+def _engine(tmp_path):
+    return sa.create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+
+def _tables(engine) -> set:
+    return set(sa.inspect(engine).get_table_names())
+
+def test_fresh_database_gets_every_table(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    monkeypatch.setattr(migrations, "engine", engine)
+    migrations.upgrade_database()
+    assert {"users", "resume_analyses", "llm_cache", "analysis_jobs", "text_blobs"} <= _tables(engine)
+
+def test_database_from_before_migrations_gets_new_tables(tmp_path, monkeypatch):
+    engine = _engine(tmp_path)
+    # The schema create_all produced before migrations existed
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR, firebase_uid VARCHAR, "
+            "subscription_tier VARCHAR, stripe_customer_id VARCHAR, usage_count INTEGER, "
+            "usage_reset_date DATETIME, created_at DATETIME, updated_at DATETIME)"
+        )
+        connection.exec_driver_sql(
+            "CREATE TABLE resume_analyses (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id), "
+            "match_score FLOAT, suggestions TEXT, keywords_missing TEXT, keywords_present TEXT, "
+            "created_at DATETIME)"
+        )
+        connection.exec_driver_sql("INSERT INTO users (id, email) VALUES (1, 'existing@example.com')")
+    monkeypatch.setattr(migrations, "engine", engine)
+    migrations.upgrade_database()
+    assert {"llm_cache", "analysis_jobs", "text_blobs"} <= _tables(engine)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT email FROM users").scalar() == "existing@example.com"
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from app.services import model_router
+
+PRIMARY, FAILOVER = "models/gemini-2.5-flash", "models/gemini-2.0-flash-001"
+
+@pytest.fixture(autouse=True)
+def router():
+    model_router.set_models([PRIMARY, FAILOVER])
+    model_router._circuits.clear()
+    model_router._latency.clear()
+    yield
+    model_router.set_models([])
+    model_router._circuits.clear()
+    model_router._latency.clear()
+
+def state(model_name: str) -> str:
+    return model_router._circuits[model_name]["state"]
+
+def test_routing_past_an_expired_circuit_leaves_it_open():
+    model_router.trip(FAILOVER, 0.01)
+    time.sleep(0.02)
+
+    # Ranked as the failover, but never called
+    assert model_router.route("rewrite") == [PRIMARY, FAILOVER]
+    assert state(FAILOVER) == model_router.OPEN
+    assert model_router.claim(PRIMARY)
+    assert state(FAILOVER) == model_router.OPEN
+
+def test_claim_lets_one_trial_call_through():
+    model_router.trip(PRIMARY, 0.01)
+    assert not model_router.claim(PRIMARY)
+    time.sleep(0.02)
+
+    assert model_router.claim(PRIMARY)
+    assert state(PRIMARY) == model_router.HALF_OPEN
+    assert not model_router.claim(PRIMARY)
+
+    model_router.record(PRIMARY, "rewrite", 0.1, failed=False)
+    assert state(PRIMARY) == model_router.CLOSED
+    assert model_router.claim(PRIMARY)
@@ -0,0 +1,39 @@
+from app.services import job_scraper, prompt_builder
+
+# A careers page without a description container, so the scraper falls back
+# to the whole page: menus, footer and legal text come along
+JOB_PAGE = b"""<html><head><title>Backend Engineer</title></head><body>
+<nav><ul>
+  <li><a href="/">Home</a></li><li><a href="/jobs">Jobs</a></li>
+  <li><a href="/teams">Teams</a></li><li><a href="/blog">Blog</a></li>
+</ul></nav>
+<main>
+  <h1>Senior Backend Engineer</h1>
+  <p>We are looking for a backend engineer to build the APIs behind our hiring platform.</p>
+  <h2>Requirements:</h2>
+  <ul>
+    <li>5+ years of Python and PostgreSQL in production</li>
+    <li>Experience running Docker and Kubernetes on AWS</li>
+  </ul>
+  <p>Acme is an equal opportunity employer and hires without regard to race, color or religion.</p>
+  <p><a href="/apply">Apply now</a> or <a href="/save">save this job</a></p>
+</main>
+<footer><ul>
+  <li>Privacy</li><li>Terms</li><li>Careers</li><li>Contact</li>
+</ul><p>Copyright 2026 Acme. All rights reserved.</p></footer>
+</body></html>"""
+
+RESUME = "Backend developer\nSkills: Python, PostgreSQL, Docker"
+
+def test_scraped_job_keeps_lines():
+    text = job_scraper.extract_job_description(JOB_PAGE, "https://careers.example.com/jobs/1")
+    assert "5 years of Python and PostgreSQL in production\n" in text
+
+def test_prompt_drops_scraped_navigation_and_boilerplate():
+    job = job_scraper.extract_job_description(JOB_PAGE, "https://careers.example.com/jobs/1")
+    _, packed_job = prompt_builder.analysis_inputs(RESUME, job)
+
+    assert "Python and PostgreSQL in production" in packed_job
+    assert "Docker and Kubernetes on AWS" in packed_job
+    for dropped in ("Home", "Blog", "Terms", "Contact", "equal opportunity", "Apply now", "All rights reserved"):
+        assert dropped not in packed_job